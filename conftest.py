@@ -3,16 +3,37 @@ General configuration
 """
 import sys
 import os
-import subprocess
-import tempfile
 import time
 import requests
 import pytest
+from selenium.common.exceptions import WebDriverException
 from test_utils.config import Config
 from test_utils.logger_manager import LoggerManager
 from test_utils.result_manager import ResultManagerClass
-from utils.browser_manager import BrowserManager, BrowserOptions
-from contextlib import contextmanager
+from utils.browser_manager import BrowserManager, BrowserManagerException, BrowserOptions
+from utils.browser_matrix import BROWSER_PARAM, BrowserMatrixReport, parse_browser_types
+from utils.api import APIServer, APIServerException
+from utils.browser_pool import BrowserPool
+from utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitName,
+    configure_circuit_breakers,
+    get_circuit_breaker
+)
+from utils.deadline import end_deadline, start_deadline
+from utils.latency_history import LatencyHistory, LatencyHistoryRecorder
+from utils.page_schema import get_page_inputs
+from utils.reference_cache import ReferenceCache, configure_reference_cache
+from utils.shard_runner import (
+    WORKER_ENV,
+    DurationRecorder,
+    DurationStore,
+    ShardController,
+    deselect_not_in_shard
+)
+from utils.tools import YamlManager
+from utils.user_store import StoreBackend, UserStoreException, create_user_store
+from utils.wait_engine import WaitEngine, WaitLatencyReport, WaitStrategy
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 
@@ -30,7 +51,7 @@ def pytest_addoption(parser):
         "--browser_type",
         action="store",
         default="Chrome",
-        help="Browser to execute the tests"
+        help="Browser(s) to execute the tests, comma separated, e.g. Firefox,Chrome,Edge"
     )
     parser.addoption(
         "--headless",
@@ -62,6 +83,181 @@ def pytest_addoption(parser):
         default="",
         help="Disable shared memory usage"
     )
+    parser.addoption(
+        "--pool_size",
+        action="store",
+        type=int,
+        default=1,
+        help="Number of browsers launched in advance and shared between test classes"
+    )
+    parser.addoption(
+        "--max_leases",
+        action="store",
+        type=int,
+        default=20,
+        help="Number of test classes a browser serves before being relaunched"
+    )
+    parser.addoption(
+        "--warm_profile",
+        action="store_true",
+        default="",
+        help="Clone browser profiles from a template with the site assets already cached"
+    )
+    parser.addoption(
+        "--workers",
+        action="store",
+        type=int,
+        default=None,
+        help="Number of worker processes to spread the tests across"
+    )
+    parser.addoption(
+        "--durations_file",
+        action="store",
+        default=".test_durations.json",
+        help="File with the per-test durations used to balance the workers"
+    )
+    parser.addoption(
+        "--element_cache",
+        action="store_true",
+        default="",
+        help="Reuse the element handles already found until the page changes"
+    )
+    parser.addoption(
+        "--wait_strategy",
+        action="store",
+        default=WaitStrategy.MUTATION.value,
+        choices=[strategy.value for strategy in WaitStrategy],
+        help="Wait for elements in page with a MutationObserver, or by polling"
+    )
+    parser.addoption(
+        "--reference_ttl",
+        action="store",
+        type=float,
+        default=ReferenceCache.DEFAULT_TTL,
+        help="Seconds the scraped reference data (credentials, catalog) is reused"
+    )
+    parser.addoption(
+        "--strict_reference",
+        action="store_true",
+        default="",
+        help="Scrape the reference data again as soon as the live page changes"
+    )
+    parser.addoption(
+        "--test_deadline",
+        action="store",
+        type=float,
+        default=None,
+        help="Seconds every test can spend, shared by all its waits, "
+             "the 'deadline' marker overrides it"
+    )
+    parser.addoption(
+        "--breaker_threshold",
+        action="store",
+        type=int,
+        default=CircuitBreaker.DEFAULT_THRESHOLD,
+        help="Consecutive failures to reach the site or the API before failing the "
+             "remaining tests right away"
+    )
+    parser.addoption(
+        "--breaker_backoff",
+        action="store",
+        type=float,
+        default=CircuitBreaker.DEFAULT_BACKOFF,
+        help="Seconds before probing the site or the API again, doubled on every failed probe"
+    )
+    parser.addoption(
+        "--latency_history",
+        action="store",
+        default=LatencyHistory.DEFAULT_PATH,
+        help="File with the wait latency of every locator recorded in previous runs"
+    )
+    parser.addoption(
+        "--calibrated_timeouts",
+        action="store_true",
+        default="",
+        help="Wait for every locator with a timeout derived from its latency history"
+    )
+    parser.addoption(
+        "--timeout_factor",
+        action="store",
+        type=float,
+        default=3.0,
+        help="Safety factor applied to the p99 latency of a locator to get its timeout"
+    )
+    parser.addoption(
+        "--users_backend",
+        action="store",
+        default=StoreBackend.MEMORY.value,
+        choices=[backend.value for backend in StoreBackend],
+        help="Storage of the users API, memory and sqlite are seeded with fake users"
+    )
+    parser.addoption(
+        "--users_db",
+        action="store",
+        default=":memory:",
+        help="Database file of the sqlite users backend"
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """
+    Registers the shard controller when running with several workers, otherwise
+    the recorder of per-test durations. With several browsers, each one runs in workers
+    of its own, one per browser by default, and the browser matrix report is registered.
+    The wait latency report and history are always registered, the timeouts are calibrated
+    from the history if requested and the reference cache and circuit breakers are
+    configured.
+    """
+    configure_reference_cache(
+        ttl=config.getoption("reference_ttl"),
+        strict=bool(config.getoption("strict_reference"))
+    )
+    configure_circuit_breakers(
+        threshold=config.getoption("breaker_threshold"),
+        backoff=config.getoption("breaker_backoff")
+    )
+    store = DurationStore(os.path.join(str(config.rootpath), config.getoption("durations_file")))
+    browsers = parse_browser_types(config.getoption("browser_type"))
+    workers = config.getoption("workers")
+    if workers is None:
+        workers = len(browsers) if len(browsers) > 1 else 0
+    if workers > 1 and not os.getenv(WORKER_ENV):
+        # the controller merges the workers' xml files into the requested one
+        xmlpath = config.option.xmlpath
+        config.option.xmlpath = None
+        config.pluginmanager.register(
+            ShardController(config, workers, store, xmlpath, (BROWSER_PARAM,),
+                            BROWSER_PARAM if len(browsers) > 1 else None),
+            "shard_controller"
+        )
+    else:
+        config.pluginmanager.register(DurationRecorder(store), "duration_recorder")
+    if len(browsers) > 1:
+        config.pluginmanager.register(BrowserMatrixReport(config), "browser_matrix")
+    config.pluginmanager.register(WaitLatencyReport(), "wait_latency")
+    history = LatencyHistory(
+        os.path.join(str(config.rootpath), config.getoption("latency_history")))
+    config.pluginmanager.register(LatencyHistoryRecorder(history), "latency_history")
+    if config.getoption("calibrated_timeouts"):
+        WaitEngine.calibrate(LatencyHistory.derive_timeouts(
+            history.load(), factor=config.getoption("timeout_factor")))
+
+
+def pytest_generate_tests(metafunc):
+    """
+    Parametrizes every test which uses a browser once per '--browser_type' browser.
+    """
+    browsers = parse_browser_types(metafunc.config.getoption("browser_type"))
+    if len(browsers) > 1 and "browser" in metafunc.fixturenames:
+        metafunc.parametrize(BROWSER_PARAM, browsers, indirect=True, scope="class")
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Keeps only the tests assigned to this process when running as a worker.
+    """
+    deselect_not_in_shard(config, items)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -76,21 +272,147 @@ def configure_logging(pytestconfig):
     LoggerManager.setup_logger()
 
 
-@pytest.fixture(scope="class")
-def browser(pytestconfig):
+def _new_browser_pool(pytestconfig, browser_type):
     """
-    Fixture to setup the instance for BrowserManager common in all test cases.
+    Creates the pool of warm BrowserManager instances for the given browser.
     """
     browser_options = []
-    browser_type =  pytestconfig.getoption("browser_type")
 
     for input_browser in BrowserOptions:
         if pytestconfig.getoption(input_browser.value):
             browser_options.append(input_browser.value)
 
-    manager = BrowserManager(*browser_options, browser=browser_type)
-    yield manager
-    manager.driver_down()
+    if pytestconfig.getoption("warm_profile"):
+        BrowserManager.build_profile_template(
+            *browser_options,
+            browser=browser_type,
+            url=get_page_inputs("tests/test_inputs/sauce_demo.yaml", "login_page")["path"]
+        )
+    return BrowserPool(
+        *browser_options,
+        browser=browser_type,
+        size=pytestconfig.getoption("pool_size"),
+        max_leases=pytestconfig.getoption("max_leases"),
+        element_cache=bool(pytestconfig.getoption("element_cache")),
+        wait_strategy=pytestconfig.getoption("wait_strategy")
+    )
+
+
+@pytest.fixture(scope="session", name="browser_pools")
+def browser_pools_fixture():
+    """
+    Fixture which keeps one pool of warm BrowserManager instances per browser.
+    """
+    pools = {}
+    yield pools
+    for pool in pools.values():
+        pool.shutdown()
+
+
+@pytest.fixture(scope="class", name="browser_type")
+def browser_type_fixture(request, pytestconfig):
+    """
+    Fixture to get the browser of the current test, parametrized for the browser matrix.
+    """
+    return getattr(
+        request, "param", parse_browser_types(pytestconfig.getoption("browser_type"))[0])
+
+
+@pytest.fixture(scope="class")
+def browser(pytestconfig, browser_pools, browser_type):
+    """
+    Fixture to lease the instance for BrowserManager common in all test cases.
+    """
+    if browser_type not in browser_pools:
+        browser_pools[browser_type] = _new_browser_pool(pytestconfig, browser_type)
+    with browser_pools[browser_type].lease() as manager:
+        yield manager
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Marks the leased browser as broken when a test fails on a browser error, or with a
+    browser session which no longer answers, so it is recycled instead of reset once its
+    test class is finished. The steps report the browser errors as failed checks, so the
+    session of every failed test is checked.
+    """
+    outcome = yield
+    manager = item.funcargs.get("browser") if hasattr(item, "funcargs") else None
+    if manager is None or not outcome.get_result().failed or call.excinfo is None:
+        return
+    pool = item.funcargs.get("browser_pools", {}).get(item.funcargs.get("browser_type"))
+    if pool is None:
+        return
+    if call.excinfo.errisinstance((BrowserManagerException, WebDriverException)):
+        pool.mark_broken(manager)
+        return
+    try:
+        manager.check_session()
+    except BrowserManagerException:
+        pool.mark_broken(manager)
+
+
+@pytest.fixture(autouse=True)
+def element_cache_report(request):
+    """
+    Fixture to report the element cache hits and misses of every test using a browser.
+    """
+    if not request.config.getoption("element_cache") or "browser" not in request.fixturenames:
+        yield
+        return
+    element_cache = request.getfixturevalue("browser").element_cache
+    before = element_cache.get_counters()
+    yield
+    counters = {
+        counter: value - before[counter]
+        for counter, value in element_cache.get_counters().items()
+    }
+    request.node.user_properties.append(
+        ("element_cache", ", ".join(f"{key}={value}" for key, value in counters.items())))
+    LoggerManager.get_logger("element_cache").info(f"{request.node.nodeid}: {counters}")
+
+
+# environment variable with the base url of the users API, shared with the workers
+API_URL_ENV = "API_URL"
+API_CONFIG = "tests/test_inputs/api_config.yaml"
+# fixtures which reach each guarded dependency
+GUARDED_FIXTURES = {"browser": CircuitName.SITE, "run_users_api": CircuitName.API}
+
+
+@pytest.fixture(autouse=True)
+def circuit_guard(request):
+    """
+    Fixture to error right away the tests which need the site or the API while they are
+    known to be unreachable, instead of letting every test time out on its own.
+    """
+    for fixture, name in GUARDED_FIXTURES.items():
+        if fixture not in request.fixturenames:
+            continue
+        breaker = get_circuit_breaker(name)
+        if breaker.is_open():
+            pytest.fail(breaker.reason(), pytrace=False)
+
+
+@pytest.fixture(autouse=True)
+def time_budget(request):
+    """
+    Fixture to give every test the time budget of its 'deadline' marker or of
+    '--test_deadline', drawn by all its waits. Where the time went is logged and added
+    as a `deadline` property to the report.
+    """
+    marker = request.node.get_closest_marker("deadline")
+    budget = marker.args[0] if marker else request.config.getoption("test_deadline")
+    if not budget:
+        yield
+        return
+    start_deadline(budget)
+    try:
+        yield
+    finally:
+        report = end_deadline().report()
+        request.node.user_properties.append(("deadline", report))
+        LoggerManager.get_logger("deadline").info(f"{request.node.nodeid}: {report}")
 
 
 @pytest.fixture(scope="class")
@@ -101,53 +423,110 @@ def result():
     return ResultManagerClass()
 
 
+def _start_users_api(config, mongo_settings: dict) -> APIServer:
+    """
+    Starts the users API in process with the storage chosen with '--users_backend'.
+
+    Args:
+        config(pytest.Config): pytest configuration.
+        mongo_settings(dict): mongo_uri, db_name and collection_name of the Mongo backend.
+
+    Returns:
+        APIServer: the running server.
+
+    Raises:
+        APIServerException: If the store or the server can not be started.
+    """
+    try:
+        store = create_user_store(
+            config.getoption("users_backend"),
+            dict(mongo_settings, timeout_ms=5000),
+            config.getoption("users_db")
+        )
+    except UserStoreException as e:
+        raise APIServerException(str(e)) from e
+    server = APIServer(store)
+    server.start()
+    return server
+
+
 @pytest.fixture(scope="session")
-def run_users_api(api_settings):
+def run_users_api(pytestconfig, api_settings):
     """
-    Fixture to get the instance of ResultManagerClass, common in all tests.
+    Fixture to serve the users API for the whole session.
+
+    The API given in 'API_URL', e.g. the one the shard controller started for all its
+    workers, is reused once it answers. Otherwise one is started in this process and its
+    url exported in 'API_URL'.
+
+    Returns:
+        str: base url of the API.
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(current_dir, "utils/api.py")
-    with start_server(file_path, api_settings):
-        response = requests.get("http://127.0.0.1:5000", timeout=10)
-        assert response.status_code == 200
+    api_url = os.getenv(API_URL_ENV)
+    if api_url:
+        _wait_api_up(api_url, timeout=15)
+        yield api_url
+        return
+    try:
+        server = _start_users_api(pytestconfig, api_settings)
+    except APIServerException as e:
+        get_circuit_breaker(CircuitName.API).trip(str(e))
+        pytest.fail(f"Unable to start the API: {e}", pytrace=False)
+    os.environ[API_URL_ENV] = server.url
+    try:
+        yield server.url
+    finally:
+        os.environ.pop(API_URL_ENV, None)
+        server.stop()
+
 
-@contextmanager
-def start_server(file_path: str, api_settings: str):
+def _wait_api_up(url: str, timeout: float) -> None:
     """
-    Start API server
+    Polls the API until it answers, tripping its circuit breaker if it doesn't within
+    timeout.
 
     Args:
-        file_path(str): path to api.py file
-        api_settings(str): mongo configurations
-    """
-    server = subprocess.Popen(
-        [
-            "python",
-            file_path,
-            "--mongo_uri",
-            api_settings["mongo_uri"],
-            "--db_name",
-            api_settings["db_name"],
-            "--collection_name",
-            api_settings["collection_name"]
-        ],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.PIPE,
-        shell=True
-    )
-
-    time.sleep(3)
+        url(str): API base url.
+        timeout(int/float): Timeout in seconds to wait.
+    """
+    end_time = time.monotonic() + timeout
+    delay = 0.1
+    while True:
+        try:
+            if requests.get(url, timeout=2).status_code == 200:
+                return
+            reason = "API didn't initialize"
+        except requests.RequestException as e:
+            reason = f"Unable to connect to the API: {e}"
+        if time.monotonic() > end_time:
+            break
+        time.sleep(delay)
+        delay = min(delay * 2, 1)
+    get_circuit_breaker(CircuitName.API).trip(reason)
+    pytest.fail(reason, pytrace=False)
 
-    try:
-        response = requests.get("http://127.0.0.1:5000", timeout=10)
-        if response.status_code != 200:
-            pytest.exit("API didn't initialize")
-    except requests.ConnectionError:
-        pytest.exit("Unable to connect to the API")
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtestloop(session):
+    """
+    Starts a single API for all the shard workers when any of their tests needs it, its
+    url reaches them through 'API_URL'. A failure to start it is left to the workers,
+    which report it in the tests needing the API.
+    """
+    server = None
+    if session.config.pluginmanager.has_plugin("shard_controller") and \
+            not os.getenv(API_URL_ENV) and \
+            any("run_users_api" in getattr(item, "fixturenames", ()) for item in session.items):
+        try:
+            server = _start_users_api(
+                session.config, YamlManager.get_yaml_file_data(API_CONFIG)["cart"])
+            os.environ[API_URL_ENV] = server.url
+        except APIServerException as e:
+            LoggerManager.get_logger("api_server").error(f"Unable to start the shared API: {e}")
+            server = None
     try:
         yield
     finally:
-        server.terminate()
-        server.wait()
+        if server is not None:
+            os.environ.pop(API_URL_ENV, None)
+            server.stop()
@@ -3,7 +3,7 @@ Base test page class
 """
 from typing import Union
 from test_utils.logger_manager import LoggerManager
-from utils.browser_manager import BrowserManagerException, SelectBy
+from utils.browser_manager import BrowserManagerException, FillMode, SelectBy
 
 
 class BasePageException(Exception):
@@ -36,15 +36,33 @@ class BasePage:
         self._testing_page = new_value
 
     def _get_element_params(self, key):
-        by = self.page_dict[key]["by"]
-        ele = self.page_dict[key]["value"]
-        return by, ele
+        """Returns the compiled locator of the given 'key' from the page schema"""
+        return self.page_dict[key]
 
     def open_page(self):
         """
-        Open browser page give the value from 'testing_page'
+        Open browser page give the value from 'testing_page' and waits until it is ready.
         """
         self.browser.open_page(self.testing_page)
+        self.wait_until_ready()
+
+    def _get_ready_locator(self):
+        """Returns the locator of the element which signals the page is ready"""
+        return self.page_dict["ready"]
+
+    def wait_until_ready(self,
+                         timeout=5):
+        """
+        Waits for the readiness signal declared for the page in its inputs, once it is
+        confirmed the reads look for the elements without waiting for them.
+
+        Args:
+            timeout: (int/float): Timeout in seconds to wait.
+
+        Raises:
+            BrowserManagerException: If the page is not ready within timeout.
+        """
+        self.browser.confirm_page_ready(self._get_ready_locator(), timeout)
 
     def get_webdriver_element_obj(self,
                                   locator:tuple,
@@ -141,6 +159,28 @@ class BasePage:
             timeout=timeout
         )
 
+    def set_form_values(self,
+                        fields: dict,
+                        mode: FillMode=FillMode.SCRIPT,
+                        driver=None,
+                        timeout=5):
+        """
+        Writes the value of several form fields at once.
+
+        Args:
+            fields (dict): {locator: text} of the fields, in filling order.
+            mode (FillMode, optional): SCRIPT sets every field in a single round trip,
+            TYPING clears and types every field key by key. Defaults to SCRIPT.
+            driver (webdriver, optional): WebDriver instance. Defaults
+            to None, using self.driver if not provided.
+            timeout (int or float, optional): Maximum time (in seconds)
+            to wait for the fields to be present. Defaults to 5.
+
+        Raises:
+            BrowserManagerException: If any field couldn't be written.
+        """
+        self.browser.fill_form(fields=fields, timeout=timeout, driver=driver, mode=mode)
+
     def get_current_url(self,
                         switch=False):
         """
@@ -165,13 +205,32 @@ class BasePage:
         """
         return self.get_webdriver_list_element_obj(self._get_element_params(key="items_list"))
 
-    def get_item_prices(self):
+    def get_item_prices(self,
+                        bulk=True):
         """
         It gets the available elements in the page (home, or cath page) with names and prices.
 
+        By default names and prices are read in a single script round trip, it falls back
+        to reading every element when the locators can not be evaluated by a script.
+
+        Args:
+            bulk(bool:optional:default=True): Flag to read all the items in one round trip.
+
         Returns:
             dict: {name1:price1, name2:price2, }
         """
+        if bulk and not self.list_of_items:
+            try:
+                rows = self.browser.get_elements_text_bulk(
+                    self._get_element_params(key="items_list"),
+                    {
+                        "name": self._get_element_params(key="item_name"),
+                        "price": self._get_element_params(key="item_price"),
+                    }
+                )
+                return {row["name"]: (row["price"] or "").split('\n')[0] for row in rows}
+            except BrowserManagerException:
+                self.log.info("Unable to read the item prices in bulk, reading them one by one")
         prices_dict = {}
         list_of_items = self.list_of_items or self.get_inventory_items()
         for item in list_of_items:
@@ -183,7 +242,6 @@ class BasePage:
             prices_dict.update({tmp_name:tmp_price})
         return prices_dict
 
-
     @staticmethod
     def _convert_text_to_list(text,
                               spliter,
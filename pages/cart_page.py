@@ -2,7 +2,7 @@
 Cart page file related to class
 """
 from pages.base_pages import BasePage
-from utils.tools import YamlManager
+from utils.page_schema import get_page_inputs
 
 
 class CartPageException(Exception):
@@ -23,7 +23,7 @@ class CartPage(BasePage):
                  browser,
                  testing_page):
         super().__init__(browser)
-        self.page_dict = YamlManager.get_yaml_file_data(testing_page)["general_inputs"]["cart_page"]
+        self.page_dict = get_page_inputs(testing_page, "cart_page")
         self.testing_page = self.page_dict["path"]
 
     def move_to_checkout_page(self):
@@ -2,7 +2,8 @@
 CheckOut page file related to class
 """
 from pages.base_pages import BasePage
-from utils.tools import YamlManager
+from utils.browser_manager import FillMode
+from utils.page_schema import get_page_inputs
 
 
 class CheckOutPageException(Exception):
@@ -23,9 +24,7 @@ class CheckOutPage(BasePage):
                  browser,
                  testing_page):
         super().__init__(browser)
-        self.page_dict = YamlManager.get_yaml_file_data(
-            testing_page
-        )["general_inputs"]["checkout_page"]
+        self.page_dict = get_page_inputs(testing_page, "checkout_page")
         self.testing_page = self.page_dict["path"]
         self.which_checkout_page = 0
 
@@ -38,6 +37,10 @@ class CheckOutPage(BasePage):
     def testing_page(self, new_value):
         self._testing_page = new_value
 
+    def _get_ready_locator(self):
+        """Returns the readiness signal of the current checkout step"""
+        return self.page_dict["ready"][self.which_checkout_page]
+
     def continue_checkout_step_two(self):
         """
         Method to move from checkout page to checkout page
@@ -47,15 +50,21 @@ class CheckOutPage(BasePage):
         self.which_checkout_page += 1
 
     def filed_checkout_info(self,
+                            fill_mode: FillMode=FillMode.SCRIPT,
                             **kwargs):
         """
         Method to fill the different user data in the checkout page.
 
         Args:
+            fill_mode(FillMode:optional:default=SCRIPT): SCRIPT sets all the fields in a
+                                                         single round trip, TYPING types
+                                                         them key by key as a user does.
             **kwargs: fields and data
         """
-        for key, value in kwargs.items():
-            self.fill_sing_checkout_info_element(key, value)
+        self.set_form_values(
+            {self._get_element_params(key=key): value for key, value in kwargs.items()},
+            mode=fill_mode
+        )
 
     def fill_sing_checkout_info_element(self,
                                         locator: tuple,
@@ -4,7 +4,8 @@ Home page class
 from enum import Enum
 from pages.base_pages import BasePage, BasePageException
 from utils.browser_manager import BrowserManagerException, SelectBy
-from utils.tools import YamlManager
+from utils.page_schema import get_page_inputs
+from utils.reference_cache import get_reference_cache
 
 
 class FilteringBy(str, Enum):
@@ -17,6 +18,14 @@ class FilteringBy(str, Enum):
     HIGH_TO_LOW = "Price (high to low)"
 
 
+class CartButton(str, Enum):
+    """
+    Enum class with the texts of the item cart button
+    """
+    ADD = "Add to cart"
+    REMOVE = "Remove"
+
+
 class HomePageException(Exception):
     """HomePageError"""
 
@@ -33,9 +42,7 @@ class HomePage(BasePage):
                  browser,
                  testing_page):
         super().__init__(browser)
-        self.page_dict = YamlManager.get_yaml_file_data(
-            testing_page
-        )["general_inputs"]["inventory_page"]
+        self.page_dict = get_page_inputs(testing_page, "inventory_page")
         self.testing_page = self.page_dict["path"]
 
     def click_on_lateral_menu(self):
@@ -72,23 +79,75 @@ class HomePage(BasePage):
         all_menu_items = self.get_lateral_menu_items()
         self.click_on_element(self._get_element_params(key="reset"), all_menu_items)
 
+    def get_catalog_index(self):
+        """
+        Returns the index of the catalog, built from a single bulk read of the inventory
+        and kept in the reference cache.
+
+        Returns:
+            dict: {item name: 'data-test' id of its title link}.
+        """
+        def scrape():
+            """Reads the name and the title link of every item in one round trip"""
+            rows = self.browser.get_elements_text_bulk(
+                self._get_element_params(key="items_list"),
+                {
+                    "name": self._get_element_params(key="item_name"),
+                    "link": self._get_element_params(key="item_link"),
+                },
+                attributes={"link": "data-test"}
+            )
+            return {row["name"]: row["link"] for row in rows if row["name"] and row["link"]}
+
+        return get_reference_cache().get(
+            f"catalog_index@{self.testing_page}",
+            scrape,
+            lambda: self.browser.get_text_fingerprint([self._get_element_params("item_name")])
+        )
+
+    def _get_item_link(self,
+                       item_name: str):
+        """Returns the 'data-test' id of the item title link, None if it isn't indexed"""
+        try:
+            return self.get_catalog_index().get(item_name)
+        except BrowserManagerException:
+            self.log.info("Unable to build the catalog index, looking for the item by its name")
+            return None
+
+    def _scan_inventory_item(self,
+                             expected_item_text: str):
+        """Looks for the item reading the name of every item in the inventory"""
+        list_of_items = self.get_inventory_items()
+        for item in list_of_items:
+            name = self.get_text_element(self._get_element_params(key="item_name"), driver=item)
+            if expected_item_text == name:
+                return item
+        raise HomePageException(f"Item wasn't found using text {expected_item_text}")
+
     def get_single_inventory_item(self,
                                   expected_item_text: str):
         """
         Looks into the inventory list based on its text, and gives back the item obj.
 
+        The item is located straight away through the catalog index. It falls back to
+        reading the name of every item when the item isn't indexed or the index is no
+        longer valid for the page.
+
         Args:
             expected_item_text(str): expected text item
         
         Returns:
             Webdriver obj: the items which matches the text
         """
-        list_of_items = self.get_inventory_items()
-        for item in list_of_items:
-            name = self.get_text_element(self._get_element_params(key="item_name"), driver=item)
-            if expected_item_text == name:
-                return item
-        raise HomePageException(f"Item wasn't found using text {expected_item_text}")
+        link = self._get_item_link(expected_item_text)
+        if link is not None:
+            try:
+                return self.get_webdriver_element_obj(
+                    self._get_element_params(key="item_by_link").format(link=link))
+            except BrowserManagerException:
+                self.log.info(f"Item {expected_item_text} not found through the catalog index")
+                get_reference_cache().invalidate(f"catalog_index@{self.testing_page}")
+        return self._scan_inventory_item(expected_item_text)
 
     def add_item_to_cart(self,
                          item):
@@ -110,24 +169,149 @@ class HomePage(BasePage):
         """
         self.click_on_element(self._get_element_params(key="remove_button"), item)
 
-    def get_num_items_in_cart(self):
+    def _read_cart_buttons(self):
+        """Reads the cart button text of every item in one round trip, by item name"""
+        rows = self.browser.get_elements_text_bulk(
+            self._get_element_params(key="items_list"),
+            {
+                "name": self._get_element_params(key="item_name"),
+                "button": self._get_element_params(key="add_to_cart_button"),
+            }
+        )
+        return {row["name"]: row["button"] for row in rows}
+
+    def _update_cart(self,
+                     item_names: list,
+                     button: CartButton):
         """
-        Gets the current items included in the cart.
+        Clicks, in a single round trip, the cart button of the items which don't show
+        'button' yet, and checks once at the end they all do.
+
+        Args:
+            item_names(list): names of the items.
+            button(CartButton): button text every item must end up showing.
 
         Returns:
             int: current quantity of items in the cart.
+
+        Raises:
+            HomePageException: If any item is not in the catalog or doesn't end up
+            showing 'button'.
         """
+        item_names = list(dict.fromkeys(item_names))
         try:
-            q_items = int(self.get_text_element(
-                self._get_element_params(key="cart_icon"),
-                timeout=1
-                )
-            )
-            self.log.info(f"The cart has currently {q_items} items")
-        except BrowserManagerException:
-            self.log.info("There is no item added in the cart")
-            q_items = 0
-        return q_items
+            index = self.get_catalog_index()
+            missing = [name for name in item_names if name not in index]
+            if missing:
+                raise HomePageException(f"Items {missing} are not in the catalog")
+            buttons = self._read_cart_buttons()
+            pending = [name for name in item_names if buttons.get(name) != button.value]
+            if pending:
+                clicked = self.browser.click_elements_bulk([
+                    self._get_element_params(key="button_by_link").format(link=index[name])
+                    for name in pending
+                ])
+                self.log.info(f"Clicked the cart button of {pending}: {clicked}")
+                buttons = self._read_cart_buttons()
+        except BrowserManagerException as e:
+            raise HomePageException(f"Unable to update the cart with {item_names}") from e
+        wrong = {name: buttons.get(name) for name in item_names
+                 if buttons.get(name) != button.value}
+        if wrong:
+            self.log.error(f"Items {wrong} don't show the '{button.value}' button")
+            raise HomePageException(f"Unable to update the cart with {list(wrong)}")
+        in_cart = sum(text == CartButton.REMOVE.value for text in buttons.values())
+        return self.get_num_items_in_cart(expected=in_cart)
+
+    def add_items_to_cart(self,
+                          item_names: list):
+        """
+        Adds the given items to the cart in a single batch, the items already in the
+        cart are left as they are.
+
+        Args:
+            item_names(list): names of the items to add.
+
+        Returns:
+            int: current quantity of items in the cart.
+
+        Raises:
+            HomePageException: If any item couldn't be added.
+        """
+        return self._update_cart(item_names, CartButton.REMOVE)
+
+    def remove_items_from_cart(self,
+                               item_names: list):
+        """
+        Removes the given items from the cart in a single batch, the items which are not
+        in the cart are left as they are.
+
+        Args:
+            item_names(list): names of the items to remove.
+
+        Returns:
+            int: current quantity of items in the cart.
+
+        Raises:
+            HomePageException: If any item couldn't be removed.
+        """
+        return self._update_cart(item_names, CartButton.ADD)
+
+    def _read_num_items_in_cart(self):
+        """Reads the cart badge right away, an empty cart has no badge"""
+        badge_text = self.browser.read_element_text(self._get_element_params(key="cart_icon"))
+        return int(badge_text) if badge_text else 0
+
+    def get_num_items_in_cart(self,
+                              expected=None,
+                              timeout=1):
+        """
+        Gets the current items included in the cart.
+
+        The badge, or its absence for an empty cart, is read right away. It only waits when
+        an 'expected' quantity is given and the badge doesn't show it yet.
+
+        Args:
+            expected(int:optional): quantity of items the cart should have.
+            timeout(int/float:optional:default=1): Timeout in seconds to wait for 'expected'.
+
+        Returns:
+            int: current quantity of items in the cart.
+        """
+        reads = [self._read_num_items_in_cart()]
+
+        def caught_up():
+            reads.append(self._read_num_items_in_cart())
+            return reads[-1] == expected
+
+        if expected is not None and reads[-1] != expected:
+            try:
+                self.browser.wait_until("cart_icon", caught_up, timeout)
+            except BrowserManagerException:
+                self.log.info(f"The cart badge didn't reach {expected} items")
+        self.log.info(f"The cart has currently {reads[-1]} items")
+        return reads[-1]
+
+    def get_catalog_prices(self):
+        """
+        Returns the price of every product in the catalog.
+
+        Unlike 'get_item_prices', which reads the page as it is currently sorted, the
+        catalog is scraped once and kept in the reference cache, so it is only meant for
+        reference data the test doesn't validate: a price which is checked against another
+        page has to be read with 'get_item_prices'.
+
+        Returns:
+            dict: {name1:price1, name2:price2, }
+        """
+        return get_reference_cache().get(
+            f"catalog_prices@{self.testing_page}",
+            self.get_item_prices,
+            lambda: self.browser.get_text_fingerprint([
+                self._get_element_params("item_name"),
+                self._get_element_params("item_price"),
+            ])
+        )
 
     def move_to_cart_page(self):
         """
@@ -143,17 +327,21 @@ class HomePage(BasePage):
         Args:
             item_name(str): name of the item we want to move to its page
         """
-        item = None
-        list_of_items = self.get_inventory_items()
-        for item in list_of_items:
-            tmp_name = self.get_text_element(self._get_element_params(key="item_name"), item)
-            if tmp_name == item_name:
-                break
-        if item is not None:
-            self.click_on_element(self._get_element_params(key="item_name"), item)
-        else:
+        link = self._get_item_link(item_name)
+        if link is not None:
+            try:
+                self.click_on_element(
+                    self._get_element_params(key="link_by_test_id").format(link=link))
+                return
+            except BrowserManagerException:
+                self.log.info(f"Item {item_name} not found through the catalog index")
+                get_reference_cache().invalidate(f"catalog_index@{self.testing_page}")
+        try:
+            item = self._scan_inventory_item(item_name)
+        except HomePageException as e:
             self.log.info(f"Make sure item {item_name} is in home page")
-            raise HomePageException(f"Unable to click on {item_name}")
+            raise HomePageException(f"Unable to click on {item_name}") from e
+        self.click_on_element(self._get_element_params(key="item_name"), item)
 
     def filter_products(self,
                         filter_option:str):
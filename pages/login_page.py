@@ -1,8 +1,11 @@
 """
 Login page class
 """
+import time
 from pages.base_pages import BasePage
-from utils.tools import YamlManager
+from utils.browser_manager import BrowserManagerException
+from utils.page_schema import get_page_inputs
+from utils.reference_cache import get_reference_cache
 
 
 class LoginPageException(Exception):
@@ -18,15 +21,23 @@ class LoginPage(BasePage):
     Attributes:
         LOGIN_PAGE_DICT (dict): Saves al the needed and/or relevant inputs for login page
         testing_page (str): Login page path
+        landing_page (str): Path of the page shown after a successful login
+        landing_ready (Locator): Readiness signal of the page shown after the login
+        EXPIRY_MARGIN (int): Seconds before its expiry a cached session is no longer used
     """
+    EXPIRY_MARGIN = 30
+    # authenticated session states by (login page, user), shared by the whole test session
+    _auth_states = {}
+
     def __init__(self,
                  browser,
                  testing_page):
         super().__init__(browser)
-        self.page_dict = YamlManager.get_yaml_file_data(
-            testing_page
-        )["general_inputs"]["login_page"]
+        self.page_dict = get_page_inputs(testing_page, "login_page")
         self.testing_page = self.page_dict["path"]
+        landing_inputs = get_page_inputs(testing_page, "inventory_page")
+        self.landing_page = landing_inputs["path"]
+        self.landing_ready = landing_inputs["ready"]
 
     def get_valid_credentials(self):
         """
@@ -36,6 +47,9 @@ class LoginPage(BasePage):
         the users from "Accepted usernames are", and the uniq valid password
         for all of them from  "Password for all users".
 
+        The credentials are scraped once and kept in the reference cache, so the later
+        calls, from any test or worker, don't read the page again.
+
         Returns:
             List: Dictionaries with valid user and its corresponding password.
         
@@ -43,7 +57,6 @@ class LoginPage(BasePage):
             >>> get_valid_credentials()
             [{'user': 'standard_user', 'password': 'secret_sauce'}, ....]
         """
-        valid_credentials = []
         def get_credential(key, init=0, end=-1):
             """
             Gets the 'By' method and the webdriver element to look for the user credetials and
@@ -52,11 +65,23 @@ class LoginPage(BasePage):
             return self._convert_text_to_list(
                 self.get_text_element(self._get_element_params(key)), "\n", init, end)
 
-        users = get_credential("valid_users", 1)
-        passwords = get_credential("valid_password", 1, 2)
-        for user in users:
-            valid_credentials.append({"user": user, "password": passwords[0]})
-        return valid_credentials
+        def scrape():
+            """Reads the valid users and their password from the page"""
+            valid_credentials = []
+            users = get_credential("valid_users", 1)
+            passwords = get_credential("valid_password", 1, 2)
+            for user in users:
+                valid_credentials.append({"user": user, "password": passwords[0]})
+            return valid_credentials
+
+        return get_reference_cache().get(
+            f"credentials@{self.testing_page}",
+            scrape,
+            lambda: self.browser.get_text_fingerprint([
+                self._get_element_params("valid_users"),
+                self._get_element_params("valid_password"),
+            ])
+        )
 
     def get_just_specific_user(self,
                                desired_user: str):
@@ -142,3 +167,64 @@ class LoginPage(BasePage):
             self._get_element_params(key="wrong_credential_error"),
             timeout=timeout
             )
+
+    @classmethod
+    def clear_auth_states(cls):
+        """
+        Forgets every cached authenticated session.
+        """
+        cls._auth_states.clear()
+
+    def _is_state_valid(self, state: dict) -> bool:
+        """Returns False if any cookie of the state expires within EXPIRY_MARGIN"""
+        deadline = time.time() + self.EXPIRY_MARGIN
+        return all(cookie.get("expiry") is None or cookie["expiry"] > deadline
+                   for cookie in state["cookies"])
+
+    def _is_logged_in(self) -> bool:
+        """Returns True if the browser is on the page shown after the login"""
+        return self.browser.get_current_driver_url().split("?")[0].endswith(self.landing_page)
+
+    def _wait_landing_ready(self, user: str) -> None:
+        """Confirms the page shown after the login is ready to be read"""
+        try:
+            self.browser.confirm_page_ready(self.landing_ready)
+        except BrowserManagerException as e:
+            raise LoginPageException(f"The page shown after login as {user} is not ready") from e
+
+    def login_as(self,
+                 user: str):
+        """
+        Logins with the given user reusing its session, for tests which just need to
+        start logged in.
+
+        The first call for a user logins through the UI and caches the cookies and
+        storage of the resulting session. Later calls inject them and open the landing
+        page straight away, skipping the credentials scraping, typing and click. The
+        cached session is dropped when one of its cookies is about to expire or the
+        site does not accept it, and the UI login is used again.
+
+        Args:
+            user (str): User name, one of the accepted users of the login page.
+
+        Raises:
+            LoginPageException: if the user is not a valid one or the login fails.
+        """
+        key = (self.testing_page, user)
+        state = self._auth_states.get(key)
+        if state is not None and self._is_state_valid(state):
+            self.log.info(f"Login as {user} with the cached session")
+            self.open_page()
+            self.browser.set_session_state(state)
+            self.browser.open_page(f"{self.testing_page}{self.landing_page}")
+            if self._is_logged_in():
+                self._wait_landing_ready(user)
+                return
+            self.log.info(f"The cached session of {user} is no longer accepted")
+        self._auth_states.pop(key, None)
+        self.open_page()
+        self.login_page(**self.get_just_specific_user(user))
+        if not self._is_logged_in():
+            raise LoginPageException(f"Unable to login as {user}")
+        self._wait_landing_ready(user)
+        self._auth_states[key] = self.browser.get_session_state()
@@ -2,7 +2,7 @@
 Login page class
 """
 from pages.base_pages import BasePage
-from utils.tools import YamlManager
+from utils.page_schema import get_page_inputs
 
 
 class ProductPageException(Exception):
@@ -23,9 +23,7 @@ class ProductPage(BasePage):
                  browser,
                  testing_page):
         super().__init__(browser)
-        self.page_dict = YamlManager.get_yaml_file_data(
-            testing_page
-        )["general_inputs"]["product_page"]
+        self.page_dict = get_page_inputs(testing_page, "product_page")
 
     def add_item_to_cart(self):
         """
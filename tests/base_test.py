@@ -54,13 +54,15 @@ class BaseTest:
         assert self.result.step_status
         return response
 
-    def step_execute_api_request(self, url, *args, **kwargs):
+    def step_execute_api_request(self, url, *args, api_request=None, **kwargs):
         """
         Step method to validate the correct execution of a api request
 
         Args:
             url(str): API's url
             *args(list): arguments
+            api_request(callable:optional): ApiManager method performing the request,
+                                            'get_api_response' by default.
             **kwargs(dict): arguments
 
         Returns:
@@ -69,7 +71,7 @@ class BaseTest:
 
         self.log.info(f"Try response from url={url}")
         response = self.step_check_execution_events(
-            ApiManager.get_api_response,
+            api_request or ApiManager.get_api_response,
             ApiManagerError,
             url, *args, **kwargs
         )
@@ -85,12 +87,10 @@ class BaseTest:
             step_msg="Check the it is successfully move the desired page"
         )
         assert self.result.step_status
-        # validate the current url vs the expected
-        expected_url = page_obj.testing_page
-        current_url = page_obj.get_current_url().split("/")[-1]
-        self.result.check_equals_to(
-            actual_value=current_url,
-            expected_value=expected_url,
-            step_msg=f"Check new page url {current_url} matches with the expected {expected_url}"
+        # validate the readiness signal of the expected page, instead of its url
+        self.result.check_not_raises_any_given_exception(
+            method=page_obj.wait_until_ready,
+            exceptions=BrowserManagerException,
+            step_msg=f"Check the {page_obj.__class__.__name__} is ready"
         )
         assert self.result.step_status
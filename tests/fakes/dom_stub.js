@@ -0,0 +1,174 @@
+// Minimal DOM to run the scripts of utils/dom_scripts.py in Node, without a browser.
+// It implements only what the scripts use: the css selectors are limited to '#id',
+// '.class', 'tag' and '[attribute="value"]', an element with a 'hidden' attribute is not
+// rendered, and document.evaluate (xpath) is not available.
+const events = [];
+const observers = new Set();
+
+function notify() {
+    observers.forEach(function (observer) { observer.callback([], observer); });
+}
+
+function matches(el, selector) {
+    const attribute = /^\[([\w-]+)="((?:[^"\\]|\\.)*)"\]$/.exec(selector);
+    if (attribute) {
+        return el.getAttribute(attribute[1]) === attribute[2].replace(/\\(.)/g, '$1');
+    }
+    if (selector.startsWith('#')) {
+        return el.getAttribute('id') === selector.slice(1);
+    }
+    if (selector.startsWith('.')) {
+        return el.classList.includes(selector.slice(1));
+    }
+    return el.tagName === selector.toUpperCase();
+}
+
+class Event {
+    constructor(type, init) {
+        this.type = type;
+        this.bubbles = Boolean(init && init.bubbles);
+    }
+}
+
+class Element {
+    constructor(tag, attributes, text, children) {
+        this.tagName = tag.toUpperCase();
+        this.attributes = Object.assign({}, attributes);
+        this.text = text || '';
+        this.children = [];
+        this.parentNode = null;
+        (children || []).forEach(child => this.appendChild(child));
+    }
+    get classList() {
+        return (this.attributes['class'] || '').split(/\s+/).filter(Boolean);
+    }
+    get isConnected() {
+        return this.parentNode !== null && this.parentNode.isConnected;
+    }
+    get innerText() {
+        if ('hidden' in this.attributes) {
+            return '';
+        }
+        return [this.text, ...this.children.map(child => child.innerText)].join('');
+    }
+    get disabled() {
+        return 'disabled' in this.attributes;
+    }
+    getAttribute(name) {
+        return name in this.attributes ? this.attributes[name] : null;
+    }
+    setAttribute(name, value) {
+        this.attributes[name] = String(value);
+        notify();
+    }
+    removeAttribute(name) {
+        delete this.attributes[name];
+        notify();
+    }
+    appendChild(child) {
+        child.parentNode = this;
+        this.children.push(child);
+        notify();
+        return child;
+    }
+    descendants() {
+        return this.children.flatMap(child => [child, ...child.descendants()]);
+    }
+    querySelectorAll(selector) {
+        return this.descendants().filter(el => matches(el, selector));
+    }
+    getElementsByClassName(name) {
+        return this.querySelectorAll('.' + name);
+    }
+    getElementsByTagName(name) {
+        return this.querySelectorAll(name);
+    }
+    getClientRects() {
+        return 'hidden' in this.attributes ? [] : [{}];
+    }
+    click() {
+        events.push(['click', this.getAttribute('id')]);
+    }
+    focus() {
+        events.push(['focus', this.getAttribute('id')]);
+    }
+    blur() {
+        events.push(['blur', this.getAttribute('id')]);
+    }
+    dispatchEvent(event) {
+        events.push([event.type, this.getAttribute('id')]);
+        return true;
+    }
+}
+
+class InputElement extends Element {
+    constructor(tag, attributes, text, children) {
+        super(tag, attributes, text, children);
+        this.current = this.getAttribute('value') || '';
+    }
+    get value() {
+        return this.current;
+    }
+    set value(text) {
+        this.current = String(text);
+    }
+}
+
+class Document extends Element {
+    constructor() {
+        super('#document');
+    }
+    get isConnected() {
+        return true;
+    }
+}
+
+class Storage {
+    constructor() {
+        this.items = new Map();
+    }
+    get length() {
+        return this.items.size;
+    }
+    key(index) {
+        const keys = Array.from(this.items.keys());
+        return index < keys.length ? keys[index] : null;
+    }
+    getItem(key) {
+        return this.items.has(key) ? this.items.get(key) : null;
+    }
+    setItem(key, value) {
+        this.items.set(key, String(value));
+    }
+}
+
+class MutationObserver {
+    constructor(callback) {
+        this.callback = callback;
+    }
+    observe() {
+        observers.add(this);
+    }
+    disconnect() {
+        observers.delete(this);
+    }
+}
+
+// h('input', {id: 'x'}) builds an element, with its text and children
+function h(tag, attributes, text, children) {
+    const type = tag === 'input' ? InputElement : Element;
+    return new type(tag, attributes, text, children);
+}
+
+function byId(id) {
+    return document.querySelectorAll('#' + id)[0];
+}
+
+const document = new Document();
+const window = {
+    localStorage: new Storage(),
+    sessionStorage: new Storage(),
+    getComputedStyle: function (el) {
+        return {display: 'hidden' in el.attributes ? 'none' : 'block', visibility: 'visible'};
+    },
+};
@@ -0,0 +1,807 @@
+"""
+Fake webdriver file, an in-memory browser backend for page-object unit tests.
+
+The fake driver works on the parsed HTML fixtures from 'tests/test_inputs/html' with an
+lxml DOM, and a small scripted state machine ('FakeSauceDemo') reproduces the login,
+cart and checkout flows of https://www.saucedemo.com/, so BrowserManager and the page
+objects can be exercised without a real browser.
+
+The scripts of 'utils.dom_scripts' are not run here: each one is answered by a Python
+equivalent from SCRIPT_HANDLERS, so the page-object tests don't cover the javascript
+itself. The snippets are run in Node by 'tests/test_dom_scripts.py' instead.
+"""
+import json
+import os
+import re
+from urllib.parse import parse_qs, urlsplit
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    InvalidSelectorException,
+    JavascriptException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    WebDriverException
+)
+from selenium.webdriver.common.by import By
+from utils.dom_scripts import (
+    CLICK_ALL_JS,
+    ELEMENT_TEXT_JS,
+    FILL_FORM_JS,
+    GET_STORAGE_JS,
+    ITEMS_TEXT_JS,
+    SET_STORAGE_JS,
+    TEXT_FINGERPRINT_JS,
+    WAIT_FOR_ELEMENT_JS,
+    text_fingerprint
+)
+
+FIXTURES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_inputs", "html")
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "nav", "ol", "option", "p", "pre", "section", "table", "tr", "ul",
+}
+NOT_RENDERED_TAGS = {"head", "script", "style", "template", "title", "meta", "link"}
+XPATH_BY = {
+    By.ID: "descendant::*[@id=$value]",
+    By.NAME: "descendant::*[@name=$value]",
+    By.TAG_NAME: "descendant::*[local-name()=$value]",
+    By.CLASS_NAME: "descendant::*[contains(concat(' ', normalize-space(@class), ' '), "
+                   "concat(' ', $value, ' '))]",
+    By.LINK_TEXT: "descendant::a[normalize-space(.)=$value]",
+    By.PARTIAL_LINK_TEXT: "descendant::a[contains(normalize-space(.), $value)]",
+}
+
+
+def find_nodes(context, by, value) -> list:
+    """
+    Returns the lxml nodes under 'context' which match the selenium locator.
+
+    Args:
+        context(lxml element): node where the search starts.
+        by(str): selenium By value.
+        value(str): locator value.
+
+    Returns:
+        list: matching nodes in document order.
+
+    Raises:
+        InvalidSelectorException: If the locator can not be evaluated.
+    """
+    try:
+        if by == By.XPATH:
+            nodes = context.xpath(value)
+        elif by == By.CSS_SELECTOR:
+            nodes = [node for node in CSSSelector(value, translator="html")(context)
+                     if node is not context]
+        elif by in XPATH_BY:
+            nodes = context.xpath(XPATH_BY[by], value=value)
+        else:
+            raise InvalidSelectorException(f"Unknown locator strategy {by}")
+    except InvalidSelectorException:
+        raise
+    except Exception as e:
+        raise InvalidSelectorException(f"Invalid selector ({by}, {value})") from e
+    return [node for node in nodes if isinstance(node.tag, str)]
+
+
+def is_node_displayed(node) -> bool:
+    """Returns False if the node or any of its ancestors is hidden"""
+    if node.tag == "input" and node.get("type") == "hidden":
+        return False
+    while node is not None:
+        if node.tag in NOT_RENDERED_TAGS or node.get("hidden") is not None:
+            return False
+        if re.search(r"display\s*:\s*none", node.get("style", "")):
+            return False
+        node = node.getparent()
+    return True
+
+
+def top_ancestor(node):
+    """Returns the outermost ancestor of the node, the node itself if it has no parent"""
+    parent = node.getparent()
+    while parent is not None:
+        node, parent = parent, parent.getparent()
+    return node
+
+
+def visible_text(node) -> str:
+    """Returns the rendered text of the node as selenium would do, one line per block"""
+    lines, current = [], []
+
+    def flush():
+        line = re.sub(r"\s+", " ", "".join(current)).strip()
+        if line:
+            lines.append(line)
+        current.clear()
+
+    def walk(element):
+        if element.tag in BLOCK_TAGS:
+            flush()
+        if element.text:
+            current.append(element.text)
+        for child in element:
+            if isinstance(child.tag, str) and is_node_displayed(child):
+                walk(child)
+            if child.tail:
+                current.append(child.tail)
+        if element.tag in BLOCK_TAGS:
+            flush()
+
+    if not is_node_displayed(node):
+        return ""
+    walk(node)
+    flush()
+    return "\n".join(lines)
+
+
+def _items_text(driver, context, items, fields) -> list:
+    """Python equivalent of ITEMS_TEXT_JS"""
+    root = context.node if context is not None else driver.document
+    rows = []
+    for item in find_nodes(root, *items):
+        row = {}
+        for key, by, value, attribute in fields:
+            nodes = find_nodes(item, by, value)
+            if not nodes:
+                row[key] = None
+            else:
+                row[key] = nodes[0].get(attribute) if attribute else visible_text(nodes[0])
+        rows.append(row)
+    return rows
+
+
+def _element_text(driver, context, by, value):
+    """Python equivalent of ELEMENT_TEXT_JS"""
+    root = context.node if context is not None else driver.document
+    nodes = find_nodes(root, by, value)
+    return visible_text(nodes[0]) if nodes else None
+
+
+def _wait_for_element(driver, context, by, value, condition, _timeout_ms):
+    """
+    Python equivalent of WAIT_FOR_ELEMENT_JS, the in-memory DOM only changes on driver
+    commands, so the condition is checked once and a miss is an immediate timeout.
+    """
+    root = context.node if context is not None else driver.document
+    nodes = find_nodes(root, by, value)
+    if not nodes:
+        return None
+    if condition != "present" and not is_node_displayed(nodes[0]):
+        return None
+    if condition == "clickable" and nodes[0].get("disabled") is not None:
+        return None
+    return FakeWebElement(driver, nodes[0])
+
+
+def _get_storage(driver):
+    """Python equivalent of GET_STORAGE_JS"""
+    return {"local": dict(driver.local_storage), "session": dict(driver.session_storage)}
+
+
+def _set_storage(driver, local, session):
+    """Python equivalent of SET_STORAGE_JS"""
+    driver.local_storage.update(local or {})
+    driver.session_storage.update(session or {})
+
+
+def _text_fingerprint(driver, context, locators):
+    """Python equivalent of TEXT_FINGERPRINT_JS"""
+    root = context.node if context is not None else driver.document
+    return text_fingerprint(
+        visible_text(node) for by, value in locators for node in find_nodes(root, by, value))
+
+
+def _click_all(driver, context, locators):
+    """Python equivalent of CLICK_ALL_JS"""
+    clicked = []
+    for by, value in locators:
+        # every click can render the page again, so each locator is evaluated afresh
+        root = context.node if context is not None else driver.document
+        nodes = find_nodes(root, by, value)
+        if nodes:
+            driver.app.on_click(driver, nodes[0])
+        clicked.append(bool(nodes))
+    return clicked
+
+
+def _fill_form(driver, context, fields):
+    """Python equivalent of FILL_FORM_JS"""
+    root = context.node if context is not None else driver.document
+    values = []
+    for by, value, text in fields:
+        nodes = find_nodes(root, by, value)
+        if nodes:
+            nodes[0].set("value", text)
+        values.append(nodes[0].get("value") if nodes else None)
+    return values
+
+
+# python handlers of the scripts from utils.dom_scripts, they stand in for the javascript,
+# which is only run by tests/test_dom_scripts.py
+SCRIPT_HANDLERS = {
+    CLICK_ALL_JS: _click_all,
+    ELEMENT_TEXT_JS: _element_text,
+    FILL_FORM_JS: _fill_form,
+    GET_STORAGE_JS: _get_storage,
+    ITEMS_TEXT_JS: _items_text,
+    SET_STORAGE_JS: _set_storage,
+    TEXT_FINGERPRINT_JS: _text_fingerprint,
+    WAIT_FOR_ELEMENT_JS: _wait_for_element,
+}
+
+
+class FakeWebElement:
+    """
+    WebElement-like wrapper of an lxml node.
+
+    Attributes:
+        parent(FakeWebDriver): driver which owns the element.
+        node(lxml element): wrapped node.
+    """
+
+    def __init__(self, driver, node):
+        self.parent = driver
+        self.node = node
+        self._generation = driver.generation
+        # keeps the node proxy alive, so the element id is stable as in a real driver
+        driver.nodes[id(node)] = node
+
+    def __eq__(self, other):
+        return isinstance(other, FakeWebElement) and other.node is self.node
+
+    def __hash__(self):
+        return hash(self.id)
+
+    @property
+    def id(self):  # pylint: disable=invalid-name
+        """Unique id of the element, as a webdriver element reference"""
+        return f"fake-{id(self.node)}"
+
+    def _check(self):
+        """Counts a driver command and validates the element still belongs to the page"""
+        self.parent.command_count += 1
+        if self._generation != self.parent.generation or \
+                top_ancestor(self.node) is not self.parent.document:
+            raise StaleElementReferenceException("Element is no longer attached to the DOM")
+
+    def _check_interactable(self):
+        self._check()
+        if not is_node_displayed(self.node):
+            raise ElementNotInteractableException("Element is not visible")
+
+    @property
+    def tag_name(self) -> str:
+        """Tag name of the element"""
+        self._check()
+        return self.node.tag
+
+    @property
+    def text(self) -> str:
+        """Visible text of the element"""
+        self._check()
+        return visible_text(self.node)
+
+    def get_attribute(self, name):
+        """Returns the property or attribute 'name' of the element"""
+        self._check()
+        if name == "index" and self.node.tag == "option":
+            return str(self.node.getparent().index(self.node))
+        return self.node.get(name)
+
+    def get_dom_attribute(self, name):
+        """Returns the attribute 'name' of the element"""
+        self._check()
+        return self.node.get(name)
+
+    def get_property(self, name):
+        """Returns the property 'name' of the element"""
+        return self.get_attribute(name)
+
+    def is_displayed(self) -> bool:
+        """Returns True if the element is visible"""
+        self._check()
+        return is_node_displayed(self.node)
+
+    def is_enabled(self) -> bool:
+        """Returns True if the element is not disabled"""
+        self._check()
+        return self.node.get("disabled") is None
+
+    def is_selected(self) -> bool:
+        """Returns True if the option or checkbox is selected"""
+        self._check()
+        return self.node.get("selected") is not None or self.node.get("checked") is not None
+
+    def click(self) -> None:
+        """Clicks on the element, the application state machine handles the event"""
+        self._check_interactable()
+        self.parent.app.on_click(self.parent, self.node)
+
+    def clear(self) -> None:
+        """Clears the value of the input"""
+        self._check_interactable()
+        self.node.set("value", "")
+
+    def send_keys(self, *value) -> None:
+        """Types the given text in the input"""
+        self._check_interactable()
+        self.node.set("value", self.node.get("value", "") + "".join(str(val) for val in value))
+
+    def find_element(self, by=By.ID, value=None):
+        """Returns the first descendant which matches the locator"""
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element ({by}, {value})")
+        return elements[0]
+
+    def find_elements(self, by=By.ID, value=None) -> list:
+        """Returns every descendant which matches the locator"""
+        self._check()
+        return [FakeWebElement(self.parent, node) for node in find_nodes(self.node, by, value)]
+
+
+class _FakeSwitchTo:
+    """switch_to replacement, only windows are supported"""
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        """Switches to the given window handle"""
+        self._driver.command_count += 1
+        if handle not in self._driver.window_handles:
+            raise NoSuchWindowException(f"No window {handle}")
+        self._driver.current_window_handle = handle
+
+
+class FakeWebDriver:
+    """
+    WebDriver-like in-memory browser.
+
+    Every call which would be an HTTP round trip to a real driver increments
+    'command_count', so tests can measure how many round trips an action costs.
+
+    Attributes:
+        app(FakeSauceDemo): scripted application behind the pages.
+        base_url(str): url of the application.
+        command_count(int): driver round trips done so far.
+        cookies(dict): cookies by name.
+        local_storage(dict): window.localStorage content.
+        session_storage(dict): window.sessionStorage content.
+        nodes(dict): nodes of the current document handed out as elements, by id.
+        name(str): browser name, as given by a real driver, so the fake latencies are
+                   kept apart from the ones of real browsers.
+    """
+    name = "fake"
+
+    def __init__(self, app=None, base_url="https://www.saucedemo.com/"):
+        self.app = app or FakeSauceDemo()
+        self.base_url = base_url
+        self.command_count = 0
+        self.generation = 0
+        self.cookies = {}
+        self.local_storage = {}
+        self.session_storage = {}
+        self.window_handles = ["fake-window-0"]
+        self.current_window_handle = self.window_handles[0]
+        self.switch_to = _FakeSwitchTo(self)
+        self.scripts = dict(SCRIPT_HANDLERS)
+        self.document = None
+        self.nodes = {}
+        self._url = "about:blank"
+        self.load("about:blank")
+
+    def load(self, url: str, document=None) -> None:
+        """
+        Replaces the current document, every previous element becomes stale.
+
+        Args:
+            url(str): new url.
+            document(lxml element:optional): parsed page, an empty page by default.
+        """
+        self._url = url
+        self.generation += 1
+        self.nodes = {}
+        self.document = document if document is not None else lxml_html.fromstring(
+            "<html><head></head><body></body></html>")
+
+    def navigate(self, path: str) -> None:
+        """Navigates to a path of the application, without counting a command"""
+        self.app.open(self, path)
+
+    @property
+    def path(self) -> str:
+        """Path of the current page relative to the base url, without counting a command"""
+        return urlsplit(self._url[len(self.base_url):]).path
+
+    def get(self, url: str) -> None:
+        """Opens the given url"""
+        self.command_count += 1
+        if url == "about:blank":
+            self.load(url)
+            return
+        if not url.startswith(self.base_url):
+            raise WebDriverException(f"unknown error: net::ERR_NAME_NOT_RESOLVED ({url})")
+        self.navigate(url[len(self.base_url):])
+
+    @property
+    def current_url(self) -> str:
+        """Url of the current page"""
+        self.command_count += 1
+        return self._url
+
+    @property
+    def title(self) -> str:
+        """Title of the current page"""
+        self.command_count += 1
+        return self.document.findtext(".//title") or ""
+
+    @property
+    def page_source(self) -> str:
+        """Serialized current document"""
+        self.command_count += 1
+        return lxml_html.tostring(self.document, encoding="unicode")
+
+    def find_element(self, by=By.ID, value=None):
+        """Returns the first element of the page which matches the locator"""
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element ({by}, {value})")
+        return elements[0]
+
+    def find_elements(self, by=By.ID, value=None) -> list:
+        """Returns every element of the page which matches the locator"""
+        self.command_count += 1
+        return [FakeWebElement(self, node) for node in find_nodes(self.document, by, value)]
+
+    def register_script(self, script: str, handler) -> None:
+        """
+        Registers the python equivalent of a script for 'execute_script'.
+
+        Args:
+            script(str): javascript source as sent by the caller.
+            handler(callable): handler(driver, *args) returning the script result.
+        """
+        self.scripts[script] = handler
+
+    def execute_script(self, script, *args):
+        """Runs the python handler registered for the given script"""
+        self.command_count += 1
+        handler = self.scripts.get(script) or self.app.scripts.get(script)
+        if handler is None:
+            raise JavascriptException("Script is not supported by the fake driver")
+        return handler(self, *args)
+
+    def execute_async_script(self, script, *args):
+        """Runs the python handler registered for the given async script"""
+        return self.execute_script(script, *args)
+
+    def set_script_timeout(self, time_to_wait) -> None:
+        """Nothing to wait for in memory"""
+
+    def implicitly_wait(self, time_to_wait) -> None:
+        """Nothing to wait for in memory"""
+
+    def get_cookies(self) -> list:
+        """Returns the cookies of the session"""
+        self.command_count += 1
+        return [dict(cookie) for cookie in self.cookies.values()]
+
+    def get_cookie(self, name):
+        """Returns the cookie 'name' if it exists"""
+        self.command_count += 1
+        return self.cookies.get(name)
+
+    def add_cookie(self, cookie_dict: dict) -> None:
+        """Adds a cookie to the session"""
+        self.command_count += 1
+        self.cookies[cookie_dict["name"]] = dict(cookie_dict)
+
+    def delete_cookie(self, name) -> None:
+        """Removes the cookie 'name'"""
+        self.command_count += 1
+        self.cookies.pop(name, None)
+
+    def delete_all_cookies(self) -> None:
+        """Removes every cookie"""
+        self.command_count += 1
+        self.cookies.clear()
+
+    def close(self) -> None:
+        """Closes the current window"""
+        self.command_count += 1
+        if len(self.window_handles) > 1:
+            self.window_handles.remove(self.current_window_handle)
+
+    def quit(self) -> None:
+        """Ends the session"""
+        self.command_count += 1
+        self.load("about:blank")
+
+
+class FakeSauceDemo:
+    """
+    Scripted state machine of https://www.saucedemo.com/ over the HTML fixtures.
+
+    The logged user lives in the 'session-username' cookie and the cart in the
+    'cart-contents' localStorage key, as the real site does.
+
+    Attributes:
+        fixtures_dir(str): folder with the html fixtures.
+        catalog(dict): {item id: {"name", "price", "slug"}} read from the inventory fixture.
+        scripts(dict): python handlers for scripts the application answers.
+    """
+    PASSWORD = "secret_sauce"
+    USERS = (
+        "standard_user", "locked_out_user", "problem_user",
+        "performance_glitch_user", "error_user", "visual_user",
+    )
+    LOCKED_USERS = ("locked_out_user",)
+    PAGES = {
+        "": "login.html",
+        "inventory.html": "inventory.html",
+        "cart.html": "cart.html",
+        "inventory-item.html": "inventory-item.html",
+        "checkout-step-one.html": "checkout-step-one.html",
+        "checkout-step-two.html": "checkout-step-two.html",
+        "checkout-complete.html": "checkout-complete.html",
+    }
+    SORTS = {
+        "az": (lambda item: item["name"], False),
+        "za": (lambda item: item["name"], True),
+        "lohi": (lambda item: float(item["price"]), False),
+        "hilo": (lambda item: float(item["price"]), True),
+    }
+    CHECKOUT_FIELDS = (
+        ("first-name", "Error: First Name is required"),
+        ("last-name", "Error: Last Name is required"),
+        ("postal-code", "Error: Postal Code is required"),
+    )
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.scripts = {}
+        self.sort = "az"
+        self._fixtures = {}
+        self.catalog = {}
+        for node in self._parse("inventory.html").find_class("inventory_item"):
+            link = node.xpath(".//a[contains(@id, '_title_link')]")[0]
+            item_id = int(link.get("id").split("_")[1])
+            self.catalog[item_id] = {
+                "name": visible_text(node.find_class("inventory_item_name")[0]),
+                "price": visible_text(node.find_class("inventory_item_price")[0]).lstrip("$"),
+                "slug": node.find_class("btn_inventory")[0].get("id")[len("add-to-cart-"):],
+            }
+
+    def _parse(self, fixture: str):
+        """Returns a fresh parsed copy of the fixture"""
+        if fixture not in self._fixtures:
+            with open(os.path.join(self.fixtures_dir, fixture), "r", encoding="utf-8") as file:
+                self._fixtures[fixture] = file.read()
+        return lxml_html.fromstring(self._fixtures[fixture])
+
+    @staticmethod
+    def cart(driver) -> list:
+        """Returns the item ids in the cart"""
+        return json.loads(driver.local_storage.get("cart-contents", "[]"))
+
+    @staticmethod
+    def set_cart(driver, cart: list) -> None:
+        """Stores the item ids in the cart"""
+        if cart:
+            driver.local_storage["cart-contents"] = json.dumps(cart)
+        else:
+            driver.local_storage.pop("cart-contents", None)
+
+    @staticmethod
+    def logged_user(driver):
+        """Returns the user of the session, None if nobody is logged"""
+        cookie = driver.cookies.get("session-username")
+        return cookie["value"] if cookie else None
+
+    def open(self, driver, path: str) -> None:
+        """
+        Loads the page for 'path' and renders the current state on it.
+
+        Args:
+            driver(FakeWebDriver): driver which navigates.
+            path(str): path relative to the base url, query string included.
+        """
+        parts = urlsplit(path)
+        page = parts.path.lstrip("/")
+        if page not in self.PAGES:
+            driver.load(f"{driver.base_url}{path}", lxml_html.fromstring(
+                "<html><body><h1>404 Not Found</h1></body></html>"))
+            return
+        error = None
+        if page and self.logged_user(driver) is None:
+            error = f"Epic sadface: You can only access '/{page}' when you are logged in."
+            page, path = "", ""
+        driver.load(f"{driver.base_url}{path}", self._parse(self.PAGES[page]))
+        if page == "inventory-item.html":
+            item_id = parse_qs(parts.query).get("id", ["-1"])[0]
+            for node in driver.document.find_class("inventory_details_container"):
+                if node.get("data-item-id") != item_id:
+                    node.drop_tree()
+        if page in ("cart.html", "checkout-step-two.html"):
+            cart = self.cart(driver)
+            for node in driver.document.find_class("cart_item"):
+                if int(node.get("data-item-id")) not in cart:
+                    node.drop_tree()
+            for node in driver.document.find_class("summary_subtotal_label"):
+                total = sum(float(self.catalog[item_id]["price"]) for item_id in cart)
+                node.text = f"Item total: ${total:g}"
+        if error:
+            self._show_error(driver, error)
+        self.render(driver)
+
+    def render(self, driver) -> None:
+        """Applies the cart and sort state on the current document, in place"""
+        document = driver.document
+        cart = self.cart(driver)
+        for link in document.find_class("shopping_cart_link"):
+            # as react does, the badge text is updated in place and it is only
+            # removed once the cart is empty
+            badges = link.find_class("shopping_cart_badge")
+            for badge in badges[1:] if cart else badges:
+                badge.drop_tree()
+            if cart and badges:
+                badges[0].text = str(len(cart))
+            elif cart:
+                badge = lxml_html.fragment_fromstring(
+                    '<span class="shopping_cart_badge" data-test="shopping-cart-badge">'
+                    f'{len(cart)}</span>')
+                link.append(badge)
+        for button in document.find_class("btn_inventory"):
+            item_id = self._button_item(document, button)
+            slug = "" if item_id is None else f"-{self.catalog[item_id]['slug']}"
+            if button.get("id") in ("add-to-cart", "remove"):
+                slug = ""
+            in_cart = item_id in cart
+            name = f"{'remove' if in_cart else 'add-to-cart'}{slug}"
+            for attribute in ("id", "name", "data-test"):
+                button.set(attribute, name)
+            button.text = "Remove" if in_cart else "Add to cart"
+            button.set("class", "btn btn_secondary btn_small btn_inventory"
+                       if in_cart else "btn btn_primary btn_small btn_inventory")
+        for select in document.find_class("product_sort_container"):
+            self._apply_sort(document, select)
+
+    def _button_item(self, document, button):
+        """Returns the item id the inventory button belongs to"""
+        container = button.xpath("ancestor::*[@data-item-id][1]")
+        if container:
+            return int(container[0].get("data-item-id"))
+        for item_id, item in self.catalog.items():
+            if button.get("id", "").endswith(f"-{item['slug']}"):
+                return item_id
+        details = document.find_class("inventory_details_container")
+        return int(details[0].get("data-item-id")) if details else None
+
+    def _apply_sort(self, document, select) -> None:
+        """Reorders the inventory list according to the selected sort"""
+        key, reverse = self.SORTS[self.sort]
+        for option in select.iter("option"):
+            if option.get("value") == self.sort:
+                option.set("selected", "selected")
+                for active in document.find_class("active_option"):
+                    active.text = visible_text(option)
+            elif option.get("selected") is not None:
+                del option.attrib["selected"]
+        for inventory in document.find_class("inventory_list"):
+            nodes = {}
+            for node in inventory.find_class("inventory_item"):
+                link = node.xpath(".//a[contains(@id, '_title_link')]")[0]
+                nodes[int(link.get("id").split("_")[1])] = node
+            ordered = sorted(nodes, key=lambda item_id: key(self.catalog[item_id]),
+                             reverse=reverse)
+            for item_id in ordered:
+                inventory.append(nodes[item_id])
+
+    @staticmethod
+    def _show_error(driver, message: str) -> None:
+        """Shows the error message of the login or checkout form"""
+        for container in driver.document.find_class("error-message-container"):
+            container.set("class", "error-message-container error")
+            for child in list(container):
+                child.drop_tree()
+            container.append(lxml_html.fragment_fromstring(
+                f'<h3 data-test="error">{message}</h3>'))
+
+    @staticmethod
+    def _value(driver, element_id: str) -> str:
+        """Returns the value typed in the input 'element_id'"""
+        nodes = driver.document.xpath("//*[@id=$value]", value=element_id)
+        return nodes[0].get("value", "") if nodes else ""
+
+    def _login(self, driver) -> None:
+        """Handles the click on the login button"""
+        user = self._value(driver, "user-name")
+        password = self._value(driver, "password")
+        if not user:
+            self._show_error(driver, "Epic sadface: Username is required")
+        elif not password:
+            self._show_error(driver, "Epic sadface: Password is required")
+        elif user not in self.USERS or password != self.PASSWORD:
+            self._show_error(
+                driver, "Epic sadface: Username and password do not match any user in this service")
+        elif user in self.LOCKED_USERS:
+            self._show_error(driver, "Epic sadface: Sorry, this user has been locked out.")
+        else:
+            driver.cookies["session-username"] = {
+                "name": "session-username", "value": user, "path": "/"}
+            driver.navigate("inventory.html")
+
+    def _checkout_continue(self, driver) -> None:
+        """Handles the click on the continue button of the checkout information"""
+        for element_id, error in self.CHECKOUT_FIELDS:
+            if not self._value(driver, element_id):
+                self._show_error(driver, error)
+                return
+        driver.navigate("checkout-step-two.html")
+
+    def on_click(self, driver, node) -> None:  # pylint: disable=too-many-branches
+        """
+        Reacts to a click on the given node.
+
+        Args:
+            driver(FakeWebDriver): driver where the click happened.
+            node(lxml element): clicked node.
+        """
+        link = node if node.tag in ("a", "button", "input", "option") else \
+            next(iter(node.xpath("ancestor::a[1]")), node)
+        element_id = link.get("id", "")
+        page = driver.path
+        item_link = re.match(r"item_(\d+)_(title|img)_link$", element_id)
+        if link.tag == "option":
+            self.sort = link.get("value")
+            self.render(driver)
+        elif element_id == "login-button":
+            self._login(driver)
+        elif item_link:
+            driver.navigate(f"inventory-item.html?id={item_link.group(1)}")
+        elif "btn_inventory" in link.get("class", "") or element_id.startswith("remove-"):
+            cart = self.cart(driver)
+            item_id = self._button_item(driver.document, link)
+            if item_id in cart:
+                cart.remove(item_id)
+            else:
+                cart.append(item_id)
+            self.set_cart(driver, cart)
+            if page == "cart.html":
+                driver.navigate(page)
+            else:
+                self.render(driver)
+        elif "shopping_cart_link" in link.get("class", ""):
+            driver.navigate("cart.html")
+        elif element_id in ("react-burger-menu-btn", "react-burger-cross-btn"):
+            for menu in driver.document.find_class("bm-menu-wrap"):
+                if element_id == "react-burger-menu-btn":
+                    menu.attrib.pop("hidden", None)
+                    menu.set("aria-hidden", "false")
+                else:
+                    menu.set("hidden", "hidden")
+                    menu.set("aria-hidden", "true")
+        elif element_id == "logout_sidebar_link":
+            driver.cookies.pop("session-username", None)
+            driver.navigate("")
+        elif element_id == "reset_sidebar_link":
+            self.set_cart(driver, [])
+            self.render(driver)
+        elif element_id in ("inventory_sidebar_link", "back-to-products", "continue-shopping"):
+            driver.navigate("inventory.html")
+        elif element_id == "checkout":
+            driver.navigate("checkout-step-one.html")
+        elif element_id == "continue":
+            self._checkout_continue(driver)
+        elif element_id == "cancel":
+            driver.navigate("cart.html" if page == "checkout-step-one.html" else "inventory.html")
+        elif element_id == "finish":
+            self.set_cart(driver, [])
+            driver.navigate("checkout-complete.html")
@@ -0,0 +1,205 @@
+"""
+API server unit tests, serving the users API in process on an ephemeral port
+"""
+import json
+import time
+from itertools import chain
+import pytest
+import requests
+from tests.base_test import BaseTest
+from utils.api import APIServer, APIServerException, UsersAPI
+from utils.tools import ApiManager, ApiManagerError
+from utils.user_store import MemoryUserStore, MongoUserStore, UserStoreException, seed_users
+
+UNREACHABLE_MONGO = "mongodb://127.0.0.1:1/?directConnection=true"
+
+
+@pytest.mark.Unit
+class TestAPIServer(BaseTest):
+    """
+    Test class to validate the in-process API server.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, result):  # pylint: disable=arguments-differ
+        super().setup(None, result)
+
+    def test_ephemeral_ports(self):
+        """
+        Check several servers start in milliseconds on their own ports and answer right
+        away.
+        """
+        start_time = time.perf_counter()
+        with APIServer(MemoryUserStore()) as first, APIServer(MemoryUserStore()) as second:
+            startup = time.perf_counter() - start_time
+            self.result.check_equals_to(
+                actual_value=first.port != second.port and startup < 1,
+                expected_value=True,
+                step_msg=f"Check both servers started on their own port, in {startup:.3f}s"
+            )
+            assert self.result.step_status
+            self.result.check_equals_to(
+                actual_value=requests.get(first.url, timeout=5).json(),
+                expected_value={"message": "API Flask with MongoDB"},
+                step_msg="Check the server answers once started"
+            )
+            assert self.result.step_status
+        with pytest.raises(requests.ConnectionError):
+            requests.get(first.url, timeout=5)
+
+    def test_users_routes(self):
+        """
+        Check an added user is returned, filtered by its fields.
+        """
+        user = {"first_name": "Juan", "last_name": "Camaney", "zip_code": "12345"}
+        with APIServer(MemoryUserStore()) as server:
+            response = requests.post(f"{server.url}/add_user", json=user, timeout=5)
+            self.result.check_equals_to(
+                actual_value=response.status_code,
+                expected_value=201,
+                step_msg="Check the user is added"
+            )
+            assert self.result.step_status
+            self.result.check_equals_to(
+                actual_value=(
+                    requests.get(f"{server.url}/users?last_name=Camaney", timeout=5).json(),
+                    requests.get(f"{server.url}/users?last_name=Doe", timeout=5).json()),
+                expected_value=([user], []),
+                step_msg="Check the users are filtered by their fields"
+            )
+            assert self.result.step_status
+
+    def test_paginated_users(self):
+        """
+        Check the users are iterated page by page with the requested fields, and streamed
+        as json lines.
+        """
+        store = MemoryUserStore()
+        seed_users(store, count=25)
+        expected = store.find(fields=["first_name"])
+        with APIServer(store) as server:
+            pages = list(ApiManager.iter_api_pages(
+                f"{server.url}/users", limit=10, fields="first_name"))
+            self.result.check_equals_to(
+                actual_value=([len(page) for page in pages], sum(pages, [])),
+                expected_value=([10, 10, 5], expected),
+                step_msg="Check every user is returned once, a page at a time"
+            )
+            assert self.result.step_status
+            response = requests.get(
+                f"{server.url}/users?format=ndjson&batch_size=7&fields=first_name",
+                stream=True, timeout=5)
+            self.result.check_equals_to(
+                actual_value=(response.headers["Content-Type"],
+                              [json.loads(line) for line in response.iter_lines()]),
+                expected_value=("application/x-ndjson", expected),
+                step_msg="Check the users are streamed as json lines"
+            )
+            assert self.result.step_status
+            self.result.check_equals_to(
+                actual_value=(requests.get(f"{server.url}/users?after=-2", timeout=5).status_code,
+                              requests.get(f"{server.url}/users?limit=0", timeout=5).status_code),
+                expected_value=(400, 400),
+                step_msg="Check an invalid cursor or limit is a bad request"
+            )
+            assert self.result.step_status
+
+    def test_sampled_users(self):
+        """
+        Check the API picks the random users itself, the same ones for the same seed.
+        """
+        store = MemoryUserStore()
+        seed_users(store, count=25)
+        with APIServer(store) as server:
+            url = f"{server.url}/users/sample"
+            self.result.check_equals_to(
+                actual_value=(ApiManager.get_api_sample(url, n=3, seed=1),
+                              len(ApiManager.get_api_sample(url))),
+                expected_value=(store.sample(3, seed=1), 1),
+                step_msg="Check the sampled users are the ones the store picks"
+            )
+            assert self.result.step_status
+            with pytest.raises(ApiManagerError):
+                ApiManager.get_api_sample(url, n=0)
+
+    def test_add_user(self):
+        """
+        Check a user is added, and a user the store can not take is a bad request.
+        """
+        store = MemoryUserStore()
+        with APIServer(store) as server:
+            url = f"{server.url}/add_user"
+            self.result.check_equals_to(
+                actual_value=[requests.post(url, json=user, timeout=5).status_code
+                              for user in ({"first_name": "Ana"}, {"first_name": ["x"]}, [1])],
+                expected_value=[201, 400, 400],
+                step_msg="Check only the valid user is added"
+            )
+            assert self.result.step_status
+            self.result.check_equals_to(
+                actual_value=store.find(),
+                expected_value=[{"first_name": "Ana"}],
+                step_msg="Check the rejected users are not stored"
+            )
+            assert self.result.step_status
+
+    def test_bulk_upload(self, monkeypatch):
+        """
+        Check a streamed upload is inserted in chunks, reporting the users which are not
+        valid, both as json lines and as a json array.
+
+        Args:
+            monkeypatch(MonkeyPatch): lowers the size a user can take.
+        """
+        store = MemoryUserStore()
+        users = ({"first_name": f"User{number}", "last_name": "Bulk", "zip_code": "12345"}
+                 for number in range(25))
+        with APIServer(store) as server:
+            url = f"{server.url}/users/bulk"
+            report = ApiManager.upload_api_items(
+                url, chain(users, ["not a user", {"first_name": ["x"]}]), chunk_size=10)
+            self.result.check_equals_to(
+                actual_value=(report["inserted"], report["failed"],
+                              [chunk["inserted"] for chunk in report["chunks"]],
+                              store.count()),
+                expected_value=(25, 2, [10, 10, 5], 25),
+                step_msg="Check the json lines are inserted in chunks of 10 users"
+            )
+            assert self.result.step_status
+            monkeypatch.setattr(UsersAPI, "MAX_DOCUMENT_SIZE", 100)
+            response = requests.post(
+                url, data=f'{{"first_name": "{"x" * 200}"}}\n{{"first_name": "Ana"}}', timeout=5)
+            self.result.check_equals_to(
+                actual_value=(response.status_code, response.json()["inserted"],
+                              response.json()["chunks"][0]["errors"]),
+                expected_value=(207, 1, ["User 1: Line longer than 100 bytes"]),
+                step_msg="Check a line longer than a user can take is rejected"
+            )
+            assert self.result.step_status
+            response = requests.post(
+                url, data='[{"first_name": "Ana"}, {"first_name": "Eva"} {', timeout=5,
+                headers={"Content-Type": "application/json"})
+            self.result.check_equals_to(
+                actual_value=(response.status_code, response.json()["inserted"],
+                              store.count()),
+                expected_value=(207, 2, 28),
+                step_msg="Check the users of a json array are inserted until it breaks"
+            )
+            assert self.result.step_status
+
+    def test_mongo_not_ready(self):
+        """
+        Check the server is not started when Mongo doesn't answer the ping, and Mongo
+        rejects the users the other stores reject before reaching the server.
+        """
+        server = APIServer(MongoUserStore(UNREACHABLE_MONGO, "users_data", "users", 200))
+        with pytest.raises(APIServerException, match="Mongo didn't answer the ping"):
+            server.start()
+        with pytest.raises(UserStoreException, match="must be a scalar value"):
+            server.api.store.insert({"first_name": ["x"]})
+        self.result.check_equals_to(
+            actual_value=server.url,
+            expected_value=None,
+            step_msg="Check the server has no url when it didn't start"
+        )
+        assert self.result.step_status
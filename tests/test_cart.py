@@ -1,16 +1,16 @@
 """
 Contains the test classes and test methods related to cart validations
 """
-import os
 import random
 import pytest
 from pages.checkout_page import CheckOutPage
 from pages.home_page import HomePage, HomePageException
 from pages.cart_page import CartPage
 from pages.product_page import ProductPage
-from pages.login_page import LoginPage
+from pages.login_page import LoginPage, LoginPageException
 from tests.base_test import BaseTest
-from utils.tools import YamlManager
+from utils.page_schema import get_page_inputs
+from utils.tools import ApiManager, YamlManager
 from utils.browser_manager import BrowserManagerException
 
 
@@ -43,6 +43,7 @@ class BaseTestCart(BaseTest):
         cart_page: Instance of the cart page object.
         product_page: Instance of the product page object.
         checkout_page: Instance of the checkout page object.
+        api_url (str): Base url of the users API.
         TESTING_PAGE (str): Path to the test configuration file.
     """
     browser = None
@@ -54,13 +55,13 @@ class BaseTestCart(BaseTest):
     cart_page = None
     product_page = None
     checkout_page = None
+    api_url = None
     TESTING_PAGE =  "tests/test_inputs/sauce_demo.yaml"
 
     def setup(self, browser, result, run_users_api):
         super().setup(browser, result)
-        self.inventory_page_dict = YamlManager.get_yaml_file_data(
-            self.TESTING_PAGE
-        )["general_inputs"]["inventory_page"]
+        self.api_url = run_users_api
+        self.inventory_page_dict = get_page_inputs(self.TESTING_PAGE, "inventory_page")
         self.login_page = LoginPage(
             browser,
             self.TESTING_PAGE
@@ -82,9 +83,8 @@ class BaseTestCart(BaseTest):
             self.TESTING_PAGE
         )
         try:
-            self.login_page.open_page()
-            self.login_page.login_page(**self.login_page.get_just_specific_user("standard_user"))
-        except BrowserManagerException as e:
+            self.login_page.login_as("standard_user")
+        except (BrowserManagerException, LoginPageException) as e:
             self.log.error("Unable to login using standard user credentials")
             raise BaseTestCartError("Login has failed") from e
 
@@ -107,12 +107,13 @@ class BaseTestCart(BaseTest):
             raise BaseTestCartError("Unable to add item to the cart") from e
         return item
 
-    def step_include_item_in_cart(self, item_name):
+    def step_include_item_in_cart(self, item_name, expected_items=None):
         """
         Step to validate that the addition of some item has been successfully.
 
         Args:
             item_name(str): items's name to add.
+            expected_items(int:optional): quantity of items expected after the addition.
         
         Returns:
             int: quantity of items included in the cart after this last one has been added.
@@ -127,14 +128,34 @@ class BaseTestCart(BaseTest):
             item=item
         )
         assert self.result.step_status
-        return self.home_page.get_num_items_in_cart()
+        return self.home_page.get_num_items_in_cart(expected=expected_items)
+
+    def step_include_items_in_cart(self, items_text):
+        """
+        Step to validate that a batch of items has been included in the cart at once.
 
-    def step_remove_item_in_cart(self, item_name):
+        Args:
+            items_text(list): names of the items to add.
+        """
+        self.log.info(f"trying to add items {items_text} to cart in a single batch")
+        try:
+            current_items_added = self.home_page.add_items_to_cart(items_text)
+        except HomePageException as e:
+            raise BaseTestCartError(f"Unable to add {items_text} to the cart") from e
+        self.result.check_equals_to(
+            actual_value=current_items_added,
+            expected_value=len(set(items_text)),
+            step_msg="Check the quantity of items matches the expected after including "
+            f"{items_text} to the cart")
+        assert self.result.step_status
+
+    def step_remove_item_in_cart(self, item_name, expected_items=None):
         """
         Step to validate that the remotion of some item has been successfully.
 
         Args:
             item_name(str): items's name to add.
+            expected_items(int:optional): quantity of items expected after the remotion.
         
         Returns:
             int: quantity of items included in the cart after this last one has been added.
@@ -149,7 +170,7 @@ class BaseTestCart(BaseTest):
             item=item
         )
         assert self.result.step_status
-        return self.home_page.get_num_items_in_cart()
+        return self.home_page.get_num_items_in_cart(expected=expected_items)
 
     def iterate_items_list(self, item_list, callback, msg):
         """
@@ -160,11 +181,12 @@ class BaseTestCart(BaseTest):
             "removing": lambda a, b: abs(a - b),
         }
         for idx, item_text in enumerate(item_list):
-            current_items_added = callback(item_text)
             inc_dec = idx if msg == "including" else len(item_list) - idx
+            expected_items = add_sub[msg](inc_dec, 1)
+            current_items_added = callback(item_text, expected_items)
             self.result.check_equals_to(
                 actual_value=current_items_added,
-                expected_value=add_sub[msg](inc_dec, 1),
+                expected_value=expected_items,
                 step_msg=f"Check the quantity of items matches the expected "
                 f"after {msg} {item_text} to the cart")
             assert self.result.step_status
@@ -271,7 +293,7 @@ class TestPositiveFlows(BaseTestCart):
             items_text(list): List of string with the names of the items to test, added and removed
         """
         # 1 . include itesm to the cart
-        self.iterate_items_list(items_text, self.step_include_item_in_cart, "including")
+        self.step_include_items_in_cart(items_text)
         it_home_page = \
             {key: value
              for key, value in self.home_page.get_item_prices().items()
@@ -322,7 +344,7 @@ class TestPositiveFlows(BaseTestCart):
         self.product_page.add_item_to_cart()
         # 3. Get quantity of items in the cart
         self.result.check_equals_to(
-            actual_value=self.home_page.get_num_items_in_cart(),
+            actual_value=self.home_page.get_num_items_in_cart(expected=1),
             expected_value=1,
             step_msg="Check the number of items matches the expected"
         )
@@ -353,10 +375,9 @@ class TestPositiveFlows(BaseTestCart):
             self.checkout_page
         )
         # 9. check and get the user data from API
-        api_url = os.getenv("API_URL", "http://127.0.0.1:5000")
         user = self.step_execute_api_request(
-            url=f"{api_url}/users",
-            is_random=True
+            url=f"{self.api_url}/users/sample",
+            api_request=ApiManager.get_api_sample
         )[0]
         # 10. fill the checkout info
         self.step_check_execution_events(
@@ -0,0 +1,104 @@
+"""
+Circuit breaker unit tests, failing fast once the site or the API is unreachable
+"""
+import pytest
+from tests.base_test import BaseTest
+from tests.fakes.fake_webdriver import FakeWebDriver
+from utils.browser_manager import BrowserManager, BrowserManagerException
+from utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerException,
+    CircuitName,
+    CircuitState,
+    configure_circuit_breakers,
+    get_circuit_breaker
+)
+from utils.page_schema import get_page_inputs
+
+
+@pytest.mark.Unit
+class TestCircuitBreaker(BaseTest):
+    """
+    Test class to validate the circuit breakers of the site and the API.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, result):  # pylint: disable=arguments-differ
+        super().setup(None, result)
+        configure_circuit_breakers(threshold=2, backoff=10)
+        yield
+        configure_circuit_breakers()
+
+    def test_opens_after_threshold(self):
+        """
+        Check the circuit opens after 'threshold' consecutive failures, and a success in
+        between starts the count again.
+        """
+        breaker = CircuitBreaker("site", threshold=2, backoff=10)
+        breaker.record_failure("ERR_CONNECTION_REFUSED")
+        breaker.record_success()
+        breaker.record_failure("ERR_CONNECTION_REFUSED")
+        self.result.check_equals_to(
+            actual_value=breaker.state,
+            expected_value=CircuitState.CLOSED,
+            step_msg="Check non consecutive failures keep the circuit closed"
+        )
+        assert self.result.step_status
+        breaker.record_failure("ERR_NAME_NOT_RESOLVED")
+        self.result.check_equals_to(
+            actual_value=breaker.is_open(),
+            expected_value=True,
+            step_msg="Check consecutive failures open the circuit"
+        )
+        assert self.result.step_status
+        with pytest.raises(CircuitBreakerException, match="last one: ERR_NAME_NOT_RESOLVED"):
+            breaker.before_call()
+
+    def test_probe_backoff(self):
+        """
+        Check an open circuit lets a probe through once its backoff has passed, a failed
+        probe doubles the backoff and a successful one closes the circuit.
+        """
+        breaker = CircuitBreaker("api", threshold=1, backoff=10)
+        breaker.record_failure("timeout")
+        first_delay = breaker.retry_in()
+        breaker.next_probe = 0
+        with pytest.raises(ValueError):
+            with breaker.guard(ValueError):
+                raise ValueError("still down")
+        self.result.check_equals_to(
+            actual_value=breaker.is_open() and breaker.retry_in() > first_delay,
+            expected_value=True,
+            step_msg="Check a failed probe opens the circuit with a longer backoff"
+        )
+        assert self.result.step_status
+        breaker.next_probe = 0
+        with breaker.guard(ValueError):
+            pass
+        self.result.check_equals_to(
+            actual_value=(breaker.state, breaker.failures),
+            expected_value=(CircuitState.CLOSED, 0),
+            step_msg="Check a successful probe closes the circuit"
+        )
+        assert self.result.step_status
+
+    def test_unreachable_site(self):
+        """
+        Check the browser stops requesting an unreachable site once its circuit opens.
+        """
+        driver = FakeWebDriver()
+        browser = BrowserManager(driver=driver)
+        for _ in range(2):
+            with pytest.raises(BrowserManagerException):
+                browser.open_page("https://down.example.com/")
+        start_count = driver.command_count
+        with pytest.raises(BrowserManagerException, match="Site unreachable"):
+            browser.open_page(
+                get_page_inputs("tests/test_inputs/sauce_demo.yaml", "login_page")["path"])
+        self.result.check_equals_to(
+            actual_value=(driver.command_count - start_count,
+                          get_circuit_breaker(CircuitName.SITE).is_open()),
+            expected_value=(0, True),
+            step_msg="Check the open circuit rejects the page without reaching the driver"
+        )
+        assert self.result.step_status
@@ -0,0 +1,83 @@
+"""
+Deadline unit tests, sharing the time budget of a test between its waits
+"""
+import time
+import pytest
+from tests.base_test import BaseTest
+from tests.fakes.fake_webdriver import FakeWebDriver
+from utils.browser_manager import BrowserManager
+from utils.deadline import Deadline, DeadlineException, end_deadline, start_deadline
+from utils.page_schema import get_page_inputs
+from utils.wait_engine import WaitStrategy
+
+
+@pytest.mark.Unit
+class TestDeadline(BaseTest):
+    """
+    Test class to validate the time budget of the tests.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, result):  # pylint: disable=arguments-differ
+        super().setup(None, result)
+        yield
+        end_deadline()
+
+    def test_timeout_cut_to_budget(self):
+        """
+        Check a wait gets the remaining budget when it is smaller than its own timeout, and
+        the time it spends is charged to its label.
+        """
+        deadline = Deadline(5)
+        with deadline.wait("cart_icon", 10) as timeout:
+            self.result.check_equals_to(
+                actual_value=timeout <= 5,
+                expected_value=True,
+                step_msg="Check the timeout is cut to the remaining budget"
+            )
+            assert self.result.step_status
+        with deadline.wait("filter", 1) as timeout:
+            self.result.check_equals_to(
+                actual_value=timeout,
+                expected_value=1,
+                step_msg="Check a timeout within the budget is kept"
+            )
+            assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=sorted(deadline.spent),
+            expected_value=["cart_icon", "filter"],
+            step_msg="Check every wait is charged to the budget"
+        )
+        assert self.result.step_status
+
+    def test_used_up_budget(self):
+        """
+        Check no wait starts once the budget is used up, and the error tells where the time
+        went.
+        """
+        deadline = Deadline(1)
+        deadline.charge("cart_icon", 1.2)
+        deadline.start_time -= 1.5
+        with pytest.raises(DeadlineException, match="cart_icon 1 waits 1.2s"):
+            with deadline.wait("filter", 1):
+                pass
+
+    def test_browser_fails_fast(self):
+        """
+        Check a wait for a missing element gives up when the budget of the test is used up
+        instead of when its own timeout expires.
+        """
+        browser = BrowserManager(driver=FakeWebDriver(), wait_strategy=WaitStrategy.POLLING)
+        browser.open_page(
+            get_page_inputs("tests/test_inputs/sauce_demo.yaml", "login_page")["path"])
+        missing = get_page_inputs("tests/test_inputs/sauce_demo.yaml", "inventory_page")["filter"]
+        start_deadline(0.5)
+        start_time = time.perf_counter()
+        with pytest.raises(DeadlineException, match="filter 1 waits"):
+            browser.get_present_element(missing, None, timeout=10)
+        self.result.check_equals_to(
+            actual_value=time.perf_counter() - start_time < 5,
+            expected_value=True,
+            step_msg="Check the wait gives up with the budget of the test"
+        )
+        assert self.result.step_status
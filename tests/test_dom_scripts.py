@@ -0,0 +1,241 @@
+"""
+DOM scripts unit tests, running the javascript of utils.dom_scripts in Node.
+
+The page-object tests answer every script with the Python equivalent of the fake driver,
+so these are the only tests running the javascript itself. They use the minimal DOM of
+'tests/fakes/dom_stub.js': the css and xpath lookups, the layout and the events of a
+real page are only covered when the tests run on a real browser.
+"""
+import json
+import os
+import shutil
+import subprocess
+import pytest
+from tests.base_test import BaseTest
+from utils.dom_scripts import (
+    CLICK_ALL_JS,
+    ELEMENT_TEXT_JS,
+    FILL_FORM_JS,
+    GET_STORAGE_JS,
+    ITEMS_TEXT_JS,
+    SET_STORAGE_JS,
+    TEXT_FINGERPRINT_JS,
+    WAIT_FOR_ELEMENT_JS,
+    text_fingerprint
+)
+
+NODE = shutil.which("node")
+DOM_STUB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fakes", "dom_stub.js")
+# inventory page with two items, the price of the second one is not rendered yet
+INVENTORY = """
+document.appendChild(h('div', {id: 'inventory'}, '', [
+    h('div', {'class': 'inventory_item', id: 'backpack'}, '', [
+        h('div', {'class': 'inventory_item_name'}, '  Sauce Labs Backpack '),
+        h('div', {'class': 'inventory_item_price'}, '$29.99'),
+        h('img', {id: 'backpack_img', src: '/backpack.jpg'}),
+    ]),
+    h('div', {'class': 'inventory_item', id: 'onesie'}, '', [
+        h('div', {'class': 'inventory_item_name'}, 'Sauce Labs Onesie'),
+        h('div', {'class': 'inventory_item_price', hidden: ''}, '$7.99'),
+    ]),
+    h('button', {id: 'add-to-cart-backpack'}, 'Add to cart'),
+    h('button', {id: 'checkout', disabled: ''}, 'Checkout'),
+    h('span', {'class': 'promo'}, 'Crème T-Shirt \\u{1F455}'),
+]));
+"""
+FORM = """
+document.appendChild(h('form', {id: 'checkout_info'}, '', [
+    h('input', {id: 'first-name', name: 'firstName'}),
+    h('input', {id: 'postal-code', name: 'postalCode', value: '00000'}),
+]));
+"""
+
+
+def run_scripts(page: str,
+                *calls) -> dict:
+    """
+    Runs scripts one after the other on the same page, as execute_script would do.
+
+    Args:
+        page(str): javascript building the page with the DOM stub.
+        calls(tuple): (script, arguments) of every script; an argument {"element": id}
+                      is replaced by the element with that id.
+
+    Returns:
+        dict: {"results": [result of every script], "events": [[event, element id]]},
+              an element returned by a script is given as {"element": id}.
+    """
+    runs = "\n".join(
+        f"results.push(plain((function () {{\n{script}\n}}).apply(null, "
+        f"resolve({json.dumps(list(args))}))));"
+        for script, args in calls)
+    return _run_node(f"{page}\nconst results = [];\n{runs}\n"
+                     "console.log(JSON.stringify({results: results, events: events}));")
+
+
+def run_async_script(page: str,
+                     script: str,
+                     args: list) -> dict:
+    """
+    Runs an async script as execute_async_script would do, the callback being the last
+    argument.
+
+    Args:
+        page(str): javascript building the page with the DOM stub, it can change it later
+                   with setTimeout.
+        script(str): async script.
+        args(list): arguments of the script, as for run_scripts.
+
+    Returns:
+        dict: {"results": [value given to the callback], "events": [[event, element id]]}.
+    """
+    return _run_node(
+        f"{page}\n(function () {{\n{script}\n}}).apply(null, resolve("
+        f"{json.dumps(list(args))}).concat([function (result) {{\n"
+        "console.log(JSON.stringify({results: [plain(result)], events: events}));\n}]));")
+
+
+def _run_node(source: str) -> dict:
+    """Runs the source in Node after the DOM stub, returns what it prints as json"""
+    with open(DOM_STUB, encoding="utf-8") as stub:
+        helpers = """
+function resolve(args) {
+    return args.map(arg => arg && arg.element ? byId(arg.element) : arg);
+}
+function plain(result) {
+    return result instanceof Element ? {element: result.getAttribute('id')} :
+        result === undefined ? null : result;
+}
+"""
+        completed = subprocess.run(
+            [NODE, "-"], input=stub.read() + helpers + source, capture_output=True,
+            text=True, timeout=30, check=False)
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout)
+
+
+@pytest.mark.Unit
+@pytest.mark.skipif(NODE is None, reason="Node.js is needed to run the page scripts")
+class TestDomScripts(BaseTest):
+    """
+    Test class to validate the javascript snippets run in the page.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, result):  # pylint: disable=arguments-differ
+        super().setup(None, result)
+
+    def test_read_texts(self):
+        """
+        Check the items, a single element text and the text fingerprint are read from
+        the page, with the same digest as the Python 'text_fingerprint'.
+        """
+        fields = [["name", "class name", "inventory_item_name", None],
+                  ["price", "class name", "inventory_item_price", None],
+                  ["image", "tag name", "img", "src"]]
+        output = run_scripts(
+            INVENTORY,
+            (ITEMS_TEXT_JS, [None, ["class name", "inventory_item"], fields]),
+            (ITEMS_TEXT_JS, [{"element": "onesie"}, ["css selector", ".inventory_item_name"],
+                             [["name", "css selector", "#missing", None]]]),
+            (ELEMENT_TEXT_JS, [None, "id", "add-to-cart-backpack"]),
+            (ELEMENT_TEXT_JS, [None, "name", "missing"]),
+            (TEXT_FINGERPRINT_JS, [None, [["class name", "inventory_item_name"],
+                                          ["class name", "inventory_item_price"]]]),
+            (TEXT_FINGERPRINT_JS, [None, [["class name", "promo"]]]),
+        )
+        self.result.check_equals_to(
+            actual_value=output["results"],
+            expected_value=[
+                [{"name": "Sauce Labs Backpack", "price": "$29.99", "image": "/backpack.jpg"},
+                 {"name": "Sauce Labs Onesie", "price": "", "image": None}],
+                [{"name": None}],
+                "Add to cart",
+                None,
+                text_fingerprint(["Sauce Labs Backpack", "Sauce Labs Onesie", "$29.99", ""]),
+                text_fingerprint(["Crème T-Shirt \U0001F455"]),
+            ],
+            step_msg="Check the texts read in the page"
+        )
+        assert self.result.step_status
+
+    def test_storage(self):
+        """
+        Check the storage written by SET_STORAGE_JS is read back by GET_STORAGE_JS.
+        """
+        output = run_scripts(
+            "window.localStorage.setItem('theme', 'dark');",
+            (SET_STORAGE_JS, [{"session-username": "standard_user"}, {"cart": "[4]"}]),
+            (GET_STORAGE_JS, []),
+        )
+        self.result.check_equals_to(
+            actual_value=output["results"],
+            expected_value=[None, {"local": {"theme": "dark",
+                                             "session-username": "standard_user"},
+                                   "session": {"cart": "[4]"}}],
+            step_msg="Check the storage is written and read back"
+        )
+        assert self.result.step_status
+
+    def test_click_and_fill(self):
+        """
+        Check CLICK_ALL_JS clicks the first element of every locator, and FILL_FORM_JS sets
+        every field firing the input and change events.
+        """
+        output = run_scripts(
+            INVENTORY + FORM,
+            (CLICK_ALL_JS, [None, [["id", "add-to-cart-backpack"], ["id", "missing"],
+                                   ["css selector", "button"]]]),
+            (FILL_FORM_JS, [None, [["id", "first-name", "Ana"], ["name", "postalCode", "12345"],
+                                   ["id", "missing", "x"]]]),
+        )
+        self.result.check_equals_to(
+            actual_value=output["results"],
+            expected_value=[[True, False, True], ["Ana", "12345", None]],
+            step_msg="Check the elements found are clicked and filled"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=output["events"],
+            expected_value=[["click", "add-to-cart-backpack"], ["click", "add-to-cart-backpack"],
+                            *[[event, field]
+                              for field in ("first-name", "postal-code")
+                              for event in ("focus", "input", "change", "blur")]],
+            step_msg="Check the events fired in the page"
+        )
+        assert self.result.step_status
+
+    @pytest.mark.parametrize(
+        ("page", "condition", "timeout_ms", "expected"),
+        [
+            (INVENTORY, "visible", 1000, {"element": "backpack"}),
+            (INVENTORY, "clickable", 50, None),
+            (INVENTORY + "setTimeout(() => byId('checkout').removeAttribute('disabled'), 20);",
+             "clickable", 1000, {"element": "checkout"}),
+            ("setTimeout(() => document.appendChild(h('div', {id: 'late'})), 20);",
+             "present", 1000, {"element": "late"}),
+            ("", "present", 50, None),
+        ]
+    )
+    def test_wait_for_element(self, page, condition, timeout_ms, expected):
+        """
+        Check WAIT_FOR_ELEMENT_JS calls back with the element as soon as it meets the
+        condition, and with null on timeout.
+
+        Args:
+            page(str): javascript building the page, and changing it later.
+            condition(str): condition waited for.
+            timeout_ms(int): timeout of the wait.
+            expected(dict): element expected, None for a timeout.
+        """
+        locator = {"visible": ["class name", "inventory_item"],
+                   "clickable": ["id", "checkout"],
+                   "present": ["id", "late"]}[condition]
+        output = run_async_script(
+            page, WAIT_FOR_ELEMENT_JS, [None, *locator, condition, timeout_ms])
+        self.result.check_equals_to(
+            actual_value=output["results"],
+            expected_value=[expected],
+            step_msg=f"Check the wait for a {condition} element"
+        )
+        assert self.result.step_status
@@ -4,10 +4,10 @@ Filtering test file and relates
 import pytest
 from pages.base_pages import BasePageException
 from pages.home_page import FilteringBy, HomePage
-from pages.login_page import LoginPage
+from pages.login_page import LoginPage, LoginPageException
 from tests.base_test import BaseTest
 from utils.browser_manager import BrowserManagerException
-from utils.tools import YamlManager
+from utils.page_schema import get_page_inputs
 
 
 class BaseFilteringError(Exception):
@@ -43,9 +43,7 @@ class TestFiltering(BaseTest):
     @pytest.fixture(autouse=True)
     def setup(self, browser, result):
         super().setup(browser, result)
-        self.inventory_page_dict = YamlManager.get_yaml_file_data(
-            self.TESTING_PAGE
-        )["general_inputs"]["inventory_page"]
+        self.inventory_page_dict = get_page_inputs(self.TESTING_PAGE, "inventory_page")
         self.login_page = LoginPage(
             browser,
             self.TESTING_PAGE
@@ -55,9 +53,8 @@ class TestFiltering(BaseTest):
             self.TESTING_PAGE
         )
         try:
-            self.login_page.open_page()
-            self.login_page.login_page(**self.login_page.get_just_specific_user("standard_user"))
-        except BrowserManagerException as e:
+            self.login_page.login_as("standard_user")
+        except (BrowserManagerException, LoginPageException) as e:
             self.log.error("Unable to login using standard user credentials")
             raise BaseFilteringError("Login has failed") from e
 
@@ -0,0 +1,108 @@
+"""
+Latency history unit tests, deriving the timeouts from the wait latencies of previous runs
+"""
+import pytest
+from pages.home_page import HomePage
+from pages.login_page import LoginPage
+from tests.base_test import BaseTest
+from tests.fakes.fake_webdriver import FakeWebDriver
+from utils.browser_manager import BrowserManager
+from utils.latency_history import LatencyHistory
+from utils.page_schema import get_page_inputs
+from utils.reference_cache import configure_reference_cache
+from utils.wait_engine import WaitEngine, WaitStrategy
+
+
+@pytest.mark.Unit
+class TestLatencyHistory(BaseTest):
+    """
+    Test class to validate the latency history and the timeouts derived from it.
+
+    Attributes:
+        TESTING_PAGE (str): Path to the test configuration file.
+    """
+    TESTING_PAGE =  "tests/test_inputs/sauce_demo.yaml"
+
+    @pytest.fixture(autouse=True)
+    def setup(self, result):  # pylint: disable=arguments-differ
+        super().setup(None, result)
+        yield
+        WaitEngine.calibrate({})
+
+    def test_derived_timeouts(self):
+        """
+        Check the timeout is the p99 latency times the factor within bounds, and locators
+        without enough history keep their own timeout.
+        """
+        history = {"mutation": {
+            "inventory_page.cart_icon": {"samples": [0.1] * 99 + [0.5], "runs": []},
+            "inventory_page.filter": {"samples": [0.01] * 100, "runs": []},
+            "cart_page.checkout_button": {"samples": [20.0] * 100, "runs": []},
+            "login_page.login_bttn": {"samples": [0.1] * 5, "runs": []},
+        }}
+        self.result.check_equals_to(
+            actual_value=LatencyHistory.derive_timeouts(history, factor=3, maximum=30),
+            expected_value={"mutation": {
+                "inventory_page.cart_icon": 1.5,
+                "inventory_page.filter": 1.0,
+                "cart_page.checkout_button": 30,
+            }},
+            step_msg="Check the timeouts derived from the latency distributions"
+        )
+        assert self.result.step_status
+
+    def test_drift_report(self):
+        """
+        Check a locator whose median latency moved away from its previous runs is reported,
+        and the noise of fast locators is not.
+        """
+        history = {"polling": {
+            "inventory_page.cart_icon": {"samples": [], "runs": [{"p50": 0.1}] * 5},
+            "inventory_page.filter": {"samples": [], "runs": [{"p50": 0.001}] * 5},
+        }}
+        reached = {"polling": {
+            "inventory_page.cart_icon": [0.5, 0.6, 0.5],
+            "inventory_page.filter": [0.01, 0.01],
+            "cart_page.checkout_button": [0.3],
+        }}
+        self.result.check_equals_to(
+            actual_value=[row["locator"] for row in LatencyHistory.drift_report(history, reached)],
+            expected_value=["inventory_page.cart_icon"],
+            step_msg="Check only the drifted locator with history is reported"
+        )
+        assert self.result.step_status
+
+    def test_calibrated_waits(self, tmp_path):
+        """
+        Check the waits are stored per page and locator, and once calibrated the browser
+        waits with the derived timeout.
+
+        Args:
+            tmp_path(Path): temporary folder for the history and the reference cache.
+        """
+        configure_reference_cache(cache_dir=str(tmp_path / "reference"))
+        browser = BrowserManager(driver=FakeWebDriver(), wait_strategy=WaitStrategy.POLLING)
+        login_page = LoginPage(browser, self.TESTING_PAGE)
+        login_page.open_page()
+        login_page.login_page(**login_page.get_just_specific_user("standard_user"))
+        HomePage(browser, self.TESTING_PAGE).get_single_inventory_item("Sauce Labs Onesie")
+        history = LatencyHistory(str(tmp_path / "history.json"))
+        history.update(WaitEngine.get_reached_samples())
+        stored = history.load()
+        self.result.check_equals_to(
+            actual_value=("inventory_page.item_by_link" in stored["fake/polling"],
+                          any(key.startswith("chrome/") for key in stored)),
+            expected_value=(True, False),
+            step_msg="Check the latency is stored per backend, page and locator"
+        )
+        assert self.result.step_status
+        WaitEngine.calibrate(LatencyHistory.derive_timeouts(stored, min_samples=1, minimum=2))
+        locator = get_page_inputs(self.TESTING_PAGE, "inventory_page")["item_by_link"]
+        self.result.check_equals_to(
+            actual_value=(browser.wait_engine.calibrated_timeout(locator, 10),
+                          browser.wait_engine.calibrated_timeout(locator, 1),
+                          browser.wait_engine.calibrated_timeout(("ID", "missing"), 10)),
+            expected_value=(2, 1, 10),
+            step_msg="Check the calibrated timeout shortens the given one, never extends it"
+        )
+        assert self.result.step_status
@@ -10,7 +10,7 @@ from selenium.common.exceptions import \
 from pages.home_page import HomePage
 from pages.login_page import LoginPage
 from tests.base_test import BaseTest
-from utils.tools import YamlManager
+from utils.page_schema import get_page_inputs
 
 
 class BaseLogIn(BaseTest):
@@ -40,9 +40,7 @@ class BaseLogIn(BaseTest):
 
     def setup(self, browser, result):
         super().setup(browser, result)
-        self.inventory_page_dict = YamlManager.get_yaml_file_data(
-            self.TESTING_PAGE
-        )["general_inputs"]["inventory_page"]
+        self.inventory_page_dict = get_page_inputs(self.TESTING_PAGE, "inventory_page")
         self.login_page = LoginPage(
             browser,
             self.TESTING_PAGE
@@ -0,0 +1,528 @@
+"""
+Page-object unit tests, running on the in-memory fake webdriver backend
+"""
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException
+from pages.cart_page import CartPage
+from pages.checkout_page import CheckOutPage
+from pages.home_page import FilteringBy, HomePage, HomePageException
+from pages.login_page import LoginPage
+from pages.product_page import ProductPage
+from tests.base_test import BaseTest
+from tests.fakes.fake_webdriver import FakeWebDriver
+from utils.browser_manager import BrowserManager, BrowserManagerException, FillMode
+from utils.reference_cache import configure_reference_cache, get_reference_cache
+from utils.wait_engine import WaitEngine, WaitStrategy
+
+
+@pytest.fixture(name="fake_browser")
+def fake_browser_fixture():
+    """
+    Fixture to get a BrowserManager backed by the fake webdriver, one per test.
+    """
+    return BrowserManager(driver=FakeWebDriver())
+
+
+@pytest.mark.Unit
+class TestFakeBackendPages(BaseTest):
+    """
+    Test class to validate the page objects against the fake webdriver backend.
+
+    Attributes:
+        login_page (LoginPage): Instance of the login page object.
+        home_page (HomePage): Instance of the home page object.
+        cart_page (CartPage): Instance of the cart page object.
+        product_page (ProductPage): Instance of the product page object.
+        checkout_page (CheckOutPage): Instance of the checkout page object.
+        TESTING_PAGE (str): Path to the test configuration file.
+    """
+    login_page = None
+    home_page = None
+    cart_page = None
+    product_page = None
+    checkout_page = None
+    TESTING_PAGE =  "tests/test_inputs/sauce_demo.yaml"
+
+    @pytest.fixture(autouse=True)
+    def setup(self, fake_browser, result, tmp_path):  # pylint: disable=arguments-differ
+        super().setup(fake_browser, result)
+        configure_reference_cache(cache_dir=str(tmp_path / "reference"))
+        self.login_page = LoginPage(fake_browser, self.TESTING_PAGE)
+        self.home_page = HomePage(fake_browser, self.TESTING_PAGE)
+        self.cart_page = CartPage(fake_browser, self.TESTING_PAGE)
+        self.product_page = ProductPage(fake_browser, self.TESTING_PAGE)
+        self.checkout_page = CheckOutPage(fake_browser, self.TESTING_PAGE)
+        self.login_page.open_page()
+
+    def login(self):
+        """Logins with the standard user"""
+        self.login_page.login_page(**self.login_page.get_just_specific_user("standard_user"))
+
+    def test_valid_credentials(self):
+        """
+        Check the credentials are read from the login page.
+        """
+        self.result.check_equals_to(
+            actual_value=self.login_page.get_just_specific_user("standard_user"),
+            expected_value={"user": "standard_user", "password": "secret_sauce"},
+            step_msg="Check the standard user credentials are read from the login page"
+        )
+        assert self.result.step_status
+
+    def test_reference_cache(self):
+        """
+        Check the credentials and the catalog are scraped once and then read from the
+        reference cache without driver round trips.
+        """
+        driver = self.browser.driver
+        trips, credentials = [], []
+        for _ in range(2):
+            start_count = driver.command_count
+            credentials.append(self.login_page.get_valid_credentials())
+            trips.append(driver.command_count - start_count)
+        self.log.info(f"get_valid_credentials round trips: scraped {trips[0]}, "
+                      f"cached {trips[1]}")
+        self.result.check_equals_to(
+            actual_value=(credentials[1], trips[1]),
+            expected_value=(credentials[0], 0),
+            step_msg="Check the cached credentials are read without round trips"
+        )
+        assert self.result.step_status
+        self.login()
+        prices = self.home_page.get_catalog_prices()
+        self.home_page.filter_products(FilteringBy.LOW_TO_HIGH)
+        self.result.check_equals_to(
+            actual_value=self.home_page.get_catalog_prices(),
+            expected_value=prices,
+            step_msg="Check the catalog prices don't depend on the sorting"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=get_reference_cache().scrapes,
+            expected_value=2,
+            step_msg="Check the credentials and the catalog are scraped once"
+        )
+        assert self.result.step_status
+
+    @pytest.mark.parametrize(
+            ("user", "password", "expected_error_msg"),
+            [
+                ("standard_user", "", "Epic sadface: Password is required"),
+                ("", "secret_sauce", "Epic sadface: Username is required"),
+                ("Juan_Camaney", "12345",
+                 "Epic sadface: Username and password do not match any user in this service"),
+            ]
+    )
+    def test_login_errors(self, user, password, expected_error_msg):
+        """
+        Check the error message displayed after a wrong login.
+
+        Args:
+            user(str): user credential.
+            password(str): password credentials.
+            expected_error_msg(str): expected error message.
+        """
+        self.login_page.login_page(user=user, password=password)
+        self.result.check_equals_to(
+            actual_value=self.login_page.get_login_error_text(),
+            expected_value=expected_error_msg,
+            step_msg="Check the error message is displayed as expected"
+        )
+        assert self.result.step_status
+
+    def test_cart_badge(self):
+        """
+        Check the cart badge follows the added items.
+        """
+        self.login()
+        items = ["Sauce Labs Backpack", "Sauce Labs Onesie", "Sauce Labs Bike Light"]
+        for idx, item_name in enumerate(items):
+            self.home_page.add_item_to_cart(self.home_page.get_single_inventory_item(item_name))
+            self.result.check_equals_to(
+                actual_value=self.home_page.get_num_items_in_cart(expected=idx + 1),
+                expected_value=idx + 1,
+                step_msg=f"Check the cart quantity after including {item_name}"
+            )
+            assert self.result.step_status
+
+    def test_sorting(self):
+        """
+        Check the inventory is reordered by the price filter.
+        """
+        self.login()
+        self.home_page.filter_products(FilteringBy.LOW_TO_HIGH)
+        prices = [float(price[1:]) for price in self.home_page.get_item_prices().values()]
+        self.result.check_equals_to(
+            actual_value=prices,
+            expected_value=sorted(prices),
+            step_msg="Check the items are sorted by price"
+        )
+        assert self.result.step_status
+
+    def test_item_prices_round_trips(self):
+        """
+        Benchmark the driver round trips of reading the item prices in bulk against
+        reading every element.
+        """
+        self.login()
+        driver = self.browser.driver
+        start_count = driver.command_count
+        per_element_prices = self.home_page.get_item_prices(bulk=False)
+        per_element_trips = driver.command_count - start_count
+        start_count = driver.command_count
+        bulk_prices = self.home_page.get_item_prices()
+        bulk_trips = driver.command_count - start_count
+        self.log.info(f"get_item_prices round trips: per element {per_element_trips}, "
+                      f"bulk {bulk_trips}")
+        self.result.check_equals_to(
+            actual_value=bulk_prices,
+            expected_value=per_element_prices,
+            step_msg="Check the bulk read gets the same names and prices"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=bulk_trips,
+            expected_value=1,
+            step_msg="Check the bulk read takes a single round trip"
+        )
+        assert self.result.step_status
+
+    def test_catalog_index(self):
+        """
+        Check the items are found through the catalog index with a constant number of
+        round trips, even after the inventory is reordered.
+        """
+        self.login()
+        self.home_page.get_catalog_index()
+        self.home_page.filter_products(FilteringBy.HIGH_TO_LOW)
+        driver = self.browser.driver
+        trips = {}
+        for item_name in self.home_page.get_item_prices():
+            start_count = driver.command_count
+            item = self.home_page.get_single_inventory_item(item_name)
+            trips[item_name] = driver.command_count - start_count
+            self.result.check_equals_to(
+                actual_value=self.home_page.get_text_element(
+                    self.home_page.page_dict["item_name"], item),
+                expected_value=item_name,
+                step_msg=f"Check the indexed item is {item_name}"
+            )
+            assert self.result.step_status
+        self.log.info(f"Round trips per lookup: {trips}")
+        self.result.check_equals_to(
+            actual_value=set(trips.values()),
+            expected_value={1},
+            step_msg="Check every lookup takes a single round trip"
+        )
+        assert self.result.step_status
+
+    def test_batched_cart(self, monkeypatch):
+        """
+        Check a batch of items is added and removed with the same round trips as a single
+        item, leaving the items already in the requested state as they are.
+
+        Args:
+            monkeypatch(MonkeyPatch): breaks the catalog index.
+        """
+        self.login()
+        self.home_page.get_catalog_index()
+        driver = self.browser.driver
+        items = ["Sauce Labs Onesie", "Sauce Labs Bike Light", "Sauce Labs Backpack"]
+        trips = {}
+        for batch in (items[:1], items):
+            start_count = driver.command_count
+            self.result.check_equals_to(
+                actual_value=self.home_page.add_items_to_cart(batch),
+                expected_value=len(batch),
+                step_msg=f"Check the cart quantity after including {batch}"
+            )
+            assert self.result.step_status
+            trips[len(batch)] = driver.command_count - start_count
+        self.log.info(f"Round trips per batch size: {trips}")
+        self.result.check_equals_to(
+            actual_value=trips[len(items)],
+            expected_value=trips[1],
+            step_msg="Check the batch size doesn't change the round trips"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=self.home_page.remove_items_from_cart(items[1:]),
+            expected_value=1,
+            step_msg="Check the cart quantity after removing a batch"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=self.home_page.add_items_to_cart([items[0], items[0]]),
+            expected_value=1,
+            step_msg="Check a repeated item is added once"
+        )
+        assert self.result.step_status
+        with pytest.raises(HomePageException):
+            self.home_page.add_items_to_cart(["Sauce Labs Unicorn"])
+
+        def broken_index():
+            raise BrowserManagerException("Unable to read the inventory")
+
+        monkeypatch.setattr(self.home_page, "get_catalog_index", broken_index)
+        with pytest.raises(HomePageException, match="Unable to update the cart"):
+            self.home_page.add_items_to_cart(items[:1])
+
+    def test_element_cache(self):
+        """
+        Check the element cache saves driver round trips of the polling waits and drops
+        the stale elements.
+        """
+        def add_items(browser):
+            home_page = HomePage(browser, self.TESTING_PAGE)
+            login_page = LoginPage(browser, self.TESTING_PAGE)
+            login_page.open_page()
+            login_page.login_page(**login_page.get_just_specific_user("standard_user"))
+            cart_icon = home_page.page_dict["cart_icon"]
+            counts = []
+            for item_name in ["Sauce Labs Onesie", "Sauce Labs Bike Light", "Sauce Labs Backpack"]:
+                home_page.add_item_to_cart(home_page.get_single_inventory_item(item_name))
+                counts.append(home_page.get_text_element(cart_icon))
+            # the reset removes the badge, a new one is rendered with the next item
+            home_page.click_on_lateral_menu()
+            home_page.click_on_reset_app()
+            home_page.add_item_to_cart(home_page.get_single_inventory_item("Sauce Labs Onesie"))
+            counts.append(home_page.get_text_element(cart_icon))
+            return counts, browser.driver.command_count
+
+        uncached_counts, uncached_trips = add_items(
+            BrowserManager(driver=FakeWebDriver(), wait_strategy=WaitStrategy.POLLING))
+        cached_browser = BrowserManager(
+            driver=FakeWebDriver(), element_cache=True, wait_strategy=WaitStrategy.POLLING)
+        cached_counts, cached_trips = add_items(cached_browser)
+        self.log.info(f"Round trips: uncached {uncached_trips}, cached {cached_trips}, "
+                      f"cache counters {cached_browser.element_cache.get_counters()}")
+        self.result.check_equals_to(
+            actual_value=cached_counts,
+            expected_value=uncached_counts,
+            step_msg="Check the cart quantities are the same with the element cache"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=cached_trips < uncached_trips,
+            expected_value=True,
+            step_msg="Check the element cache saves driver round trips"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=cached_browser.element_cache.stale > 0,
+            expected_value=True,
+            step_msg="Check the re-rendered cart badge is detected as stale"
+        )
+        assert self.result.step_status
+
+    def test_wait_strategies(self, tmp_path):
+        """
+        Check waiting in page takes fewer round trips than polling, with the same results,
+        and the latencies are recorded per locator.
+
+        Args:
+            tmp_path(Path): temporary folder for the reference cache of every strategy.
+        """
+        results = {}
+        for strategy in WaitStrategy:
+            # every strategy builds its own catalog index, so they take the same steps
+            configure_reference_cache(cache_dir=str(tmp_path / strategy.value))
+            browser = BrowserManager(driver=FakeWebDriver(), wait_strategy=strategy)
+            login_page = LoginPage(browser, self.TESTING_PAGE)
+            home_page = HomePage(browser, self.TESTING_PAGE)
+            login_page.open_page()
+            login_page.login_page(**login_page.get_just_specific_user("standard_user"))
+            home_page.add_item_to_cart(home_page.get_single_inventory_item("Sauce Labs Onesie"))
+            results[strategy] = (home_page.get_num_items_in_cart(), browser.driver.command_count)
+        self.log.info(f"Round trips: {results}")
+        self.result.check_equals_to(
+            actual_value=results[WaitStrategy.MUTATION][0],
+            expected_value=results[WaitStrategy.POLLING][0],
+            step_msg="Check both strategies read the same cart quantity"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=results[WaitStrategy.MUTATION][1] < results[WaitStrategy.POLLING][1],
+            expected_value=True,
+            step_msg="Check waiting in page saves driver round trips"
+        )
+        assert self.result.step_status
+        recorded = {(row["locator"], row["strategy"]) for row in WaitEngine.get_latency_summary()}
+        self.result.check_equals_to(
+            actual_value={("item_by_link", strategy.value)
+                          for strategy in WaitStrategy} <= recorded,
+            expected_value=True,
+            step_msg="Check the item waits are recorded for both strategies"
+        )
+        assert self.result.step_status
+
+    def test_login_as(self):
+        """
+        Check the cached session of a user logins with fewer round trips than the UI, and
+        an expired session is not injected.
+        """
+        LoginPage.clear_auth_states()
+        trips = []
+        for _ in range(2):
+            browser = BrowserManager(driver=FakeWebDriver())
+            LoginPage(browser, self.TESTING_PAGE).login_as("standard_user")
+            trips.append(browser.driver.command_count)
+            self.result.check_equals_to(
+                actual_value=len(HomePage(browser, self.TESTING_PAGE).get_inventory_items()),
+                expected_value=6,
+                step_msg="Check the inventory is shown after the login"
+            )
+            assert self.result.step_status
+        self.log.info(f"Round trips: UI login {trips[0]}, cached session {trips[1]}")
+        self.result.check_equals_to(
+            actual_value=trips[1] < trips[0],
+            expected_value=True,
+            step_msg="Check the cached session saves driver round trips"
+        )
+        assert self.result.step_status
+        for state in LoginPage._auth_states.values():  # pylint: disable=protected-access
+            for cookie in state["cookies"]:
+                cookie["expiry"] = 0
+        LoginPage(BrowserManager(driver=FakeWebDriver()), self.TESTING_PAGE).login_as(
+            "standard_user")
+        self.result.check_equals_to(
+            actual_value=[cookie.get("expiry")
+                          for state in LoginPage._auth_states.values()  # pylint: disable=protected-access
+                          for cookie in state["cookies"]],
+            expected_value=[None],
+            step_msg="Check an expired session logins through the UI again"
+        )
+        assert self.result.step_status
+        LoginPage.clear_auth_states()
+
+    def test_checkout_flow(self):
+        """
+        Check an item added from its page can be bought.
+        """
+        self.login()
+        self.home_page.move_item_page("Sauce Labs Bike Light")
+        self.product_page.add_item_to_cart()
+        self.product_page.back_to_home_page()
+        self.home_page.move_to_cart_page()
+        self.result.check_equals_to(
+            actual_value=self.cart_page.get_item_prices(),
+            expected_value={"Sauce Labs Bike Light": "$9.99"},
+            step_msg="Check the cart contains the item and its price"
+        )
+        assert self.result.step_status
+        self.cart_page.move_to_checkout_page()
+        self.checkout_page.filed_checkout_info(
+            first_name="Juan", last_name="Camaney", postal_code="12345")
+        self.checkout_page.continue_checkout_step_two()
+        self.checkout_page.finish_buy()
+        self.result.check_equals_to(
+            actual_value=self.checkout_page.get_current_url().split("/")[-1],
+            expected_value=self.checkout_page.testing_page,
+            step_msg="Check the checkout complete page is reached"
+        )
+        assert self.result.step_status
+
+    def test_fill_modes(self):
+        """
+        Check the checkout form filled by script takes a single round trip and it is
+        accepted as the typed one, also with a numeric postal code as the API can give.
+        """
+        self.login()
+        self.home_page.add_items_to_cart(["Sauce Labs Onesie"])
+        driver = self.browser.driver
+        trips = {}
+        for fill_mode in FillMode:
+            self.home_page.move_to_cart_page()
+            self.cart_page.move_to_checkout_page()
+            start_count = driver.command_count
+            self.checkout_page.filed_checkout_info(
+                fill_mode=fill_mode, first_name="Juan", last_name="Camaney", postal_code=12345)
+            trips[fill_mode] = driver.command_count - start_count
+            self.checkout_page.continue_checkout_step_two()
+            self.result.check_equals_to(
+                actual_value=self.checkout_page.get_current_url().split("/")[-1],
+                expected_value="checkout-step-two.html",
+                step_msg=f"Check the form filled by {fill_mode.value} is accepted"
+            )
+            assert self.result.step_status
+            self.checkout_page.which_checkout_page = 0
+            self.browser.open_page(f"{self.login_page.testing_page}inventory.html")
+        self.log.info(f"Round trips per fill mode: {trips}")
+        self.result.check_equals_to(
+            actual_value=trips[FillMode.SCRIPT],
+            expected_value=1,
+            step_msg="Check the form is filled by script in a single round trip"
+        )
+        assert self.result.step_status
+
+    def test_page_readiness(self):
+        """
+        Check the reads of a ready page skip the waits only for elements which already meet
+        their condition, and every step of the checkout signals its readiness after moving
+        to it.
+        """
+        browser = BrowserManager(driver=FakeWebDriver(), wait_strategy=WaitStrategy.POLLING)
+        login_page = LoginPage(browser, self.TESTING_PAGE)
+        home_page = HomePage(browser, self.TESTING_PAGE)
+        login_page.open_page()
+        login_page.login_page(**login_page.get_just_specific_user("standard_user"))
+        hidden_menu = ("CLASS_NAME", "bm-menu-wrap")
+        browser.page_ready = True
+        start_count = browser.driver.command_count
+        browser.get_present_element(hidden_menu, None, 1)
+        self.result.check_equals_to(
+            actual_value=browser.driver.command_count - start_count,
+            expected_value=1,
+            step_msg="Check a present element of a ready page is found in one round trip"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=[row for row in WaitEngine.get_latency_summary()
+                          if row["locator"] == "class name=bm-menu-wrap"],
+            expected_value=[],
+            step_msg="Check the lookup is not recorded as the latency of a wait"
+        )
+        assert self.result.step_status
+        with pytest.raises(BrowserManagerException):
+            browser.get_visible_element(hidden_menu, None, 0.2)
+        self.result.check_equals_to(
+            actual_value=home_page.get_current_filter_applied(),
+            expected_value="Name (A to Z)",
+            step_msg="Check the visible elements of a ready page are still read"
+        )
+        assert self.result.step_status
+        home_page.move_to_cart_page()
+        self.result.check_equals_to(
+            actual_value=browser.page_ready,
+            expected_value=False,
+            step_msg="Check moving to another page clears the readiness"
+        )
+        assert self.result.step_status
+        self.login()
+        self.home_page.add_items_to_cart(["Sauce Labs Onesie"])
+        self.step_move_to_next_page(self.home_page.move_to_cart_page, self.cart_page)
+        self.step_move_to_next_page(self.cart_page.move_to_checkout_page, self.checkout_page)
+        self.checkout_page.filed_checkout_info(
+            first_name="Juan", last_name="Camaney", postal_code="12345")
+        self.step_move_to_next_page(
+            self.checkout_page.continue_checkout_step_two, self.checkout_page)
+        self.step_move_to_next_page(self.checkout_page.finish_buy, self.checkout_page)
+        self.step_move_to_next_page(self.checkout_page.back_home, self.home_page)
+
+    def test_session_check(self, monkeypatch):
+        """
+        Check a browser session which no longer answers is detected, so the pool doesn't
+        lease it again.
+
+        Args:
+            monkeypatch(MonkeyPatch): ends the session of the fake driver.
+        """
+        self.login()
+        self.browser.check_session()
+
+        def session_gone(_):
+            raise InvalidSessionIdException("invalid session id")
+
+        monkeypatch.setattr(FakeWebDriver, "current_url", property(session_gone))
+        with pytest.raises(BrowserManagerException, match="not responding"):
+            self.browser.check_session()
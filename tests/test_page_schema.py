@@ -0,0 +1,102 @@
+"""
+Page schema unit tests, compiling the page inputs yaml into locators
+"""
+import pickle
+import pytest
+from selenium.webdriver.common.by import By
+from tests.base_test import BaseTest
+from utils.page_schema import (
+    Locator,
+    PageSchemaCache,
+    PageSchemaException,
+    get_page_inputs
+)
+
+
+@pytest.mark.Unit
+class TestPageSchema(BaseTest):
+    """
+    Test class to validate the page schema compiler.
+
+    Attributes:
+        TESTING_PAGE (str): Path to the test configuration file.
+    """
+    TESTING_PAGE =  "tests/test_inputs/sauce_demo.yaml"
+
+    @pytest.fixture(autouse=True)
+    def setup(self, result):  # pylint: disable=arguments-differ
+        super().setup(None, result)
+
+    def test_compiled_locators(self):
+        """
+        Check the locators are compiled with the By value resolved and can be pickled.
+        """
+        login_button = get_page_inputs(self.TESTING_PAGE, "login_page")["login_bttn"]
+        self.result.check_equals_to(
+            actual_value=tuple(login_button),
+            expected_value=(By.ID, "login-button"),
+            step_msg="Check the locator unpacks as the resolved (by, value) pair"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=pickle.loads(pickle.dumps(login_button)),
+            expected_value=login_button,
+            step_msg="Check the locator survives a pickle round trip"
+        )
+        assert self.result.step_status
+        with pytest.raises(AttributeError):
+            login_button.value = "other"
+
+    def test_duplicate_keys(self, tmp_path):
+        """
+        Check a page with a repeated key is refused.
+
+        Args:
+            tmp_path(Path): temporary folder for the yaml and the cache.
+        """
+        yaml_file = tmp_path / "pages.yaml"
+        yaml_file.write_text(
+            "general_inputs:\n"
+            "  login_page:\n"
+            "    username: {by: ID, value: user-name}\n"
+            "    username: {by: ID, value: password}\n",
+            encoding="utf-8"
+        )
+        with pytest.raises(PageSchemaException, match="Duplicate key 'username' at line 4"):
+            PageSchemaCache(str(tmp_path / "cache")).load(str(yaml_file))
+
+    def test_disk_cache(self, tmp_path):
+        """
+        Check the compiled schema is stored once and read back from the cache.
+
+        Args:
+            tmp_path(Path): temporary folder for the yaml and the cache.
+        """
+        yaml_file = tmp_path / "pages.yaml"
+        yaml_file.write_text(
+            "general_inputs:\n"
+            "  login_page:\n"
+            "    path: https://www.saucedemo.com/\n"
+            "    username: {by: ID, value: user-name}\n",
+            encoding="utf-8"
+        )
+        cache = PageSchemaCache(str(tmp_path / "cache"))
+        compiled = cache.load(str(yaml_file))
+        self.result.check_equals_to(
+            actual_value=len(list((tmp_path / "cache").glob("*.pickle"))),
+            expected_value=1,
+            step_msg="Check the compiled schema is written to the cache"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=cache.load(str(yaml_file)),
+            expected_value=compiled,
+            step_msg="Check the cached schema matches the compiled one"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=compiled["login_page"]["username"],
+            expected_value=Locator("username", By.ID, "user-name"),
+            step_msg="Check the cached locator is resolved"
+        )
+        assert self.result.step_status
@@ -0,0 +1,84 @@
+"""
+Profile manager unit tests, building the template profile shared by the workers
+"""
+import os
+import threading
+import time
+import pytest
+from tests.base_test import BaseTest
+from utils.profile_manager import ProfileManager
+
+
+@pytest.mark.Unit
+class TestProfileManager(BaseTest):
+    """
+    Test class to validate the template profile and the profiles cloned from it.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, result):  # pylint: disable=arguments-differ
+        super().setup(None, result)
+
+    def test_single_build(self, tmp_path):
+        """
+        Check parallel builds of a template run once, and no profile is cloned from it
+        before it is complete.
+
+        Args:
+            tmp_path(Path): temporary folder for the profiles.
+        """
+        manager = ProfileManager(str(tmp_path))
+        builds = []
+
+        def build(profile_dir):
+            builds.append(profile_dir)
+            with open(os.path.join(profile_dir, "Preferences"), "w", encoding="utf-8"):
+                pass
+            time.sleep(0.2)
+
+        threads = [threading.Thread(target=manager.build_template, args=("chrome", build))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        building_profile = manager.create("chrome")
+        for thread in threads:
+            thread.join()
+        profile = manager.create("chrome")
+        self.result.check_equals_to(
+            actual_value=(len(builds), os.listdir(building_profile), sorted(os.listdir(profile))),
+            expected_value=(1, [], ["Preferences"]),
+            step_msg="Check the template is built once and cloned only once complete"
+        )
+        assert self.result.step_status
+
+    def test_crashed_build(self, tmp_path):
+        """
+        Check a crashed build leaves no template behind, so the next one builds it again.
+
+        Args:
+            tmp_path(Path): temporary folder for the profiles.
+        """
+        manager = ProfileManager(str(tmp_path))
+
+        def crash(_):
+            raise RuntimeError("browser crashed")
+
+        with pytest.raises(RuntimeError):
+            manager.build_template("chrome", crash)
+        # a template folder written by a previous version, without the completion marker
+        os.makedirs(manager.template_dir("chrome"))
+        self.result.check_equals_to(
+            actual_value=manager.has_template("chrome"),
+            expected_value=False,
+            step_msg="Check an incomplete template is not used"
+        )
+        assert self.result.step_status
+        manager.build_template("chrome", lambda profile_dir: None)
+        self.result.check_equals_to(
+            actual_value=(manager.has_template("chrome"),
+                          [name for name in os.listdir(tmp_path) if name.startswith(".building")]),
+            expected_value=(True, []),
+            step_msg="Check the template is built again and no temporary folder is left"
+        )
+        assert self.result.step_status
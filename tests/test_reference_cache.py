@@ -0,0 +1,112 @@
+"""
+Reference cache unit tests, keeping the scraped reference data on disk
+"""
+import json
+import pytest
+from tests.base_test import BaseTest
+from utils.reference_cache import ReferenceCache, ReferenceCacheException
+
+
+@pytest.mark.Unit
+class TestReferenceCache(BaseTest):
+    """
+    Test class to validate the reference data cache.
+
+    Attributes:
+        scrapes (list): data returned by every call to 'scrape'.
+    """
+    scrapes = None
+
+    @pytest.fixture(autouse=True)
+    def setup(self, result):  # pylint: disable=arguments-differ
+        super().setup(None, result)
+        self.scrapes = []
+
+    def scrape(self):
+        """Scrapes a new version of the data"""
+        self.scrapes.append({"version": len(self.scrapes) + 1})
+        return self.scrapes[-1]
+
+    def test_shared_between_workers(self, tmp_path):
+        """
+        Check the data scraped by a worker is reused by another one.
+
+        Args:
+            tmp_path(Path): temporary folder for the cache.
+        """
+        first_worker = ReferenceCache(str(tmp_path))
+        first_worker.get("catalog", self.scrape)
+        # workers are separate processes, they only share the disk
+        ReferenceCache._memo.clear()  # pylint: disable=protected-access
+        second_worker = ReferenceCache(str(tmp_path))
+        self.result.check_equals_to(
+            actual_value=second_worker.get("catalog", self.scrape),
+            expected_value={"version": 1},
+            step_msg="Check the second worker reads the stored data"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=(len(self.scrapes), second_worker.hits),
+            expected_value=(1, 1),
+            step_msg="Check the data is scraped just once"
+        )
+        assert self.result.step_status
+
+    def test_expired_and_tampered_entries(self, tmp_path):
+        """
+        Check an expired entry, or one whose data doesn't match its content hash, is
+        scraped again.
+
+        Args:
+            tmp_path(Path): temporary folder for the cache.
+        """
+        cache = ReferenceCache(str(tmp_path), ttl=60)
+        cache.get("catalog", self.scrape)
+        entry_file = next(tmp_path.glob("*.json"))
+        entry = json.loads(entry_file.read_text(encoding="utf-8"))
+        entry["created"] -= 120
+        entry_file.write_text(json.dumps(entry), encoding="utf-8")
+        ReferenceCache._memo.clear()  # pylint: disable=protected-access
+        self.result.check_equals_to(
+            actual_value=cache.get("catalog", self.scrape),
+            expected_value={"version": 2},
+            step_msg="Check the expired entry is scraped again"
+        )
+        assert self.result.step_status
+        entry = json.loads(entry_file.read_text(encoding="utf-8"))
+        entry["data"]["version"] = 100
+        entry_file.write_text(json.dumps(entry), encoding="utf-8")
+        ReferenceCache._memo.clear()  # pylint: disable=protected-access
+        self.result.check_equals_to(
+            actual_value=cache.get("catalog", self.scrape),
+            expected_value={"version": 3},
+            step_msg="Check the tampered entry is scraped again"
+        )
+        assert self.result.step_status
+        with pytest.raises(ReferenceCacheException):
+            ReferenceCache(str(tmp_path), ttl=0)
+
+    def test_strict_mode(self, tmp_path):
+        """
+        Check the strict mode scrapes again as soon as the live page changes.
+
+        Args:
+            tmp_path(Path): temporary folder for the cache.
+        """
+        page = {"fingerprint": "a"}
+        ReferenceCache(str(tmp_path)).get("catalog", self.scrape, lambda: page["fingerprint"])
+        strict_cache = ReferenceCache(str(tmp_path), strict=True)
+        strict_cache.get("catalog", self.scrape, lambda: page["fingerprint"])
+        page["fingerprint"] = "b"
+        self.result.check_equals_to(
+            actual_value=strict_cache.get("catalog", self.scrape, lambda: page["fingerprint"]),
+            expected_value={"version": 2},
+            step_msg="Check the changed page is scraped again"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=(strict_cache.hits, strict_cache.scrapes),
+            expected_value=(1, 1),
+            step_msg="Check the unchanged page was read from the cache"
+        )
+        assert self.result.step_status
@@ -0,0 +1,64 @@
+"""
+Shard runner unit tests, spreading the test classes across worker processes
+"""
+import os
+import subprocess
+import sys
+import pytest
+from tests.base_test import BaseTest
+from utils.shard_runner import NODEIDS_ENV, WORKER_ENV, schedule_partitioned
+
+
+@pytest.mark.Unit
+class TestShardRunner(BaseTest):
+    """
+    Test class to validate the scheduling of the test classes across workers.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, result):  # pylint: disable=arguments-differ
+        super().setup(None, result)
+
+    def test_partitioned_browsers(self):
+        """
+        Check the classes of every browser run in workers of their own, the extra workers
+        going to the slowest browser.
+        """
+        partitions = {
+            browser: {f"test_{name}.py::Test[{browser}]": [f"test_{name}.py::Test::t[{browser}]"]
+                      for name in ("a", "b", "c")}
+            for browser in ("Chrome", "Firefox")
+        }
+        durations = {f"test_{name}.py::Test::t[Firefox]": 10.0 for name in ("a", "b", "c")}
+        durations.update({f"test_{name}.py::Test::t[Chrome]": 1.0 for name in ("a", "b", "c")})
+        shards = schedule_partitioned(partitions, durations, workers=3)
+        browsers = [{nodeid.split("[")[-1] for nodeid in nodeids} for _, nodeids in shards]
+        self.result.check_equals_to(
+            actual_value=(all(len(names) == 1 for names in browsers),
+                          sorted(name for names in browsers for name in names)),
+            expected_value=(True, ["Chrome]", "Firefox]", "Firefox]"]),
+            step_msg="Check no worker mixes browsers and Firefox gets the extra worker"
+        )
+        assert self.result.step_status
+
+    def test_work_dir_removed(self, tmp_path):
+        """
+        Check a sharded run leaves nothing behind in the temporary folder.
+
+        Args:
+            tmp_path(Path): temporary folder of the sharded run.
+        """
+        env = {key: value for key, value in os.environ.items()
+               if key not in (WORKER_ENV, NODEIDS_ENV)}
+        env["TMPDIR"] = str(tmp_path)
+        completed = subprocess.run(
+            [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--workers=2",
+             f"{__file__}::TestShardRunner::test_partitioned_browsers"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=env,
+            capture_output=True, text=True, timeout=120, check=False)
+        self.result.check_equals_to(
+            actual_value=(completed.returncode, os.listdir(tmp_path)),
+            expected_value=(0, []),
+            step_msg="Check the sharded run passes and removes its work dir"
+        )
+        assert self.result.step_status
@@ -0,0 +1,120 @@
+"""
+User store unit tests, the hermetic storage backends of the users API
+"""
+import pytest
+from tests.base_test import BaseTest
+from utils.user_store import (
+    MemoryUserStore,
+    SQLiteUserStore,
+    StoreBackend,
+    UserStoreException,
+    create_user_store,
+    seed_users
+)
+
+USERS = [
+    {"first_name": "Juan", "last_name": "Camaney", "zip_code": "12345"},
+    {"first_name": "Ana", "last_name": "Camaney", "zip_code": "54321"},
+    {"first_name": "Juan", "last_name": "Perez", "zip_code": "12345", "vip": True},
+]
+
+
+@pytest.mark.Unit
+class TestUserStore(BaseTest):
+    """
+    Test class to validate the memory and SQLite user stores.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, result):  # pylint: disable=arguments-differ
+        super().setup(None, result)
+
+    @pytest.mark.parametrize("store_class", [MemoryUserStore, SQLiteUserStore])
+    def test_find_by_fields(self, store_class):
+        """
+        Check the users are returned in insertion order, filtered by any of their fields,
+        and a scan resumes after the cursor of any user.
+
+        Args:
+            store_class(type): user store to validate.
+        """
+        store = store_class()
+        store.insert(USERS[0])
+        inserted, errors = store.insert_many([{"first_name": ["Juan"]}, *USERS[1:], "Juan"])
+        self.result.check_equals_to(
+            actual_value=(inserted, len(errors)),
+            expected_value=(2, 2),
+            step_msg=f"Check {store_class.__name__} inserts the valid users and rejects the rest"
+        )
+        assert self.result.step_status
+        self.result.check_equals_to(
+            actual_value=(store.find(), store.find({"first_name": "Juan", "zip_code": "12345"}),
+                          store.find({"last_name": "Doe"})),
+            expected_value=(USERS, [USERS[0], USERS[2]], []),
+            step_msg=f"Check the users found by {store_class.__name__}"
+        )
+        assert self.result.step_status
+        cursor, _ = next(store.scan({"first_name": "Juan"}))
+        self.result.check_equals_to(
+            actual_value=[user for _, user in store.scan(
+                {"first_name": "Juan"}, ["last_name"], after=cursor, batch_size=1)],
+            expected_value=[{"last_name": "Perez"}],
+            step_msg=f"Check the scan of {store_class.__name__} resumes after its cursor"
+        )
+        assert self.result.step_status
+        for cursor in ("x", "-2", "01", " 1"):
+            with pytest.raises(UserStoreException, match="Invalid cursor"):
+                next(store.scan(after=cursor))
+        with pytest.raises(UserStoreException, match="can not be filtered"):
+            next(store.scan({"age": "30"}))
+        with pytest.raises(UserStoreException, match="must be a json object"):
+            store.insert([1])
+        store.close()
+
+    def test_seeded_backends(self, tmp_path):
+        """
+        Check the hermetic backends are seeded with the same fake users, and a stored
+        database is not seeded again.
+
+        Args:
+            tmp_path(Path): temporary folder for the SQLite database.
+        """
+        db_path = str(tmp_path / "users.db")
+        memory = create_user_store(StoreBackend.MEMORY)
+        sqlite = create_user_store(StoreBackend.SQLITE, sqlite_path=db_path)
+        self.result.check_equals_to(
+            actual_value=memory.find() == sqlite.find() and memory.count() == 100,
+            expected_value=True,
+            step_msg="Check both backends are seeded with the same users"
+        )
+        assert self.result.step_status
+        seed_users(sqlite, seed=1)
+        sqlite.close()
+        self.result.check_equals_to(
+            actual_value=SQLiteUserStore(db_path).count(),
+            expected_value=100,
+            step_msg="Check the stored database is not seeded again"
+        )
+        assert self.result.step_status
+        with pytest.raises(UserStoreException):
+            create_user_store(StoreBackend.MONGO)
+
+    @pytest.mark.parametrize("backend", [StoreBackend.MEMORY, StoreBackend.SQLITE])
+    def test_sample(self, backend):
+        """
+        Check the sampled users are distinct stored users, and the same ones for a seed.
+
+        Args:
+            backend(StoreBackend): hermetic backend to validate.
+        """
+        store = create_user_store(backend)
+        users = store.find()
+        sample = store.sample(5, seed=3)
+        self.result.check_equals_to(
+            actual_value=(all(user in users for user in sample),
+                          len({tuple(user.values()) for user in sample}),
+                          store.sample(5, seed=3) == sample, len(store.sample(500))),
+            expected_value=(True, 5, True, 100),
+            step_msg=f"Check the users sampled from the {backend.value} store"
+        )
+        assert self.result.step_status
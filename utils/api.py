@@ -2,32 +2,58 @@
 API MongoDB manager file
 """
 import argparse
-from flask import Flask, jsonify, request
-from pymongo import MongoClient
+import codecs
+import json
+import threading
+from itertools import chain, islice
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+from test_utils.logger_manager import LoggerManager
+from utils.user_store import (
+    USER_FIELDS,
+    MongoUserStore,
+    StoreBackend,
+    UserStoreException,
+    create_user_store
+)
 
 
-class APIMongoDB:
+class APIServerException(Exception):
+    """APIServer Exception class"""
+
+
+class UsersAPI:
     """
-    API MongoDB class manager
+    Users API, served from any user store
 
     Attributes:
         app(Flask): Flask instance
-        mongo_uri(str): mongo db uri
-        db_name(str): data base name
-        collection_name(str): collection name
+        store(UserStore): storage of the users
+        DEFAULT_PAGE_SIZE(int): users per page when paginating without 'limit'
+        MAX_PAGE_SIZE(int): highest 'limit' and 'batch_size' accepted
+        DEFAULT_CHUNK_SIZE(int): users inserted at once by a bulk upload
+        MAX_CHUNK_SIZE(int): highest 'chunk_size' accepted
+        MAX_DOCUMENT_SIZE(int): characters a user of a json array upload can take
+        MAX_CHUNK_ERRORS(int): error messages reported per chunk
     """
-    def __init__(self, app, mongo_uri, db_name, collection_name):
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 1000
+    DEFAULT_CHUNK_SIZE = 1000
+    MAX_CHUNK_SIZE = 10000
+    MAX_DOCUMENT_SIZE = 1 << 20
+    MAX_CHUNK_ERRORS = 10
+
+    def __init__(self, app, store):
         self.app = app
-        self.mongo_uri = mongo_uri
-        self.client = MongoClient(mongo_uri)
-        self.db = self.client[db_name]
-        self.collection = self.db[collection_name]
+        self.store = store
         self.add_routes()
 
     def add_routes(self):
         """Register API routs"""
         self.app.add_url_rule("/", view_func=self.home)
         self.app.add_url_rule("/users", view_func=self.get_users, methods=["GET"])
+        self.app.add_url_rule("/users/sample", view_func=self.sample_users, methods=["GET"])
+        self.app.add_url_rule("/users/bulk", view_func=self.bulk_insert, methods=["POST"])
         self.app.add_url_rule("/add_user", view_func=self.add_user, methods=["POST"])
 
     def home(self):
@@ -38,20 +64,327 @@ class APIMongoDB:
 
     def get_users(self):
         """
-        GET method
+        GET method, the users can be filtered by their fields, e.g. /users?last_name=Doe
+
+        Without more arguments every user is returned in a json list. Other arguments:
+            limit, after: a page of 'limit' users after the cursor 'after', returned as
+                          {"users": [...], "next": cursor of the next page or null}.
+            fields: comma separated fields returned of every user.
+            format=ndjson: one json user per line, written while the store reads them,
+                           'batch_size' users at a time.
+        """
+        filters = {field: request.args[field] for field in USER_FIELDS if field in request.args}
+        fields = [field for field in request.args.get("fields", "").split(",") if field]
+        stream = request.args.get("format") == "ndjson"
+        paginated = not stream and ("limit" in request.args or "after" in request.args)
+        try:
+            limit = self._int_arg("limit", self.DEFAULT_PAGE_SIZE if paginated else None)
+            batch_size = self._int_arg("batch_size", self.DEFAULT_PAGE_SIZE)
+            users = self.store.scan(filters, fields, request.args.get("after"), batch_size)
+            if limit is not None:
+                # one more user than the page tells whether there is a next page
+                users = islice(users, limit if stream else limit + 1)
+            # the first user starts the scan, so an invalid cursor is still a bad request
+            users = chain(list(islice(users, 1)), users)
+        except (ValueError, UserStoreException) as e:
+            return jsonify({"message": str(e)}), 400
+        if stream:
+            return Response(self._ndjson(users, batch_size), mimetype="application/x-ndjson")
+        if not paginated:
+            return jsonify([user for _, user in users])
+        page = list(users)
+        return jsonify({
+            "users": [user for _, user in page[:limit]],
+            "next": page[limit - 1][0] if len(page) > limit else None,
+        })
+
+    def sample_users(self):
+        """
+        GET method, random users picked by the store, e.g. /users/sample?n=2&seed=7
+
+        Arguments:
+            n: number of users, 1 by default.
+            seed: integer giving the same users again.
+        """
+        try:
+            n = self._int_arg("n", 1)
+            seed = int(request.args["seed"]) if "seed" in request.args else None
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        return jsonify(self.store.sample(n, seed))
+
+    def bulk_insert(self):
+        """
+        POST method, inserts the users of a streamed body, e.g. /users/bulk?chunk_size=500
+
+        The body is one json user per line, or a json array when sent as 'application/json'.
+        It is read while the users are inserted, 'chunk_size' users at a time, so the
+        memory used doesn't depend on the size of the upload. Returns the users inserted
+        and failed, in total and per chunk.
+        """
+        try:
+            chunk_size = self._int_arg("chunk_size", self.DEFAULT_CHUNK_SIZE, self.MAX_CHUNK_SIZE)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        if request.mimetype == "application/json":
+            items = self._read_json_array(request.stream, self.MAX_DOCUMENT_SIZE)
+        else:
+            items = self._read_ndjson(request.stream, self.MAX_DOCUMENT_SIZE)
+        report = {"inserted": 0, "failed": 0, "chunks": []}
+        users, errors = [], []
+        try:
+            for number, item in items:
+                if isinstance(item, dict):
+                    users.append(item)
+                else:
+                    reason = item if isinstance(item, ValueError) else "not a json object"
+                    errors.append(f"User {number}: {reason}")
+                if len(users) + len(errors) == chunk_size:
+                    self._insert_chunk(report, users, errors)
+                    users, errors = [], []
+        except ValueError as e:
+            # the rest of a broken json array can not be read
+            errors.append(f"Body: {e}")
+        if users or errors:
+            self._insert_chunk(report, users, errors)
+        return jsonify(report), 207 if report["failed"] else 201
+
+    def _insert_chunk(self, report, users, errors):
+        """
+        Inserts a chunk of users and adds its result to the report.
+
+        Args:
+            report(dict): bulk insert report, updated in place.
+            users(list): valid users of the chunk.
+            errors(list): messages of the chunk items which are not valid users.
+        """
+        inserted, insert_errors = self.store.insert_many(users) if users else (0, [])
+        failed = len(errors) + len(users) - inserted
+        report["inserted"] += inserted
+        report["failed"] += failed
+        report["chunks"].append({
+            "inserted": inserted,
+            "failed": failed,
+            "errors": (errors + insert_errors)[:self.MAX_CHUNK_ERRORS],
+        })
+
+    @staticmethod
+    def _read_ndjson(stream, max_document_size):
+        """
+        Yields the json documents of a stream with one of them per line, holding one line
+        of at most 'max_document_size' bytes at a time.
+
+        Args:
+            stream(stream): binary stream.
+            max_document_size(int): bytes a line can take.
+
+        Yields:
+            tuple: (line number, document, or the ValueError of a line which is not json
+                   or is too long).
+        """
+        number = 0
+        while True:
+            line = stream.readline(max_document_size + 1)
+            if not line:
+                return
+            number += 1
+            if len(line) > max_document_size and not line.endswith(b"\n"):
+                # the rest of the line is skipped without keeping it
+                while line and not line.endswith(b"\n"):
+                    line = stream.readline(max_document_size + 1)
+                yield number, ValueError(f"Line longer than {max_document_size} bytes")
+                continue
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, e
+
+    @staticmethod
+    def _read_json_array(stream, max_document_size, read_size=65536):
+        """
+        Yields the items of a json array as they are read from the stream, holding one
+        item at a time.
+
+        Args:
+            stream(stream): binary stream.
+            max_document_size(int): characters an item can take.
+            read_size(int:optional): bytes read from the stream at once.
+
+        Yields:
+            tuple: (item number, item).
+
+        Raises:
+            ValueError: If the stream is not a json array, once its broken part is read.
+        """
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder("utf-8")()
+        # next token: "[", a value or "]", a value, or "," and "]"
+        buffer, expected, number, eof = "", "[", 0, False
+        while True:
+            buffer = buffer.lstrip()
+            if buffer and (expected in ("[", ",]") or
+                           (expected == "value]" and buffer[0] == "]")):
+                char, buffer = buffer[0], buffer[1:]
+                if char not in expected:
+                    raise ValueError(
+                        f"Expected {' or '.join(expected)} after user {number}, found {char}")
+                if char == "]":
+                    return
+                expected = "value]" if char == "[" else "value"
+                continue
+            if buffer:
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except ValueError as e:
+                    if eof or len(buffer) > max_document_size:
+                        raise ValueError(f"Invalid json after user {number}: {e}") from e
+                else:
+                    number += 1
+                    yield number, item
+                    buffer, expected = buffer[end:], ",]"
+                    continue
+            if eof:
+                raise ValueError(f"The json array ends after user {number} without ']'")
+            data = stream.read(read_size)
+            eof = not data
+            buffer += text.decode(data, final=eof)
+
+    def _int_arg(self, name, default, maximum=None):
+        """
+        Returns an integer argument of the request.
+
+        Args:
+            name(str): argument name.
+            default(int): value when the argument is not given.
+            maximum(int:optional): highest value accepted, MAX_PAGE_SIZE by default.
+
+        Returns:
+            int: the argument value.
+
+        Raises:
+            ValueError: If the argument is not an integer between 1 and the maximum.
+        """
+        maximum = maximum or self.MAX_PAGE_SIZE
+        if name not in request.args:
+            return default
+        value = int(request.args[name])
+        if not 1 <= value <= maximum:
+            raise ValueError(f"'{name}' must be between 1 and {maximum}")
+        return value
+
+    @staticmethod
+    def _ndjson(users, batch_size):
         """
-        users = list(self.collection.find({}, {"_id": 0}))  # Excluye _id
-        return jsonify(users)
+        Yields the users as json lines, a chunk of 'batch_size' users at a time.
+
+        Args:
+            users(iterator): (cursor, user) pairs, as given by 'UserStore.scan'.
+            batch_size(int): users per chunk written to the response.
+        """
+        while True:
+            batch = list(islice(users, batch_size))
+            if not batch:
+                return
+            yield "".join(json.dumps(user) + "\n" for _, user in batch)
 
     def add_user(self):
         """
         POST method
         """
         data = request.json
-        self.collection.insert_one(data)
+        try:
+            self.store.insert(data)
+        except UserStoreException as e:
+            return jsonify({"message": str(e)}), 400
         return jsonify({"message": "User successfully added"}), 201
 
 
+class APIMongoDB(UsersAPI):
+    """
+    API MongoDB class manager
+
+    Attributes:
+        mongo_uri(str): mongo db uri
+    """
+    def __init__(self, app, mongo_uri, db_name, collection_name, timeout_ms=30000):
+        self.mongo_uri = mongo_uri
+        super().__init__(app, MongoUserStore(mongo_uri, db_name, collection_name, timeout_ms))
+
+
+class APIServer:
+    """
+    Runs the API in the current process, on a background thread and an ephemeral port,
+    so it starts in milliseconds and parallel sessions never collide on the port.
+
+    Attributes:
+        log (logger): Logger instance.
+        host(str): interface the server listens on.
+        port(int): port the server listens on, assigned on start when 0.
+        url(str): base url of the API, None until started.
+        api(UsersAPI): API served.
+    """
+
+    def __init__(self,
+                 store,
+                 host="127.0.0.1",
+                 port=0):
+        self.log = LoggerManager.get_logger(self.__class__.__name__)
+        self.host = host
+        self.port = port
+        self.url = None
+        self.api = UsersAPI(Flask(__name__), store)
+        self._server = None
+        self._thread = None
+
+    def start(self) -> str:
+        """
+        Binds the socket and serves the API once its store has answered a ping.
+
+        Returns:
+            str: base url of the API, e.g. 'http://127.0.0.1:49152'.
+
+        Raises:
+            APIServerException: If the store doesn't answer or the port can not be bound.
+        """
+        try:
+            self.api.store.ping()
+        except UserStoreException as e:
+            self.api.store.close()
+            raise APIServerException(str(e)) from e
+        try:
+            self._server = make_server(self.host, self.port, self.api.app, threaded=True)
+        except OSError as e:
+            self.api.store.close()
+            raise APIServerException(f"Unable to bind {self.host}:{self.port}: {e}") from e
+        self.port = self._server.server_port
+        self.url = f"http://{self.host}:{self.port}"
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="api-server", daemon=True)
+        self._thread.start()
+        self.log.info(f"API serving on {self.url}")
+        return self.url
+
+    def stop(self) -> None:
+        """Stops serving and closes the store"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._thread.join()
+        self._server.server_close()
+        self.api.store.close()
+        self._server = None
+        self.log.info(f"API on {self.url} stopped")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
                     prog='ProgramName',
@@ -76,7 +409,28 @@ if __name__ == "__main__":
         help="The Name of the desired collection",
         default="users"
     )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        help="Storage of the users",
+        choices=[backend.value for backend in StoreBackend],
+        default=StoreBackend.MONGO.value
+    )
+    parser.add_argument(
+        "-s",
+        "--sqlite_path",
+        help="Database file of the sqlite backend",
+        default=":memory:"
+    )
     args = parser.parse_args()
-    app = Flask(__name__)
-    md_db = APIMongoDB(app,args.mongo_uri, args.db_name, args.collection_name)
-    app.run(debug=True)
+    flask_app = Flask(__name__)
+    md_db = UsersAPI(flask_app, create_user_store(
+        args.backend,
+        {
+            "mongo_uri": args.mongo_uri,
+            "db_name": args.db_name,
+            "collection_name": args.collection_name,
+        },
+        args.sqlite_path
+    ))
+    flask_app.run(debug=True)
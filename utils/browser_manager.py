@@ -1,15 +1,17 @@
 """
 Browser manager class
 """
-import os
-import tempfile
+import time
 from typing import Union
 from enum import Enum
 from selenium.webdriver.support.select import Select
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    JavascriptException,
+    TimeoutException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException
+)
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.service import Service as EdgeService
@@ -18,6 +20,24 @@ from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.firefox import GeckoDriverManager as FirefoxManager
 from webdriver_manager.microsoft import EdgeChromiumDriverManager as EdgeManager
 from test_utils.logger_manager import LoggerManager
+from utils.dom_scripts import (
+    CLICK_ALL_JS,
+    ELEMENT_TEXT_JS,
+    FILL_FORM_JS,
+    GET_STORAGE_JS,
+    ITEMS_TEXT_JS,
+    SET_STORAGE_JS,
+    TEXT_FINGERPRINT_JS,
+    is_js_locator,
+    text_fingerprint
+)
+from utils.circuit_breaker import CircuitBreakerException, CircuitName, get_circuit_breaker
+from utils.deadline import deadline_wait
+from utils.driver_cache import DriverCache, DriverCacheException
+from utils.element_cache import ElementCache
+from utils.page_schema import resolve_locator
+from utils.profile_manager import ProfileManager, ProfileManagerException
+from utils.wait_engine import WaitCondition, WaitEngine, WaitStrategy, driver_backend
 
 
 class AvailableBrowsers(str, Enum):
@@ -66,6 +86,14 @@ class BrowserOptions(str, Enum):
     SATRT_MAXIMAZED = "--start-maximized"
 
 
+class FillMode(str, Enum):
+    """
+    Enum class with the ways of filling a form
+    """
+    SCRIPT = "script"
+    TYPING = "typing"
+
+
 class SelectBy(Enum):
     """
     Enum class to handle the select methods
@@ -96,18 +124,70 @@ class BrowserManager:
 
     Attributes:
         log (logger): Logger instance.
-        driver(Webdriver): Webdriver instance.
+        driver(Webdriver): Webdriver instance, launched or given as backend
+                           (e.g. FakeWebDriver).
+        profile_dir(str): Folder used as '--user-data-dir'.
+        launch_time(float): Seconds spent launching the browser.
+        first_load_time(float): Seconds spent loading the first page.
+        element_cache(ElementCache): Cache of element handles, None when disabled.
+        wait_engine(WaitEngine): Engine used to wait for the elements.
+        page_ready(bool): Flag set once the readiness signal of the current page has been
+                          confirmed, the reads then look for the elements right away.
+                          Any navigation or click clears it.
     """
 
     def __init__(self,
                  *args,
                  browser=AvailableBrowsers.CHROME,
-                 url=None):
+                 url=None,
+                 profile_dir=None,
+                 driver=None,
+                 element_cache=False,
+                 wait_strategy=WaitStrategy.MUTATION):
         self.log = LoggerManager.get_logger(self.__class__.__name__)
-        self._driver = self._init_webdriver(browser, *args)
+        self.element_cache = ElementCache() if element_cache else None
+        self.wait_engine = WaitEngine(wait_strategy)
+        self.page_ready = False
+        self.profile_manager = ProfileManager.get_instance()
+        self._owns_profile = profile_dir is None and driver is None
+        self.profile_dir = profile_dir
+        self.first_load_time = None
+        start_time = time.perf_counter()
+        # a given driver (e.g. FakeWebDriver) is used as backend instead of launching one
+        self.driver = driver or self._init_webdriver(browser, *args)
+        self.launch_time = time.perf_counter() - start_time
+        self.log.info(f"{browser} launched in {self.launch_time:.3f}s")
         if url:
             self.open_page(url)
 
+    @classmethod
+    def build_profile_template(cls,
+                               *args,
+                               browser=AvailableBrowsers.CHROME,
+                               url=None):
+        """
+        Creates the template profile for the given browser, if it doesn't exist yet,
+        by opening 'url' once so its static assets are kept in the HTTP cache.
+
+        Args:
+            browser(str): browser name.
+            url(str): page to load in the template.
+
+        Raises:
+            BrowserManagerException: If the template could not be built.
+        """
+        profile_manager = ProfileManager.get_instance()
+        if profile_manager.has_template(browser):
+            return
+
+        def build(profile_dir):
+            cls(*args, browser=browser, url=url, profile_dir=profile_dir).driver_down()
+
+        try:
+            profile_manager.build_template(browser, build)
+        except ProfileManagerException as e:
+            raise BrowserManagerException(f"Unable to build the {browser} template") from e
+
     def _init_webdriver(self, browser, *args):
         """Initialize WebDriver"""
         if browser.capitalize() not in AvailableBrowsers.get_available_browsers():
@@ -116,33 +196,39 @@ class BrowserManager:
 
         options = getattr(webdriver, f"{browser}Options")()
         options.binary_location = getattr(BinaryFiles, browser.upper()).value
-        user_data_dir = tempfile.mkdtemp()
-        options.add_argument(f"--user-data-dir={user_data_dir}")
-    
+        if self.profile_dir is None:
+            try:
+                self.profile_dir = self.profile_manager.create(browser)
+            except ProfileManagerException as e:
+                raise BrowserManagerException(f"Unable to create a profile for {browser}") from e
+        options.add_argument(f"--user-data-dir={self.profile_dir}")
+
         for arg in args:
             options.add_argument(arg)
 
         try:
             service_class, manager = getattr(ServiceManager, browser.upper()).value
-            driver_path = manager().install()
-            # correct extension fro browser
             extension = getattr(BrowserExtension, browser.upper()).value
-            driver_executable = os.path.join(os.path.dirname(driver_path), extension)
-            if not os.path.isfile(driver_executable):
-                self.log.error(f"{extension} not found in: {driver_executable}")
-                raise BrowserManagerException(f"{extension} not valid in {driver_executable}")
-
-            if not os.access(driver_executable, os.X_OK):
-                self.log.info(f"Assigning permission to {driver_executable}")
-            os.chmod(driver_executable, 0o755)
-
-            self.log.info(f"Using {extension} in: {driver_executable}")
+            driver_executable = DriverCache().resolve(
+                browser,
+                options.binary_location,
+                extension,
+                manager
+            )
             service = service_class(driver_executable)
             driver = getattr(webdriver, browser)(service=service, options=options)
 
         except AttributeError as e:
+            self._release_profile()
             self.log.error(f"Error webdriver does not have attribute: {browser}")
             raise BrowserManagerException(f"Error webdriver does not have attribute: {browser}") from e
+        except WebDriverException:
+            self._release_profile()
+            raise
+        except DriverCacheException as e:
+            self._release_profile()
+            self.log.error(f"Unable to resolve the driver for {browser}: {e}")
+            raise BrowserManagerException(f"Unable to resolve the driver for {browser}") from e
 
         return driver
 
@@ -154,6 +240,8 @@ class BrowserManager:
     @driver.setter
     def driver(self, new_driver):
         self._driver = new_driver
+        # the wait latencies and timeouts are kept per browser
+        self.wait_engine.backend = driver_backend(new_driver)
 
     def open_page(self,
                   url:str,
@@ -161,17 +249,32 @@ class BrowserManager:
         """
         Opens the url from web page.
 
+        The site is guarded by a circuit breaker, once it has failed to load several
+        times in a row the url is not even requested until the next probe.
+
         Args:
             url(str): url from webpage.
             driver:(webdriver obj:Optional, Default=None): webdriver object.
 
         Raises:
-            BrowserManagerException: If driver is unable to open url.
+            BrowserManagerException: If driver is unable to open url or the site is
+            known to be unreachable.
         """
         driver = driver or self.driver
         try:
-            self.driver.get(url)
+            start_time = time.perf_counter()
+            self.page_ready = False
+            with get_circuit_breaker(CircuitName.SITE).guard(WebDriverException):
+                self.driver.get(url)
+            if self.element_cache is not None:
+                self.element_cache.navigated(url)
+            if self.first_load_time is None:
+                self.first_load_time = time.perf_counter() - start_time
+                self.log.info(f"First page load took {self.first_load_time:.3f}s")
             self.log.info(f"Opening page: {url}")
+        except CircuitBreakerException as e:
+            self.log.error(f"Not opening {url}: {e}")
+            raise BrowserManagerException(f"Site unreachable, not opening {url}") from e
         except Exception as e:
             self.log.error(f"Exception occurred: {e}")
             raise BrowserManagerException(f"Error trying to set page {url}") from e
@@ -194,7 +297,7 @@ class BrowserManager:
         """
         driver = driver or self.driver
         try:
-            return driver.find_element(getattr(By, locator[0]), locator[1])
+            return driver.find_element(*resolve_locator(locator))
         except NoSuchElementException as e:
             self.log.error(f"Unable to find element with parameters ('{locator}')")
             raise BrowserManagerException("Unable to find element") from e
@@ -218,14 +321,88 @@ class BrowserManager:
             has been reached and the element is still not clickable.
         """
         driver = driver or self.driver
+
+        def click():
+            try:
+                element = self._wait_for_element(
+                    locator, driver, timeout, WaitCondition.CLICKABLE)
+            except TimeoutException as e:
+                self.log.error(f"Unable to have element '({locator})' clickable within {timeout}s")
+                raise BrowserManagerException("Unable to get element clickable") from e
+            self.page_ready = False
+            element.click()
+
+        self._retry_if_stale(click)
+
+    def _wait_for_element(self,
+                          locator:tuple,
+                          driver,
+                          timeout: Union[int, float],
+                          condition: WaitCondition):
+        """
+        Waits until the element of 'locator' meets the condition, reusing the cached
+        element handle when the element cache is enabled.
+
+        Once the page is ready, present and visible elements are looked for right away
+        and it only waits if the element is not there, or not displayed, yet. The wait
+        uses the timeout calibrated for the locator, if any, and draws from the time
+        budget of the test.
+
+        Args:
+            locator(tuple): element locator.
+            driver:(webdriver obj): webdriver object or element to search in.
+            timeout: (int/float): Timeout in seconds to wait.
+            condition(WaitCondition): condition to wait for.
+
+        Returns:
+            Element: Element found which matches within timeout.
+
+        Raises:
+            TimeoutException: In case the timeout has been reached.
+            DeadlineException: If the time budget of the test is used up.
+        """
+        context = None if driver is self.driver else driver
+        if self.page_ready and condition is not WaitCondition.CLICKABLE:
+            element = self.wait_engine.find_now(self.driver, context, locator, condition)
+            if element is not None:
+                return element
+            self.log.info(f"Element '({locator})' not {condition.value} yet, waiting for it")
+        label = getattr(locator, "key", None) or str(tuple(locator))
+        timeout = self.wait_engine.calibrated_timeout(locator, timeout)
+        with deadline_wait(label, timeout) as budget:
+            if self.element_cache is None:
+                return self.wait_engine.wait(self.driver, context, locator, condition, budget)
+            key = ElementCache.make_key(resolve_locator(locator), context)
+            element = self.element_cache.get(key)
+            if element is not None:
+                try:
+                    return self.wait_engine.wait_element(driver, element, condition, budget)
+                except StaleElementReferenceException:
+                    self.element_cache.discard(key)
+            element = self.wait_engine.wait(self.driver, context, locator, condition, budget)
+            self.element_cache.put(key, element)
+            return element
+
+    def _retry_if_stale(self, action):
+        """
+        Runs 'action', with the element cache enabled a stale element handle clears
+        the cache and the action is retried once.
+
+        Args:
+            action(callable): action which looks for an element and uses it.
+
+        Returns:
+            any: response from action.
+        """
         try:
-            element = WebDriverWait(driver, timeout).until(
-                EC.element_to_be_clickable((getattr(By, locator[0]), locator[1]))
-            )
-        except TimeoutException as e:
-            self.log.error(f"Unable to have element '({locator})' clickable within {timeout}s")
-            raise BrowserManagerException("Unable to get element clickable") from e
-        element.click()
+            return action()
+        except StaleElementReferenceException:
+            if self.element_cache is None:
+                raise
+            self.log.info("Cached element is stale, looking for it again")
+            self.element_cache.stale += 1
+            self.element_cache.clear()
+            return action()
 
     def get_present_element(self,
                             locator:tuple,
@@ -250,9 +427,7 @@ class BrowserManager:
         """
         driver = driver or self.driver
         try:
-            return WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((getattr(By, locator[0]), locator[1]))
-            )
+            return self._wait_for_element(locator, driver, timeout, WaitCondition.PRESENT)
         except TimeoutException as e:
             self.log.error("Unable get the element using parameters "
                            f"'({locator})' within {timeout}s")
@@ -279,11 +454,168 @@ class BrowserManager:
         """
         driver = driver or self.driver
         try:
-            return driver.find_elements(getattr(By, locator[0]), locator[1])
+            return driver.find_elements(*resolve_locator(locator))
         except TimeoutException as e:
             self.log.error(f"Unable get the element using parameters '({locator})'")
             raise BrowserManagerException("Unable to write on element") from e
 
+    def get_elements_text_bulk(self,
+                               items_locator: tuple,
+                               fields: dict,
+                               driver=None,
+                               attributes=None) -> list:
+        """
+        Reads, in a single script round trip, the text of some fields of every element
+        which matches 'items_locator'.
+
+        Args:
+            items_locator(tuple): locator of the items.
+            fields(dict): {key: locator} of the fields, relative to each item.
+            driver:(webdriver obj:Optional, Default=None): webdriver object or
+                                                           element to search in.
+            attributes(dict:optional): {key: attribute name} of the fields whose
+                                       attribute is read instead of their text.
+
+        Returns:
+            list: one {key: text} dict per item, None for the fields not found.
+
+        Raises:
+            BrowserManagerException: If any locator can not be evaluated in the page
+            or the script fails.
+        """
+        items = resolve_locator(items_locator)
+        attributes = attributes or {}
+        resolved = [[key, *resolve_locator(locator), attributes.get(key)]
+                    for key, locator in fields.items()]
+        if not is_js_locator(items) or not all(is_js_locator(field[1:3]) for field in resolved):
+            raise BrowserManagerException("Locator type can not be evaluated by a script")
+        context = driver if driver is not None and driver is not self.driver else None
+        try:
+            return self.driver.execute_script(ITEMS_TEXT_JS, context, list(items), resolved)
+        except WebDriverException as e:
+            self.log.error(f"Unable to read the items '({items_locator})' in bulk: {e}")
+            raise BrowserManagerException("Unable to read the items in bulk") from e
+
+    def click_elements_bulk(self,
+                            locators: list,
+                            driver=None) -> list:
+        """
+        Clicks, in a single script round trip, the first element of every locator in the
+        given order.
+
+        Args:
+            locators(list): locators of the elements to click.
+            driver:(webdriver obj:Optional, Default=None): webdriver object or
+                                                           element to search in.
+
+        Returns:
+            list: one bool per locator, False when no element matched it.
+
+        Raises:
+            BrowserManagerException: If any locator can not be evaluated in the page
+            or the script fails.
+        """
+        resolved = [list(resolve_locator(locator)) for locator in locators]
+        if not all(is_js_locator(locator) for locator in resolved):
+            raise BrowserManagerException("Locator type can not be evaluated by a script")
+        context = driver if driver is not None and driver is not self.driver else None
+        self.page_ready = False
+        try:
+            return self.driver.execute_script(CLICK_ALL_JS, context, resolved)
+        except WebDriverException as e:
+            self.log.error(f"Unable to click the elements '({locators})' in bulk: {e}")
+            raise BrowserManagerException("Unable to click the elements in bulk") from e
+
+    def read_element_text(self,
+                          locator:tuple,
+                          driver=None):
+        """
+        Reads the text of the first element which matches, right away and without waiting,
+        in a single script round trip when the locator can be evaluated by a script.
+
+        Args:
+            locator(tuple): element locator.
+            driver:(webdriver obj:Optional, Default=None): webdriver object or
+                                                           element to search in.
+
+        Returns:
+            str: text of the element, None if there is no element which matches.
+        """
+        resolved = resolve_locator(locator)
+        context = driver if driver is not None and driver is not self.driver else None
+        if is_js_locator(resolved):
+            try:
+                return self.driver.execute_script(ELEMENT_TEXT_JS, context, *resolved)
+            except JavascriptException as e:
+                self.log.info(f"Unable to read '({locator})' with a script: {e}")
+        elements = (driver or self.driver).find_elements(*resolved)
+        return elements[0].text if elements else None
+
+    def get_text_fingerprint(self,
+                             locators:list,
+                             driver=None) -> str:
+        """
+        Returns a short digest of the text of every element which matches the locators,
+        in a single script round trip when all of them can be evaluated by a script.
+
+        Args:
+            locators(list): element locators.
+            driver:(webdriver obj:Optional, Default=None): webdriver object or
+                                                           element to search in.
+
+        Returns:
+            str: digest which changes whenever any of the texts changes.
+
+        Raises:
+            BrowserManagerException: If the texts can not be read.
+        """
+        resolved = [resolve_locator(locator) for locator in locators]
+        context = driver if driver is not None and driver is not self.driver else None
+        try:
+            if all(is_js_locator(locator) for locator in resolved):
+                try:
+                    return self.driver.execute_script(
+                        TEXT_FINGERPRINT_JS, context, [list(locator) for locator in resolved])
+                except JavascriptException as e:
+                    self.log.info(f"Unable to read the fingerprint with a script: {e}")
+            return text_fingerprint(
+                element.text.strip()
+                for locator in resolved
+                for element in (driver or self.driver).find_elements(*locator))
+        except WebDriverException as e:
+            self.log.error(f"Unable to read the fingerprint of {locators}: {e}")
+            raise BrowserManagerException("Unable to read the text fingerprint") from e
+
+    def wait_until(self,
+                   name: str,
+                   predicate,
+                   timeout: Union[int, float],
+                   poll_frequency: float=0.1):
+        """
+        Waits until 'predicate' returns a truthy value.
+
+        Args:
+            name(str): name of the awaited state, used to record the latency.
+            predicate(callable): function without arguments which checks the state.
+            timeout: (int/float): Timeout in seconds to wait.
+            poll_frequency(float:optional:default=0.1): seconds between checks.
+
+        Returns:
+            any: first truthy value returned by 'predicate'.
+
+        Raises:
+            BrowserManagerException: In case the timeout has been reached.
+            DeadlineException: If the time budget of the test is used up.
+        """
+        timeout = self.wait_engine.calibrated_timeout(name, timeout)
+        try:
+            with deadline_wait(name, timeout) as budget:
+                return self.wait_engine.wait_until(
+                    self.driver, name, predicate, budget, poll_frequency)
+        except TimeoutException as e:
+            self.log.info(f"State '{name}' not reached within {timeout}s")
+            raise BrowserManagerException(f"State '{name}' not reached") from e
+
     def get_visible_element(self,
                             locator:tuple,
                             driver,
@@ -307,14 +639,31 @@ class BrowserManager:
         """
         driver = driver or self.driver
         try:
-            return WebDriverWait(driver, timeout).until(
-                EC.visibility_of_element_located((getattr(By, locator[0]), locator[1]))
-            )
+            return self._wait_for_element(locator, driver, timeout, WaitCondition.VISIBLE)
         except TimeoutException as e:
             self.log.error("Unable get the element using parameters "
                            f"'({locator})' within {timeout}s")
             raise BrowserManagerException("Unable to get element") from e
 
+    def confirm_page_ready(self,
+                           locator:tuple,
+                           timeout: Union[int, float]=5) -> None:
+        """
+        Waits for the readiness signal of the current page, once it is visible the
+        following reads don't wait for the elements which are already rendered.
+
+        Args:
+            locator(tuple): locator of the element which signals the page is ready.
+            timeout: (int/float): Timeout in seconds to wait.
+
+        Raises:
+            BrowserManagerException: In case the signal is not visible within timeout.
+        """
+        self.page_ready = False
+        self.get_visible_element(locator, self.driver, timeout)
+        self.page_ready = True
+        self.log.info(f"Page ready, signaled by '({locator})'")
+
     def enter_text_to_present_element(self,
                                       locator:tuple,
                                       keys_value:str,
@@ -330,9 +679,67 @@ class BrowserManager:
             driver:(webdriver obj:Optional, Default=None): webdriver object.
             timeout: (int/float): Timeout in seconds to wait.
         """
-        element = self.get_present_element(locator, driver, timeout)
-        element.clear()
-        element.send_keys(keys_value)
+        def enter_text():
+            element = self.get_present_element(locator, driver, timeout)
+            element.clear()
+            element.send_keys(keys_value)
+
+        self._retry_if_stale(enter_text)
+
+    def fill_form(self,
+                  fields: dict,
+                  timeout: Union[int, float],
+                  driver=None,
+                  mode: FillMode=FillMode.SCRIPT) -> None:
+        """
+        Writes the value of several form fields.
+
+        With the script mode every field is set in a single script round trip, firing
+        the input and change events the page listens to. The fields missing in the
+        page are waited for and set in a second script call. With the typing mode, or
+        locators a script can't evaluate, every field is cleared and typed key by key.
+
+        Args:
+            fields(dict): {locator: text} of the fields, in filling order.
+            timeout: (int/float): Timeout in seconds to wait for the missing fields.
+            driver:(webdriver obj:Optional, Default=None): webdriver object or
+                                                           element to search in.
+            mode(FillMode:optional:default=SCRIPT): how the values are written.
+
+        Raises:
+            BrowserManagerException: If a field is not found within the timeout or
+            doesn't keep the written value.
+        """
+        resolved = {locator: resolve_locator(locator) for locator in fields}
+        if FillMode(mode) is FillMode.TYPING or \
+                not all(is_js_locator(locator) for locator in resolved.values()):
+            for locator, text in fields.items():
+                self.enter_text_to_present_element(locator, text, driver, timeout)
+            return
+        context = driver if driver is not None and driver is not self.driver else None
+        # an input value is always a string, e.g. a numeric zip code is written as text
+        texts = {locator: str(text) for locator, text in fields.items()}
+        pending = list(fields)
+        for attempt in range(2):
+            try:
+                values = self.driver.execute_script(
+                    FILL_FORM_JS, context,
+                    [[*resolved[locator], texts[locator]] for locator in pending])
+            except WebDriverException as e:
+                self.log.error(f"Unable to fill the form fields {pending}: {e}")
+                raise BrowserManagerException("Unable to fill the form") from e
+            wrong = [locator for locator, value in zip(pending, values)
+                     if value is not None and value != texts[locator]]
+            if wrong:
+                raise BrowserManagerException(f"Fields {wrong} didn't keep the written value")
+            pending = [locator for locator, value in zip(pending, values) if value is None]
+            if not pending:
+                return
+            if attempt == 0:
+                # the form is still being rendered
+                for locator in pending:
+                    self.get_present_element(locator, driver, timeout)
+        raise BrowserManagerException(f"Fields {pending} were not found")
 
     def get_element_text(self,
                          locator:tuple,
@@ -352,8 +759,10 @@ class BrowserManager:
             str: Text from element.
         """
         if visible:
-            return self.get_visible_element(locator, driver, timeout).text
-        return self.get_present_element(locator, driver, timeout).text
+            return self._retry_if_stale(
+                lambda: self.get_visible_element(locator, driver, timeout).text)
+        return self._retry_if_stale(
+            lambda: self.get_present_element(locator, driver, timeout).text)
 
     def switch_window(self,
                       which_window:int=0) -> str:
@@ -369,13 +778,18 @@ class BrowserManager:
         Raises:
             BrowserManagerException: unable to switch window
         """
+        self.page_ready = False
         try:
             windows = self.driver.window_handles
             self.driver.switch_to.window(windows[which_window])
         except Exception as e:
             self.log.error(f"Unable to switch the current driver to window {which_window}")
             raise BrowserManagerException("Unable to switch window") from e
-        return self.get_current_driver_url()
+        current_url = self.get_current_driver_url()
+        if self.element_cache is not None:
+            self.element_cache.clear()
+            self.element_cache.navigated(current_url)
+        return current_url
 
     def get_current_driver_url(self,
                                driver=None) -> str:
@@ -393,9 +807,112 @@ class BrowserManager:
 
     def driver_down(self) -> None:
         """
-        Teardown driver.
+        Teardown driver and remove its profile folder.
+        """
+        try:
+            self.driver.quit()
+        finally:
+            self._release_profile()
+
+    def _release_profile(self) -> None:
+        """Removes the profile folder if it was created by this instance"""
+        if self._owns_profile and self.profile_dir:
+            self.profile_manager.release(self.profile_dir)
+            self.profile_dir = None
+
+    def reset_session(self) -> None:
+        """
+        Leaves the browser as a fresh session without relaunching it.
+
+        Closes any extra window, clears the cookies, localStorage and sessionStorage
+        of the current origin and navigates to 'about:blank'.
+
+        Raises:
+            BrowserManagerException: If the browser does not respond, which means the
+            session can not be reused.
+        """
+        self.page_ready = False
+        try:
+            windows = self.driver.window_handles
+            for window in windows[1:]:
+                self.driver.switch_to.window(window)
+                self.driver.close()
+            self.driver.switch_to.window(windows[0])
+            self.driver.delete_all_cookies()
+            self.driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); }"
+                " catch (e) {}"
+            )
+            self.driver.get("about:blank")
+            if self.element_cache is not None:
+                self.element_cache.navigated("about:blank")
+            # a session which answers but doesn't navigate is not fit to be reused either
+            url = self.driver.current_url
+        except WebDriverException as e:
+            self.log.error(f"Unable to reset the browser session: {e}")
+            raise BrowserManagerException("Unable to reset browser session") from e
+        if url != "about:blank":
+            self.log.error(f"The browser session is stuck at {url} after the reset")
+            raise BrowserManagerException("Unable to reset browser session")
+
+    def check_session(self) -> None:
+        """
+        Checks the browser session still answers, with a single round trip.
+
+        Raises:
+            BrowserManagerException: If the session is gone, e.g. the browser crashed.
+        """
+        try:
+            _ = self.driver.current_url
+        except WebDriverException as e:
+            self.log.error(f"The browser session doesn't answer: {e}")
+            raise BrowserManagerException("Browser session is not responding") from e
+
+    def get_session_state(self) -> dict:
         """
-        self.driver.quit()
+        Returns the authenticated state of the current origin, so it can be injected
+        later with 'set_session_state' instead of login again.
+
+        Returns:
+            dict: {"cookies": [cookie dicts], "local_storage": {key: value},
+                   "session_storage": {key: value}}.
+
+        Raises:
+            BrowserManagerException: If the state can not be read from the browser.
+        """
+        try:
+            storage = self.driver.execute_script(GET_STORAGE_JS)
+            return {
+                "cookies": self.driver.get_cookies(),
+                "local_storage": storage["local"],
+                "session_storage": storage["session"],
+            }
+        except WebDriverException as e:
+            self.log.error(f"Unable to read the session state: {e}")
+            raise BrowserManagerException("Unable to read the session state") from e
+
+    def set_session_state(self,
+                          state: dict) -> None:
+        """
+        Injects a state from 'get_session_state' in the current origin.
+
+        The browser must already be on a page of the origin the state belongs to,
+        cookies and storage can not be set for another domain.
+
+        Args:
+            state(dict): session state from 'get_session_state'.
+
+        Raises:
+            BrowserManagerException: If the state can not be set in the browser.
+        """
+        try:
+            for cookie in state["cookies"]:
+                self.driver.add_cookie(cookie)
+            self.driver.execute_script(
+                SET_STORAGE_JS, state["local_storage"], state["session_storage"])
+        except WebDriverException as e:
+            self.log.error(f"Unable to set the session state: {e}")
+            raise BrowserManagerException("Unable to set the session state") from e
 
     def select_dropdown_option(self,
                                method: SelectBy,
@@ -413,7 +930,7 @@ class BrowserManager:
         """
         driver = driver or self.driver
         try:
-            dropdown = Select(driver.find_element(getattr(By, locator[0]), locator[1]))
+            dropdown = Select(driver.find_element(*resolve_locator(locator)))
             select_method = getattr(dropdown, SelectBy.get_select_method_by(method))
         except Exception as e:
             raise BrowserManagerException("Unable browser couldn't do the dropdown") from e
@@ -0,0 +1,111 @@
+"""
+Browser matrix file, runs the same tests against several browsers in one session
+"""
+import functools
+import json
+import os
+from utils.browser_manager import AvailableBrowsers, BrowserManagerException
+from utils.shard_runner import WORKER_ENV
+
+BROWSER_PARAM = "browser_type"
+
+
+@functools.lru_cache(maxsize=None)
+def parse_browser_types(value: str) -> tuple:
+    """
+    Returns the browsers given in '--browser_type', e.g. 'Firefox,Chrome'.
+
+    The result is cached, pytest compares class-scoped params by identity, so every
+    test must get the very same browser objects to share the class fixtures.
+
+    Args:
+        value(str): comma separated browser names.
+
+    Returns:
+        tuple: browser names, without duplicates and keeping the given order.
+
+    Raises:
+        BrowserManagerException: If any of the browsers is not available.
+    """
+    browsers = []
+    for browser in value.split(","):
+        browser = browser.strip().capitalize()
+        if not browser or browser in browsers:
+            continue
+        if browser not in AvailableBrowsers.get_available_browsers():
+            raise BrowserManagerException(f"Browser {browser} is not available")
+        browsers.append(browser)
+    return tuple(browsers)
+
+
+class BrowserMatrixReport:
+    """
+    Pytest plugin which tags every test report with its browser and keeps, per browser,
+    the wall-clock time from its first test start to its last test stop.
+
+    Attributes:
+        timings(dict): {browser: {"start", "stop", "tests", "failed"}}.
+    """
+    SUFFIX = ".browsers.json"
+
+    def __init__(self, config):
+        self.config = config
+        self.timings = {}
+
+    def pytest_runtest_setup(self, item):
+        """Tags the test with its browser so it shows up in the reports"""
+        callspec = getattr(item, "callspec", None)
+        if callspec is not None and BROWSER_PARAM in callspec.params:
+            item.user_properties.append(("browser", callspec.params[BROWSER_PARAM]))
+
+    def pytest_runtest_logreport(self, report):
+        """Accumulates the time window and results per browser"""
+        browser = dict(report.user_properties).get("browser")
+        if browser is None:
+            return
+        timing = self.timings.setdefault(
+            browser, {"start": report.start, "stop": report.stop, "tests": 0, "failed": 0})
+        timing["start"] = min(timing["start"], report.start)
+        timing["stop"] = max(timing["stop"], report.stop)
+        if report.when == "call":
+            timing["tests"] += 1
+        if report.failed:
+            timing["failed"] += 1
+
+    def _merge(self, timings: dict) -> None:
+        """Merges the timings of other process into this one"""
+        for browser, other in timings.items():
+            if browser not in self.timings:
+                self.timings[browser] = dict(other)
+                continue
+            timing = self.timings[browser]
+            timing["start"] = min(timing["start"], other["start"])
+            timing["stop"] = max(timing["stop"], other["stop"])
+            timing["tests"] += other["tests"]
+            timing["failed"] += other["failed"]
+
+    def pytest_sessionfinish(self, session):
+        """Writes the timings next to the junit xml, so the shard controller can merge them"""
+        xmlpath = session.config.option.xmlpath
+        if os.getenv(WORKER_ENV) and xmlpath and self.timings:
+            with open(f"{xmlpath}{self.SUFFIX}", "w", encoding="utf-8") as file:
+                json.dump(self.timings, file)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Shows the wall-clock time per browser"""
+        controller = self.config.pluginmanager.get_plugin("shard_controller")
+        for xml_file in getattr(controller, "xml_files", []):
+            try:
+                with open(f"{xml_file}{self.SUFFIX}", "r", encoding="utf-8") as file:
+                    self._merge(json.load(file))
+            except (OSError, ValueError):
+                continue
+            os.remove(f"{xml_file}{self.SUFFIX}")
+        if not self.timings:
+            return
+        terminalreporter.section("browser matrix")
+        for browser, timing in sorted(self.timings.items(),
+                                      key=lambda item: item[1]["start"] - item[1]["stop"]):
+            terminalreporter.write_line(
+                f"{browser}: {timing['tests']} tests, {timing['failed']} failed, "
+                f"wall-clock {timing['stop'] - timing['start']:.1f}s")
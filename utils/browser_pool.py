@@ -0,0 +1,185 @@
+"""
+Browser pool file, keeps warm BrowserManager instances to be shared between test classes
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from test_utils.logger_manager import LoggerManager
+from utils.browser_manager import AvailableBrowsers, BrowserManager, BrowserManagerException
+from utils.wait_engine import WaitStrategy
+
+
+class BrowserPoolException(Exception):
+    """BrowserPool Exception class"""
+
+
+class BrowserPool:
+    """
+    Pool of pre-launched BrowserManager instances.
+
+    Each instance is leased to a test class and given back to the pool once the class is
+    finished. Between leases the browser session is reset (cookies, storage and
+    'about:blank') instead of quitting the driver. A browser is only recycled after it
+    has been leased 'max_leases' times, when a test left it broken or when it could not
+    be reset, i.e. its session doesn't land on 'about:blank'.
+
+    Attributes:
+        log (logger): Logger instance.
+        browser(str): Browser to launch.
+        size(int): Number of browsers launched in advance.
+        max_leases(int): Number of leases a browser can serve before being recycled.
+        element_cache(bool): Flag to enable the element cache of the browsers.
+        wait_strategy(WaitStrategy): Strategy the browsers use to wait for elements.
+    """
+
+    def __init__(self,
+                 *args,
+                 browser=AvailableBrowsers.CHROME,
+                 size: int=1,
+                 max_leases: int=20,
+                 element_cache: bool=False,
+                 wait_strategy=WaitStrategy.MUTATION):
+        if size < 1:
+            raise BrowserPoolException(f"Pool size should be at least 1, got {size}")
+        if max_leases < 1:
+            raise BrowserPoolException(f"Max leases should be at least 1, got {max_leases}")
+        self.log = LoggerManager.get_logger(self.__class__.__name__)
+        self.browser = browser
+        self.size = size
+        self.max_leases = max_leases
+        self.element_cache = element_cache
+        self.wait_strategy = wait_strategy
+        self._browser_args = args
+        self._idle = queue.Queue()
+        self._leases = {}
+        self._broken = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._warm_up()
+
+    def _launch(self) -> BrowserManager:
+        """Launches a new BrowserManager and registers it in the pool"""
+        manager = BrowserManager(
+            *self._browser_args,
+            browser=self.browser,
+            element_cache=self.element_cache,
+            wait_strategy=self.wait_strategy
+        )
+        with self._lock:
+            self._leases[id(manager)] = 0
+        return manager
+
+    def _warm_up(self) -> None:
+        """Launches 'size' browsers concurrently and keeps them idle"""
+        self.log.info(f"Launching {self.size} {self.browser} browser(s) for the pool")
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(self._launch) for _ in range(self.size)]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            # the browsers which did launch are quit, nothing would shut them down otherwise
+            for future in futures:
+                if future.exception() is None:
+                    self._retire(future.result())
+            raise errors[0]
+        for future in futures:
+            self._idle.put(future.result())
+
+    def _retire(self, manager: BrowserManager) -> None:
+        """Quits the given browser and forgets about it"""
+        with self._lock:
+            self._leases.pop(id(manager), None)
+            self._broken.discard(id(manager))
+        try:
+            manager.driver_down()
+        except Exception as e:  # pylint: disable=broad-except
+            self.log.warning(f"Unable to quit a retired browser cleanly: {e}")
+
+    def acquire(self) -> BrowserManager:
+        """
+        Takes an idle browser from the pool, launching a new one if none is available.
+
+        Returns:
+            BrowserManager: browser ready to be used.
+
+        Raises:
+            BrowserPoolException: If the pool has already been shut down.
+        """
+        if self._closed:
+            raise BrowserPoolException("Browser pool is already shut down")
+        try:
+            manager = self._idle.get_nowait()
+        except queue.Empty:
+            self.log.info("No idle browser in the pool, launching a new one")
+            manager = self._launch()
+        with self._lock:
+            self._leases[id(manager)] += 1
+        return manager
+
+    def mark_broken(self,
+                    manager: BrowserManager) -> None:
+        """
+        Flags a leased browser to be recycled instead of reset when it is released.
+
+        Args:
+            manager(BrowserManager): browser previously returned by 'acquire'.
+        """
+        with self._lock:
+            if id(manager) in self._leases:
+                self._broken.add(id(manager))
+
+    def release(self,
+                manager: BrowserManager,
+                broken: bool=False) -> None:
+        """
+        Gives back a leased browser to the pool.
+
+        The browser is recycled when it is 'broken', or was marked broken while leased, it
+        has reached 'max_leases' or its session could not be reset, otherwise it is reset
+        and kept idle.
+
+        Args:
+            manager(BrowserManager): browser previously returned by 'acquire'.
+            broken(bool:optional): Flag to indicate an unrecoverable error happened.
+        """
+        leases = self._leases.get(id(manager), self.max_leases)
+        broken = broken or id(manager) in self._broken
+        if self._closed or broken or leases >= self.max_leases:
+            self.log.info(f"Recycling browser after {leases} lease(s)")
+            self._retire(manager)
+            return
+        try:
+            manager.reset_session()
+        except BrowserManagerException:
+            self.log.warning("Browser session couldn't be reset, recycling it")
+            self._retire(manager)
+            return
+        self._idle.put(manager)
+
+    @contextmanager
+    def lease(self):
+        """
+        Context manager to acquire a browser and release it afterwards. Pytest doesn't
+        throw the test failures into its fixtures, so a browser left unusable by a test is
+        flagged with 'mark_broken'.
+
+        Yields:
+            BrowserManager: browser ready to be used.
+        """
+        manager = self.acquire()
+        try:
+            yield manager
+        finally:
+            self.release(manager)
+
+    def shutdown(self) -> None:
+        """
+        Quits every browser that belongs to the pool.
+        """
+        self._closed = True
+        while True:
+            try:
+                manager = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(manager)
@@ -0,0 +1,207 @@
+"""
+Circuit breaker file, stops reaching the site or the API once they are known to be down, so
+the remaining tests fail right away instead of timing out one by one
+"""
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum
+from test_utils.logger_manager import LoggerManager
+
+
+class CircuitBreakerException(Exception):
+    """CircuitBreaker Exception class, raised when an open circuit rejects a call"""
+
+
+class CircuitState(str, Enum):
+    """
+    Enum class with the states of a circuit
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitName(str, Enum):
+    """
+    Enum class with the infrastructure guarded by a circuit breaker
+    """
+    SITE = "site"
+    API = "api"
+
+
+class CircuitBreaker:
+    """
+    Counts the consecutive infrastructure failures of a dependency and, after 'threshold'
+    of them, rejects every call right away instead of letting it time out.
+
+    An open circuit lets a single call through as a probe once its backoff has passed.
+    A successful probe closes the circuit, a failed one opens it again with the backoff
+    doubled, up to 'max_backoff'.
+
+    Attributes:
+        log (logger): Logger instance.
+        name(str): name of the guarded dependency.
+        threshold(int): consecutive failures which open the circuit.
+        backoff(float): seconds before the first probe of an open circuit.
+        max_backoff(float): maximum seconds between probes.
+        state(CircuitState): current state.
+        failures(int): consecutive failures.
+        trips(int): times the circuit has opened since it was last closed.
+        last_error(str): description of the last failure.
+        next_probe(float): time.monotonic value when the next probe is allowed.
+    """
+    DEFAULT_THRESHOLD = 3
+    DEFAULT_BACKOFF = 10
+    MAX_BACKOFF = 300
+
+    def __init__(self,
+                 name: str,
+                 threshold: int=DEFAULT_THRESHOLD,
+                 backoff: float=DEFAULT_BACKOFF,
+                 max_backoff: float=MAX_BACKOFF):
+        if threshold < 1 or backoff <= 0:
+            raise CircuitBreakerException(
+                f"Invalid circuit '{name}' settings, threshold {threshold}, backoff {backoff}")
+        self.log = LoggerManager.get_logger(self.__class__.__name__)
+        self.name = name
+        self.threshold = threshold
+        self.backoff = backoff
+        self.max_backoff = max(max_backoff, backoff)
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.last_error = None
+        self.next_probe = 0.0
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """Returns the seconds until the next probe, 0 if a call is allowed now"""
+        if self.state is not CircuitState.OPEN:
+            return 0.0
+        return max(self.next_probe - time.monotonic(), 0.0)
+
+    def is_open(self) -> bool:
+        """Returns True if a call made now would be rejected"""
+        return self.state is CircuitState.OPEN and self.retry_in() > 0
+
+    def reason(self) -> str:
+        """Returns why the circuit is open, to report the rejected calls"""
+        return (f"Circuit '{self.name}' open after {self.failures} consecutive failures, "
+                f"last one: {self.last_error}. Next probe in {self.retry_in():.0f}s")
+
+    def before_call(self) -> None:
+        """
+        Lets the call through if the circuit is closed or it is time for a probe.
+
+        Raises:
+            CircuitBreakerException: If the circuit is open.
+        """
+        with self._lock:
+            if self.state is not CircuitState.OPEN:
+                return
+            if time.monotonic() < self.next_probe:
+                raise CircuitBreakerException(self.reason())
+            self.state = CircuitState.HALF_OPEN
+            self.log.info(f"Probing circuit '{self.name}'")
+
+    def record_success(self) -> None:
+        """Closes the circuit, the dependency is reachable"""
+        with self._lock:
+            if self.state is not CircuitState.CLOSED:
+                self.log.info(f"Circuit '{self.name}' closed, the probe succeeded")
+            self.state = CircuitState.CLOSED
+            self.failures = 0
+            self.trips = 0
+
+    def record_failure(self,
+                       error) -> None:
+        """
+        Counts an infrastructure failure, opening the circuit after 'threshold' of them
+        in a row or when a probe fails.
+
+        Args:
+            error(Exception/str): failure to report.
+        """
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state is CircuitState.HALF_OPEN or self.failures >= self.threshold:
+                self._open()
+
+    def trip(self,
+             reason: str) -> None:
+        """
+        Opens the circuit right away, e.g. when the dependency couldn't even be started.
+
+        Args:
+            reason(str): why the dependency is unusable.
+        """
+        with self._lock:
+            self.failures = max(self.failures, self.threshold)
+            self.last_error = reason
+            self._open()
+
+    def _open(self) -> None:
+        """Opens the circuit and schedules the next probe, lock must be held"""
+        self.trips += 1
+        delay = min(self.backoff * 2 ** (self.trips - 1), self.max_backoff)
+        self.next_probe = time.monotonic() + delay
+        self.state = CircuitState.OPEN
+        self.log.error(f"Circuit '{self.name}' open, probing again in {delay:.0f}s: "
+                       f"{self.last_error}")
+
+    @contextmanager
+    def guard(self,
+              failures=(Exception,)):
+        """
+        Context manager which runs a call through the circuit.
+
+        Args:
+            failures(tuple/Exception): exceptions which mean the dependency is unreachable,
+                                       any other one is raised without being counted.
+
+        Raises:
+            CircuitBreakerException: If the circuit is open.
+        """
+        self.before_call()
+        try:
+            yield
+        except failures as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+
+
+_settings = {}
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def configure_circuit_breakers(**kwargs) -> None:
+    """
+    Sets the settings of the circuit breakers, the existing ones are dropped.
+
+    Args:
+        kwargs: CircuitBreaker arguments, threshold, backoff and max_backoff.
+    """
+    with _breakers_lock:
+        _settings.clear()
+        _settings.update(kwargs)
+        _breakers.clear()
+
+
+def get_circuit_breaker(name: CircuitName) -> CircuitBreaker:
+    """
+    Returns the circuit breaker of the given dependency, shared by the whole process.
+
+    Args:
+        name(CircuitName): guarded dependency.
+
+    Returns:
+        CircuitBreaker: its circuit breaker.
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(CircuitName(name).value, **_settings)
+        return _breakers[name]
@@ -0,0 +1,174 @@
+"""
+Deadline file, time budget of a test shared by every wait of the browser manager, so a
+broken page fails the test fast instead of timing out wait after wait
+"""
+import threading
+import time
+from contextlib import contextmanager
+from selenium.common.exceptions import TimeoutException
+from test_utils.logger_manager import LoggerManager
+
+
+class DeadlineException(Exception):
+    """Deadline Exception class, raised once the time budget of a test is used up"""
+
+
+class Deadline:
+    """
+    Time budget of a test.
+
+    Every wait takes as timeout the smaller of its own one and the remaining budget, and
+    charges the time it spent to its label, so once the budget is used up the report
+    shows where the time went.
+
+    Attributes:
+        log (logger): Logger instance.
+        budget(float): Seconds the test is allowed to spend.
+        start_time(float): perf_counter value when the budget started.
+        spent(dict): {label: [waits, seconds]} charged to the budget.
+    """
+
+    def __init__(self,
+                 budget: float):
+        if budget <= 0:
+            raise DeadlineException(f"The time budget must be positive, got {budget}")
+        self.log = LoggerManager.get_logger(self.__class__.__name__)
+        self.budget = budget
+        self.start_time = time.perf_counter()
+        self.spent = {}
+
+    def elapsed(self) -> float:
+        """Returns the seconds spent since the budget started"""
+        return time.perf_counter() - self.start_time
+
+    def remaining(self) -> float:
+        """Returns the seconds left of the budget, negative once it is overdrawn"""
+        return self.budget - self.elapsed()
+
+    def charge(self,
+               label: str,
+               seconds: float) -> None:
+        """
+        Charges a wait to the budget report.
+
+        Args:
+            label(str): name of what was waited for, e.g. the locator name.
+            seconds(float): time spent waiting.
+        """
+        waits = self.spent.setdefault(label, [0, 0.0])
+        waits[0] += 1
+        waits[1] += seconds
+
+    def report(self,
+               limit: int=5) -> str:
+        """
+        Returns where the time of the test went, slowest waits first.
+
+        Args:
+            limit(int): number of labels shown.
+
+        Returns:
+            str: e.g. 'budget 30.0s, elapsed 31.2s, waits 20.1s: cart_icon 2 waits 20.0s'.
+        """
+        waited = sum(seconds for _, seconds in self.spent.values())
+        slowest = sorted(self.spent.items(), key=lambda item: item[1][1], reverse=True)
+        details = ", ".join(
+            f"{label} {waits} waits {seconds:.1f}s" for label, (waits, seconds) in slowest[:limit])
+        return (f"budget {self.budget:.1f}s, elapsed {self.elapsed():.1f}s, "
+                f"waits {waited:.1f}s: {details or 'none'}")
+
+    @contextmanager
+    def wait(self,
+             label: str,
+             timeout: float):
+        """
+        Context manager which gives the timeout of a wait, cut to the remaining budget.
+
+        Args:
+            label(str): name of what is waited for.
+            timeout(int/float): Timeout in seconds the wait would use on its own.
+
+        Yields:
+            float: timeout to use.
+
+        Raises:
+            DeadlineException: If the budget is used up before or during the wait.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineException(
+                f"Time budget used up before waiting for '{label}'. {self.report()}")
+        start_time = time.perf_counter()
+        timed_out = None
+        try:
+            yield min(timeout, remaining)
+        except TimeoutException as e:
+            timed_out = e
+        finally:
+            self.charge(label, time.perf_counter() - start_time)
+        if timed_out is None:
+            return
+        if timeout > remaining:
+            # the wait was cut by the budget, not by its own timeout
+            self.log.error(f"Time budget used up waiting for '{label}'. {self.report()}")
+            raise DeadlineException(
+                f"Time budget used up waiting for '{label}'. {self.report()}") from timed_out
+        raise timed_out
+
+
+_deadline = None  # pylint: disable=invalid-name
+_deadline_lock = threading.Lock()
+
+
+def start_deadline(budget: float) -> Deadline:
+    """
+    Starts the time budget of the current test.
+
+    Args:
+        budget(float): Seconds the test is allowed to spend.
+
+    Returns:
+        Deadline: the new deadline.
+    """
+    global _deadline  # pylint: disable=global-statement
+    with _deadline_lock:
+        _deadline = Deadline(budget)
+        return _deadline
+
+
+def end_deadline():
+    """
+    Stops the time budget of the current test.
+
+    Returns:
+        Deadline: the finished deadline, None if there wasn't any.
+    """
+    global _deadline  # pylint: disable=global-statement
+    with _deadline_lock:
+        deadline, _deadline = _deadline, None
+        return deadline
+
+
+@contextmanager
+def deadline_wait(label: str,
+                  timeout: float):
+    """
+    Context manager which gives the timeout of a wait, cut to the remaining budget of the
+    current test, or the given one when no budget has been started.
+
+    Args:
+        label(str): name of what is waited for.
+        timeout(int/float): Timeout in seconds the wait would use on its own.
+
+    Yields:
+        float: timeout to use.
+
+    Raises:
+        DeadlineException: If the budget is used up before or during the wait.
+    """
+    deadline = _deadline
+    if deadline is None:
+        yield timeout
+        return
+    with deadline.wait(label, timeout) as remaining:
+        yield remaining
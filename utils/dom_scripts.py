@@ -0,0 +1,229 @@
+"""
+DOM scripts file, javascript snippets executed in the page in a single driver round trip
+"""
+from selenium.webdriver.common.by import By
+
+# locator strategies the scripts are able to evaluate in the page
+JS_LOCATOR_STRATEGIES = (
+    By.CSS_SELECTOR,
+    By.XPATH,
+    By.ID,
+    By.CLASS_NAME,
+    By.NAME,
+    By.TAG_NAME,
+)
+
+FIND_ALL_JS = """
+function findAll(ctx, by, value) {
+    const quoted = '"' + String(value).replace(/["\\\\]/g, '\\\\$&') + '"';
+    switch (by) {
+        case 'xpath': {
+            const res = document.evaluate(
+                value, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < res.snapshotLength; i++) {
+                nodes.push(res.snapshotItem(i));
+            }
+            return nodes;
+        }
+        case 'id': return Array.from(ctx.querySelectorAll('[id=' + quoted + ']'));
+        case 'name': return Array.from(ctx.querySelectorAll('[name=' + quoted + ']'));
+        case 'class name': return Array.from(ctx.getElementsByClassName(value));
+        case 'tag name': return Array.from(ctx.getElementsByTagName(value));
+        default: return Array.from(ctx.querySelectorAll(value));
+    }
+}
+"""
+
+# arguments: context element (or null for the document), [by, value] of the items and
+# a list of [key, by, value, attribute] fields, returns one {key: text} object per item.
+# The attribute of the field is read instead of its text when it is not null
+ITEMS_TEXT_JS = FIND_ALL_JS + """
+const [ctx, items, fields] = arguments;
+return findAll(ctx || document, items[0], items[1]).map(function (item) {
+    const row = {};
+    for (const [key, by, value, attribute] of fields) {
+        const el = findAll(item, by, value)[0];
+        if (!el) {
+            row[key] = null;
+        } else {
+            row[key] = attribute ? el.getAttribute(attribute) : el.innerText.trim();
+        }
+    }
+    return row;
+});
+"""
+
+
+def is_js_locator(locator: tuple) -> bool:
+    """
+    Returns True if the resolved (by, value) locator can be evaluated by the scripts.
+
+    Args:
+        locator(tuple): (By value, locator value).
+    """
+    return locator[0] in JS_LOCATOR_STRATEGIES
+
+# arguments: context element (or null for the document), by and value, returns the text
+# of the first element which matches, null if there is none
+ELEMENT_TEXT_JS = FIND_ALL_JS + """
+const [ctx, by, value] = arguments;
+const el = findAll(ctx || document, by, value)[0];
+return el ? el.innerText.trim() : null;
+"""
+
+# async script, arguments: context element (or null for the document), by, value,
+# condition ('present', 'visible' or 'clickable') and timeout in milliseconds. It calls
+# back with the first element which matches once it meets the condition, null on timeout.
+# The MutationObserver reacts as soon as the DOM changes, the short in-page interval
+# covers the changes which only affect the layout (e.g. css transitions).
+WAIT_FOR_ELEMENT_JS = FIND_ALL_JS + """
+const [ctx, by, value, condition, timeoutMs, done] = arguments;
+const root = ctx || document;
+function isVisible(el) {
+    if (!el.isConnected) {
+        return false;
+    }
+    const style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none' &&
+        el.getClientRects().length > 0;
+}
+function check() {
+    const el = findAll(root, by, value)[0];
+    if (!el || condition === 'present') {
+        return el || null;
+    }
+    if (!isVisible(el) || (condition === 'clickable' && el.disabled)) {
+        return null;
+    }
+    return el;
+}
+const found = check();
+if (found) {
+    done(found);
+    return;
+}
+let finished = false;
+function stop(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    clearInterval(ticker);
+    clearTimeout(timer);
+    done(result);
+}
+function recheck() {
+    const el = check();
+    if (el) {
+        stop(el);
+    }
+}
+const observer = new MutationObserver(recheck);
+observer.observe(document, {childList: true, subtree: true, attributes: true,
+                            characterData: true});
+const ticker = setInterval(recheck, 100);
+const timer = setTimeout(function () { stop(null); }, timeoutMs);
+"""
+
+# returns the {local, session} content of window.localStorage and window.sessionStorage
+GET_STORAGE_JS = """
+function dump(storage) {
+    const items = {};
+    for (let i = 0; i < storage.length; i++) {
+        const key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# arguments: {key: value} items for window.localStorage and for window.sessionStorage
+SET_STORAGE_JS = """
+const [local, session] = arguments;
+for (const [key, value] of Object.entries(local || {})) {
+    window.localStorage.setItem(key, value);
+}
+for (const [key, value] of Object.entries(session || {})) {
+    window.sessionStorage.setItem(key, value);
+}
+"""
+
+# arguments: context element (or null for the document) and a list of [by, value]
+# locators, returns a short FNV-1a digest of the text of every element which matches,
+# so a page can be compared with a previous visit without sending its whole text back
+TEXT_FINGERPRINT_JS = FIND_ALL_JS + """
+const [ctx, locators] = arguments;
+let hash = 0x811c9dc5;
+let length = 0;
+for (const [by, value] of locators) {
+    for (const el of findAll(ctx || document, by, value)) {
+        const text = el.innerText.trim() + '\\n';
+        length += text.length;
+        for (let i = 0; i < text.length; i++) {
+            hash = Math.imul(hash ^ text.charCodeAt(i), 0x01000193) >>> 0;
+        }
+    }
+}
+return hash.toString(16) + '-' + length;
+"""
+
+
+def text_fingerprint(texts) -> str:
+    """
+    Returns the same digest as TEXT_FINGERPRINT_JS for the given element texts, hashing
+    their UTF-16 code units as javascript strings are made of.
+
+    Args:
+        texts(iterable): already stripped text of every element, in page order.
+
+    Returns:
+        str: '<FNV-1a hash in hex>-<length>'.
+    """
+    digest = 0x811c9dc5
+    length = 0
+    for text in texts:
+        units = f"{text}\n".encode("utf-16-le")
+        length += len(units) // 2
+        for index in range(0, len(units), 2):
+            unit = units[index] | units[index + 1] << 8
+            digest = ((digest ^ unit) * 0x01000193) & 0xffffffff
+    return f"{digest:x}-{length}"
+
+# arguments: context element (or null for the document) and a list of [by, value]
+# locators, clicks the first element of every locator in order, returns one boolean
+# per locator, false when there was nothing to click
+CLICK_ALL_JS = FIND_ALL_JS + """
+const [ctx, locators] = arguments;
+return locators.map(function ([by, value]) {
+    const el = findAll(ctx || document, by, value)[0];
+    if (!el) {
+        return false;
+    }
+    el.click();
+    return true;
+});
+"""
+
+# arguments: context element (or null for the document) and a list of [by, value, text]
+# fields, sets the value of every field through the native setter and fires the input
+# and change events, so frameworks which track the value (e.g. React) see the change.
+# Returns the value of every field afterwards, null for the fields not found
+FILL_FORM_JS = FIND_ALL_JS + """
+const [ctx, fields] = arguments;
+return fields.map(function ([by, value, text]) {
+    const el = findAll(ctx || document, by, value)[0];
+    if (!el) {
+        return null;
+    }
+    const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set;
+    el.focus();
+    setter.call(el, text);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.blur();
+    return el.value;
+});
+"""
@@ -0,0 +1,187 @@
+"""
+Driver cache file, resolves webdriver binaries once and keeps them locally
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from test_utils.logger_manager import LoggerManager
+from utils.tools import FileLock, FileLockError
+
+
+class DriverCacheException(Exception):
+    """DriverCache Exception class"""
+
+
+class DriverCache:
+    """
+    Local cache of webdriver executables.
+
+    The cache keeps a manifest keyed by browser and browser binary version, so once a
+    driver has been resolved it is reused without network access. The manifest is only
+    written while holding a file lock, which makes the cache safe when several workers
+    start at once.
+
+    Attributes:
+        log (logger): Logger instance.
+        cache_dir(str): Folder where drivers and manifest are stored.
+    """
+    DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ecommerce_drivers")
+    MANIFEST_NAME = "manifest.json"
+    _resolved = {}
+    _memo_lock = threading.Lock()
+
+    def __init__(self, cache_dir=None):
+        self.log = LoggerManager.get_logger(self.__class__.__name__)
+        self.cache_dir = cache_dir or os.getenv("DRIVER_CACHE_DIR", self.DEFAULT_CACHE_DIR)
+        self.manifest_path = os.path.join(self.cache_dir, self.MANIFEST_NAME)
+        self.lock_path = os.path.join(self.cache_dir, f"{self.MANIFEST_NAME}.lock")
+
+    @staticmethod
+    def _binary_stamp(binary_path: str) -> str:
+        """Returns a cheap identifier of the browser binary based on its stat"""
+        try:
+            stat = os.stat(os.path.realpath(binary_path))
+        except OSError:
+            return "missing"
+        return f"{stat.st_size}-{int(stat.st_mtime)}"
+
+    @staticmethod
+    def get_browser_version(binary_path: str) -> str:
+        """
+        Returns the version of the given browser binary.
+
+        Args:
+            binary_path(str): path to the browser binary.
+
+        Returns:
+            str: browser version, 'unknown' when it can not be read.
+        """
+        try:
+            output = subprocess.run(
+                [binary_path, "--version"],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                check=False
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            return "unknown"
+        match = re.search(r"\d+(\.\d+)+", output)
+        return match.group(0) if match else "unknown"
+
+    def _read_manifest(self) -> dict:
+        """Returns the manifest content, empty if it doesn't exist yet"""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """Writes the manifest atomically, readers never see a partial file"""
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _lookup(self, manifest: dict, browser: str, stamp: str):
+        """Returns the cached driver path for the browser binary stamp, if it is valid"""
+        entry = manifest.get(browser, {}).get("binaries", {}).get(stamp)
+        if not entry:
+            return None
+        driver_path = manifest[browser].get("versions", {}).get(entry)
+        if driver_path and os.path.isfile(driver_path):
+            return driver_path
+        return None
+
+    def _download(self, browser: str, version: str, extension: str, manager) -> str:
+        """Downloads the driver with webdriver_manager and copies it into the cache"""
+        driver_path = manager().install()
+        source = os.path.join(os.path.dirname(driver_path), extension)
+        if not os.path.isfile(source):
+            raise DriverCacheException(f"{extension} not valid in {source}")
+        target_dir = os.path.join(self.cache_dir, browser.lower(), version)
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, extension)
+        shutil.copy2(source, target)
+        os.chmod(target, 0o755)
+        return target
+
+    def _offline_fallback(self, manifest: dict, browser: str):
+        """Returns the most recently cached driver for the browser, if any"""
+        for driver_path in reversed(list(manifest.get(browser, {}).get("versions", {}).values())):
+            if os.path.isfile(driver_path):
+                return driver_path
+        return None
+
+    def resolve(self,
+                browser: str,
+                binary_path: str,
+                extension: str,
+                manager) -> str:
+        """
+        Returns the path of a driver executable compatible with the browser binary.
+
+        The lookup order is: in process memo, manifest on disk and finally a download
+        through webdriver_manager. If the download fails (e.g. there is no network)
+        the latest cached driver for the browser is used.
+
+        Args:
+            browser(str): browser name, e.g. 'Chrome'.
+            binary_path(str): path to the browser binary.
+            extension(str): driver executable name, e.g. 'chromedriver'.
+            manager(class): webdriver_manager class used to download the driver.
+
+        Returns:
+            str: path to the driver executable.
+
+        Raises:
+            DriverCacheException: If there is no driver available for the browser.
+        """
+        stamp = self._binary_stamp(binary_path)
+        memo_key = (browser, stamp)
+        driver_path = self._resolved.get(memo_key)
+        if driver_path:
+            return driver_path
+
+        driver_path = self._lookup(self._read_manifest(), browser, stamp)
+        if not driver_path:
+            driver_path = self._resolve_locked(browser, binary_path, extension, manager, stamp)
+        with self._memo_lock:
+            self._resolved[memo_key] = driver_path
+        self.log.info(f"Using {extension} in: {driver_path}")
+        return driver_path
+
+    def _resolve_locked(self, browser, binary_path, extension, manager, stamp) -> str:
+        """Resolves a missing driver while holding the manifest lock"""
+        try:
+            with FileLock(self.lock_path):
+                # another worker could have resolved it while we were waiting
+                manifest = self._read_manifest()
+                driver_path = self._lookup(manifest, browser, stamp)
+                if driver_path:
+                    return driver_path
+                version = self.get_browser_version(binary_path)
+                browser_entry = manifest.setdefault(browser, {"binaries": {}, "versions": {}})
+                driver_path = browser_entry["versions"].get(version)
+                if not driver_path or not os.path.isfile(driver_path):
+                    try:
+                        driver_path = self._download(browser, version, extension, manager)
+                    except Exception as e:  # pylint: disable=broad-except
+                        self.log.warning(f"Unable to download {extension}: {e}")
+                        driver_path = self._offline_fallback(manifest, browser)
+                        if not driver_path:
+                            raise DriverCacheException(
+                                f"There is no cached {extension} and it couldn't be downloaded"
+                            ) from e
+                        self.log.warning(f"Using cached {extension} from {driver_path} offline")
+                        return driver_path
+                    browser_entry["versions"][version] = driver_path
+                browser_entry["binaries"][stamp] = version
+                self._write_manifest(manifest)
+                return driver_path
+        except FileLockError as e:
+            raise DriverCacheException("Unable to lock the driver cache") from e
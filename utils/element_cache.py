@@ -0,0 +1,87 @@
+"""
+Element cache file, reuses the element handles already found by the BrowserManager
+"""
+
+
+class ElementCache:
+    """
+    Cache of element handles keyed by locator and parent element.
+
+    The cached elements belong to the url they were found in, the cache is cleared
+    when the BrowserManager navigates to another url. A click which navigates makes
+    the elements of the previous page stale, so they are dropped by the BrowserManager
+    as soon as they are used, without spending a 'current_url' round trip per click.
+
+    Attributes:
+        url(str): url the cached elements belong to.
+        hits(int): lookups answered from the cache.
+        misses(int): lookups which went to the driver.
+        stale(int): cached elements found stale when used.
+    """
+    COUNTERS = ("hits", "misses", "stale")
+
+    def __init__(self):
+        self._elements = {}
+        self.url = None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    @staticmethod
+    def make_key(locator: tuple, parent=None) -> tuple:
+        """
+        Returns the cache key of an element.
+
+        Args:
+            locator(tuple): resolved (By value, value) locator.
+            parent(Element:optional): element the lookup starts from, None for the page.
+
+        Returns:
+            tuple: (by, value, parent element id).
+        """
+        return locator[0], locator[1], None if parent is None else parent.id
+
+    def get(self, key: tuple):
+        """
+        Returns the cached element.
+
+        Args:
+            key(tuple): element key from 'make_key'.
+
+        Returns:
+            Element: cached element, None on a miss.
+        """
+        element = self._elements.get(key)
+        if element is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return element
+
+    def put(self, key: tuple, element) -> None:
+        """Keeps the element found for the given key"""
+        self._elements[key] = element
+
+    def discard(self, key: tuple) -> None:
+        """Drops the element of the given key, because it is stale"""
+        self.stale += 1
+        self._elements.pop(key, None)
+
+    def clear(self) -> None:
+        """Drops every cached element"""
+        self._elements.clear()
+
+    def navigated(self, url: str) -> None:
+        """
+        Clears the cache if the given url is not the one of the cached elements.
+
+        Args:
+            url(str): current url of the driver.
+        """
+        if url != self.url:
+            self.clear()
+            self.url = url
+
+    def get_counters(self) -> dict:
+        """Returns the current value of every counter"""
+        return {counter: getattr(self, counter) for counter in self.COUNTERS}
@@ -0,0 +1,199 @@
+"""
+Latency history file, keeps the wait latency of every locator across runs to derive its
+timeout and to report the locators whose latency drifts
+"""
+import json
+import os
+import time
+from utils.tools import FileLock
+from utils.wait_engine import WaitEngine
+
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of the values.
+
+    Args:
+        values(list): numbers, not empty.
+        fraction(float): percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        float: the percentile.
+    """
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class LatencyHistory:
+    """
+    Wait latencies of previous runs, per browser backend and strategy (e.g.
+    'chrome/mutation') and locator qualified by its page, kept in a json file shared by
+    the workers. The latencies of the FakeWebDriver are kept under 'fake/...', apart from
+    the ones of real browsers.
+
+    Every locator keeps its last 'max_samples' latencies, from which its timeout is
+    derived, and the median of its last 'max_runs' runs, which is the baseline the
+    drift of a run is measured against.
+
+    Attributes:
+        path(str): json file with the history.
+        max_samples(int): latencies kept per locator.
+        max_runs(int): runs kept per locator.
+    """
+    DEFAULT_PATH = ".wait_latency_history.json"
+
+    def __init__(self,
+                 path=DEFAULT_PATH,
+                 max_samples: int=500,
+                 max_runs: int=20):
+        self.path = path
+        self.max_samples = max_samples
+        self.max_runs = max_runs
+
+    def load(self) -> dict:
+        """
+        Returns the stored history, empty if there is none yet.
+
+        Returns:
+            dict: {'<backend>/<strategy>': {locator: {'samples': [seconds], 'runs': [{'time',
+                  'count', 'p50'}]}}}.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def update(self,
+               reached: dict) -> None:
+        """
+        Merges the latencies of this run into the file, safe with several writers.
+
+        Args:
+            reached(dict): {'<backend>/<strategy>': {locator: [seconds]}}, as given by
+                           'WaitEngine.get_reached_samples'.
+        """
+        if not reached:
+            return
+        with FileLock(f"{self.path}.lock"):
+            stored = self.load()
+            for strategy, locators in reached.items():
+                for name, seconds in locators.items():
+                    entry = stored.setdefault(strategy, {}).setdefault(
+                        name, {"samples": [], "runs": []})
+                    entry["samples"] = (entry["samples"] + seconds)[-self.max_samples:]
+                    entry["runs"] = (entry["runs"] + [{
+                        "time": time.time(),
+                        "count": len(seconds),
+                        "p50": percentile(seconds, 0.5),
+                    }])[-self.max_runs:]
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(stored, file, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def derive_timeouts(history: dict,
+                        factor: float=3.0,
+                        minimum: float=1.0,
+                        maximum: float=30.0,
+                        min_samples: int=20) -> dict:
+        """
+        Returns the timeout of every locator with enough history, its p99 latency times
+        a safety factor, bounded by 'minimum' and 'maximum'.
+
+        Args:
+            history(dict): stored history, as given by 'load'.
+            factor(float): safety factor applied to the p99 latency.
+            minimum(float): lowest timeout in seconds.
+            maximum(float): highest timeout in seconds.
+            min_samples(int): latencies needed to trust the distribution.
+
+        Returns:
+            dict: {'<backend>/<strategy>': {locator: seconds}}, as taken by
+                  'WaitEngine.calibrate'.
+        """
+        timeouts = {}
+        for strategy, locators in history.items():
+            for name, entry in locators.items():
+                if len(entry["samples"]) < min_samples:
+                    continue
+                timeout = percentile(entry["samples"], 0.99) * factor
+                timeouts.setdefault(strategy, {})[name] = min(max(timeout, minimum), maximum)
+        return timeouts
+
+    @staticmethod
+    def drift_report(history: dict,
+                     reached: dict,
+                     threshold: float=2.0,
+                     min_delta: float=0.05) -> list:
+        """
+        Returns the locators whose median latency in this run moved away from the median
+        of their previous runs.
+
+        Args:
+            history(dict): history of the previous runs, as given by 'load'.
+            reached(dict): latencies of this run, as given by
+                           'WaitEngine.get_reached_samples'.
+            threshold(float): ratio between both medians considered a drift, either way.
+            min_delta(float): seconds both medians must differ, so the noise of very
+                              fast locators is not reported.
+
+        Returns:
+            list: one dict per drifted locator with strategy, locator, baseline and
+                  current seconds and ratio, biggest drift first.
+        """
+        drifted = []
+        for strategy, locators in reached.items():
+            for name, seconds in locators.items():
+                runs = history.get(strategy, {}).get(name, {}).get("runs")
+                if not runs:
+                    continue
+                baseline = percentile([run["p50"] for run in runs], 0.5)
+                current = percentile(seconds, 0.5)
+                ratio = max(current, 1e-6) / max(baseline, 1e-6)
+                if abs(current - baseline) >= min_delta and \
+                        (ratio >= threshold or ratio <= 1 / threshold):
+                    drifted.append({
+                        "strategy": strategy,
+                        "locator": name,
+                        "baseline": baseline,
+                        "current": current,
+                        "ratio": ratio,
+                    })
+        return sorted(drifted, key=lambda row: max(row["ratio"], 1 / row["ratio"]), reverse=True)
+
+
+class LatencyHistoryRecorder:
+    """
+    Pytest plugin which stores the wait latencies of the run in the history and shows the
+    locators whose latency drifted from the previous runs.
+
+    Attributes:
+        history(LatencyHistory): where the latencies are persisted.
+        baseline(dict): history of the previous runs, loaded before this one is stored.
+        threshold(float): ratio between medians reported as a drift.
+    """
+
+    def __init__(self,
+                 history: LatencyHistory,
+                 threshold: float=2.0):
+        self.history = history
+        self.baseline = history.load()
+        self.threshold = threshold
+
+    def pytest_sessionfinish(self):
+        """Persists the latencies measured in this process"""
+        self.history.update(WaitEngine.get_reached_samples())
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Shows the locators whose latency drifted"""
+        drifted = self.history.drift_report(
+            self.baseline, WaitEngine.get_reached_samples(), self.threshold)
+        if not drifted:
+            return
+        terminalreporter.section("wait latency drift")
+        for row in drifted:
+            terminalreporter.write_line(
+                f"{row['locator']} ({row['strategy']}): p50 {row['baseline'] * 1000:.0f}ms "
+                f"-> {row['current'] * 1000:.0f}ms (x{row['ratio']:.1f})")
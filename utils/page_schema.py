@@ -0,0 +1,288 @@
+"""
+Page schema file, compiles the page inputs yaml into immutable locators once per process
+"""
+import hashlib
+import os
+import pickle
+import threading
+from types import MappingProxyType
+import yaml
+from selenium.webdriver.common.by import By
+from test_utils.logger_manager import LoggerManager
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# bump it whenever the compiled format changes, so old disk caches are not loaded
+SCHEMA_VERSION = 3
+# page entries which are kept as they are instead of compiled into locators
+RAW_KEYS = ("path",)
+LOCATOR_STRATEGIES = tuple(name for name in dir(By) if name.isupper())
+
+
+class PageSchemaException(Exception):
+    """PageSchema Exception class"""
+
+
+class Locator:
+    """
+    Immutable element locator with its 'By' value already resolved.
+
+    It unpacks as a (by, value) tuple, so it can be given straight to
+    'driver.find_element(*locator)' or to the expected conditions.
+
+    Attributes:
+        key(str): name of the locator in the page schema.
+        by(str): resolved By value, e.g. 'css selector'.
+        value(str): locator value.
+        page(str): name of the page the locator belongs to, None if unknown.
+    """
+    __slots__ = ("key", "by", "value", "page")
+
+    def __init__(self, key, by, value, page=None):
+        self.key = key
+        self.by = by
+        self.value = value
+        self.page = page
+
+    def __setattr__(self, name, value):
+        # every slot is set once by __init__, any later assignment is refused
+        if hasattr(self, name):
+            raise AttributeError(f"Locator '{self.key}' is immutable")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Locator '{self.key}' is immutable")
+
+    def __iter__(self):
+        return iter((self.by, self.value))
+
+    def __getitem__(self, index):
+        return (self.by, self.value)[index]
+
+    def __len__(self):
+        return 2
+
+    def __eq__(self, other):
+        if isinstance(other, (Locator, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.by, self.value))
+
+    def __reduce__(self):
+        return self.__class__, (self.key, self.by, self.value, self.page)
+
+    @property
+    def name(self) -> str:
+        """Name of the locator qualified by its page, e.g. 'inventory_page.cart_icon'"""
+        return f"{self.page}.{self.key}" if self.page else self.key
+
+    def format(self, **kwargs):
+        """
+        Returns the locator of a template value, e.g. "a[data-test='{link}']".
+
+        Args:
+            kwargs: values of the template fields.
+
+        Returns:
+            Locator: new locator with the same key and page and the fields filled in.
+        """
+        return self.__class__(self.key, self.by, self.value.format(**kwargs), self.page)
+
+    def __repr__(self):
+        return f"Locator({self.key!r}, {self.by!r}, {self.value!r})"
+
+
+def resolve_locator(locator) -> tuple:
+    """
+    Returns the (By value, value) pair of a locator.
+
+    Args:
+        locator(Locator/tuple): compiled locator, or a (By name, value) tuple,
+                                e.g. ("ID", "login-button").
+
+    Returns:
+        tuple: (By value, locator value).
+
+    Raises:
+        PageSchemaException: If the tuple doesn't name a By strategy.
+    """
+    if isinstance(locator, Locator):
+        return locator.by, locator.value
+    if locator[0] not in LOCATOR_STRATEGIES:
+        raise PageSchemaException(f"Unknown locator strategy in {locator}")
+    return getattr(By, locator[0]), locator[1]
+
+
+class _UniqueKeyLoader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+    """Safe yaml loader which refuses mappings with repeated keys"""
+
+    def construct_mapping(self, node, deep=False):
+        seen = {}
+        for key_node, _ in node.value:
+            key = self.construct_object(key_node, deep=deep)
+            line = key_node.start_mark.line + 1
+            if key in seen:
+                raise PageSchemaException(
+                    f"Duplicate key '{key}' at line {line}, already defined at line {seen[key]}")
+            seen[key] = line
+        return super().construct_mapping(node, deep=deep)
+
+
+def _compile_locator(page_name: str, key: str, entry) -> Locator:
+    """Validates a {by, value} entry and returns its compiled locator"""
+    if not isinstance(entry, dict) or set(entry) != {"by", "value"}:
+        raise PageSchemaException(
+            f"'{page_name}.{key}' must be a mapping with just 'by' and 'value'")
+    if entry["by"] not in LOCATOR_STRATEGIES:
+        raise PageSchemaException(
+            f"'{page_name}.{key}' has unknown 'by' {entry['by']}, "
+            f"expected one of {LOCATOR_STRATEGIES}")
+    if not isinstance(entry["value"], str) or not entry["value"]:
+        raise PageSchemaException(f"'{page_name}.{key}' must have a non empty 'value'")
+    return Locator(key, getattr(By, entry["by"]), entry["value"], page_name)
+
+
+def compile_schema(data: dict) -> dict:
+    """
+    Validates the content of a page inputs yaml and compiles its locators.
+
+    Args:
+        data(dict): yaml content, with the pages under 'general_inputs'.
+
+    Returns:
+        dict: {page name: {key: Locator, tuple of Locators or raw value}}.
+
+    Raises:
+        PageSchemaException: If the content doesn't follow the schema.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("general_inputs"), dict):
+        raise PageSchemaException("The pages must be under the 'general_inputs' mapping")
+    pages = {}
+    for page_name, page in data["general_inputs"].items():
+        if not isinstance(page, dict):
+            raise PageSchemaException(f"Page '{page_name}' must be a mapping")
+        compiled = {}
+        for key, entry in page.items():
+            if key in RAW_KEYS:
+                compiled[key] = entry
+            elif isinstance(entry, list):
+                # e.g. one locator per step of a page with several steps
+                compiled[key] = tuple(_compile_locator(page_name, key, item) for item in entry)
+            else:
+                compiled[key] = _compile_locator(page_name, key, entry)
+        pages[page_name] = compiled
+    return pages
+
+
+class PageSchemaCache:
+    """
+    Disk cache of compiled schemas, keyed by the hash of the yaml content, so the
+    yaml is only parsed again when it changes.
+
+    Attributes:
+        log (logger): Logger instance.
+        cache_dir(str): Folder where the compiled schemas are stored.
+    """
+    DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ecommerce_page_schema")
+
+    def __init__(self, cache_dir=None):
+        self.log = LoggerManager.get_logger(self.__class__.__name__)
+        self.cache_dir = cache_dir or os.getenv("PAGE_SCHEMA_CACHE_DIR", self.DEFAULT_CACHE_DIR)
+
+    def _cache_path(self, content: bytes) -> str:
+        """Returns the cache file of the given yaml content"""
+        digest = hashlib.sha256(f"v{SCHEMA_VERSION}\n".encode("utf-8") + content).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pickle")
+
+    def load(self, file_path: str) -> dict:
+        """
+        Returns the compiled schema of the given yaml file, from the cache if possible.
+
+        Args:
+            file_path(str): yaml file path.
+
+        Returns:
+            dict: {page name: {key: Locator, tuple of Locators or raw value}}.
+
+        Raises:
+            PageSchemaException: If the yaml can not be read or is not valid.
+        """
+        try:
+            with open(file_path, "rb") as file:
+                content = file.read()
+        except OSError as e:
+            raise PageSchemaException(f"Unable to read the page schema {file_path}") from e
+        cache_path = self._cache_path(content)
+        try:
+            with open(cache_path, "rb") as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError) as e:
+            self.log.info(f"Ignoring the broken page schema cache {cache_path}: {e}")
+        try:
+            pages = compile_schema(yaml.load(content, Loader=_UniqueKeyLoader))
+        except yaml.YAMLError as e:
+            raise PageSchemaException(f"Unable to parse the page schema {file_path}") from e
+        self._store(cache_path, pages)
+        return pages
+
+    def _store(self, cache_path: str, pages: dict) -> None:
+        """Writes the compiled schema, a failure only means it is compiled again next time"""
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as file:
+                pickle.dump(pages, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.log.info(f"Unable to store the page schema cache {cache_path}: {e}")
+
+
+_schemas = {}
+_schemas_lock = threading.Lock()
+
+
+def load_page_schema(relative_path: str) -> dict:
+    """
+    Returns the compiled pages of a page inputs yaml, loaded once per process.
+
+    Args:
+        relative_path(str): yaml path relative to the repository root,
+                            e.g. 'tests/test_inputs/sauce_demo.yaml'.
+
+    Returns:
+        dict: {page name: read-only {key: Locator, tuple of Locators or raw value}}.
+
+    Raises:
+        PageSchemaException: If the yaml can not be read or is not valid.
+    """
+    file_path = os.path.join(ROOT_DIR, relative_path)
+    with _schemas_lock:
+        if file_path not in _schemas:
+            _schemas[file_path] = MappingProxyType({
+                name: MappingProxyType(page)
+                for name, page in PageSchemaCache().load(file_path).items()
+            })
+        return _schemas[file_path]
+
+
+def get_page_inputs(relative_path: str, page_name: str):
+    """
+    Returns the compiled inputs of a single page.
+
+    Args:
+        relative_path(str): yaml path relative to the repository root.
+        page_name(str): page name under 'general_inputs', e.g. 'login_page'.
+
+    Returns:
+        MappingProxyType: read-only {key: Locator, tuple of Locators or raw value}.
+
+    Raises:
+        PageSchemaException: If the page is not in the schema.
+    """
+    pages = load_page_schema(relative_path)
+    if page_name not in pages:
+        raise PageSchemaException(f"Page '{page_name}' is not defined in {relative_path}")
+    return pages[page_name]
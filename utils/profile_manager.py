@@ -0,0 +1,199 @@
+"""
+Profile manager file, handles the browser '--user-data-dir' folders
+"""
+import atexit
+import errno
+import os
+import shutil
+import tempfile
+import threading
+from test_utils.logger_manager import LoggerManager
+from utils.tools import FileLock, FileLockError
+
+if os.name != "nt":
+    import fcntl
+
+
+class ProfileManagerException(Exception):
+    """ProfileManager Exception class"""
+
+
+class ProfileManager:
+    """
+    Creates, clones and removes the browser profile folders.
+
+    Profiles are created on tmpfs ('/dev/shm') when it is available. When a template
+    profile exists for the browser, new profiles are cloned from it, so they start with
+    the static assets of the site already in the HTTP cache. A template is built once by
+    a single process, in a temporary folder moved into place with a completion marker,
+    so no profile is ever cloned from a half-written one. Every profile is removed on
+    'release' and the remaining ones on interpreter exit.
+
+    Attributes:
+        log (logger): Logger instance.
+        base_dir(str): Folder which contains the profiles and templates.
+    """
+    TMPFS_DIR = "/dev/shm"
+    FICLONE = 0x40049409
+    TEMPLATE_MARKER = ".template_complete"
+    TEMPLATE_LOCK_TIMEOUT = 300
+    SKIP_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "lock", "parent.lock",
+                  TEMPLATE_MARKER)
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, base_dir=None):
+        self.log = LoggerManager.get_logger(self.__class__.__name__)
+        self.base_dir = base_dir or self._default_base_dir()
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._profiles = set()
+        self._lock = threading.Lock()
+        atexit.register(self.release_all)
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Returns the ProfileManager shared by the whole process.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _default_base_dir(self) -> str:
+        """Returns a folder on tmpfs if it is available, otherwise the temp folder"""
+        root = tempfile.gettempdir()
+        if os.path.isdir(self.TMPFS_DIR) and os.access(self.TMPFS_DIR, os.W_OK):
+            root = self.TMPFS_DIR
+        return os.path.join(root, "ecommerce_profiles")
+
+    def template_dir(self, browser: str) -> str:
+        """
+        Returns the template profile folder for the given browser.
+
+        Args:
+            browser(str): browser name.
+
+        Returns:
+            str: template folder, it could not exist yet.
+        """
+        return os.path.join(self.base_dir, f"template_{browser.lower()}")
+
+    def has_template(self, browser: str) -> bool:
+        """Returns True if there is a completely built template profile for the browser"""
+        return os.path.isfile(os.path.join(self.template_dir(browser), self.TEMPLATE_MARKER))
+
+    def build_template(self,
+                       browser: str,
+                       build) -> None:
+        """
+        Builds the template profile of the browser, if no process has built it yet.
+
+        The build runs under a lock shared by the workers, into a temporary folder which
+        only replaces the template, together with its completion marker, once it finished.
+        A template left behind by a crashed build has no marker and is built again.
+
+        Args:
+            browser(str): browser name.
+            build(callable): fills the profile folder it receives, e.g. opening a browser
+                             on it.
+
+        Raises:
+            ProfileManagerException: If the lock or the folders could not be handled.
+        """
+        template = self.template_dir(browser)
+        try:
+            with FileLock(f"{template}.lock", timeout=self.TEMPLATE_LOCK_TIMEOUT):
+                if self.has_template(browser):
+                    return
+                staging = tempfile.mkdtemp(prefix=f".building_{browser.lower()}_",
+                                           dir=self.base_dir)
+                try:
+                    build(staging)
+                    with open(os.path.join(staging, self.TEMPLATE_MARKER), "w",
+                              encoding="utf-8"):
+                        pass
+                    shutil.rmtree(template, ignore_errors=True)
+                    os.replace(staging, template)
+                finally:
+                    shutil.rmtree(staging, ignore_errors=True)
+        except (FileLockError, OSError) as e:
+            self.log.error(f"Unable to build the {browser} template: {e}")
+            raise ProfileManagerException(f"Unable to build the {browser} template") from e
+        self.log.info(f"{browser} template built in {template}")
+
+    def _clone_file(self, source: str, target: str) -> None:
+        """
+        Clones one file, using a reflink if the filesystem supports it and a plain copy
+        otherwise. Hardlinks are never used, the browsers rewrite their cache files in
+        place and would change the template and every sibling profile.
+        """
+        if os.name != "nt":
+            try:
+                with open(source, "rb") as src, open(target, "wb") as dst:
+                    fcntl.ioctl(dst.fileno(), self.FICLONE, src.fileno())
+                shutil.copystat(source, target)
+                return
+            except OSError as e:
+                if e.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV,
+                                   errno.EINVAL, errno.ENOSYS):
+                    raise
+                os.remove(target)
+        shutil.copy2(source, target)
+
+    def _clone_template(self, template: str, target: str) -> None:
+        """Clones the template folder into target"""
+        for root, dirs, files in os.walk(template):
+            relative = os.path.relpath(root, template)
+            os.makedirs(os.path.join(target, relative), exist_ok=True)
+            dirs[:] = [folder for folder in dirs if not os.path.islink(os.path.join(root, folder))]
+            for name in files:
+                source = os.path.join(root, name)
+                if name in self.SKIP_FILES or os.path.islink(source):
+                    continue
+                self._clone_file(source, os.path.join(target, relative, name))
+
+    def create(self, browser: str) -> str:
+        """
+        Creates a new profile folder, cloned from the browser template if it exists.
+
+        Args:
+            browser(str): browser name.
+
+        Returns:
+            str: new profile folder.
+
+        Raises:
+            ProfileManagerException: If the profile could not be created.
+        """
+        try:
+            profile = tempfile.mkdtemp(prefix=f"{browser.lower()}_", dir=self.base_dir)
+            if self.has_template(browser):
+                self._clone_template(self.template_dir(browser), profile)
+        except OSError as e:
+            self.log.error(f"Unable to create a profile for {browser}: {e}")
+            raise ProfileManagerException(f"Unable to create a profile for {browser}") from e
+        with self._lock:
+            self._profiles.add(profile)
+        return profile
+
+    def release(self, profile: str) -> None:
+        """
+        Removes the given profile folder.
+
+        Args:
+            profile(str): folder previously returned by 'create'.
+        """
+        with self._lock:
+            self._profiles.discard(profile)
+        shutil.rmtree(profile, ignore_errors=True)
+
+    def release_all(self) -> None:
+        """
+        Removes every profile folder still alive, templates are kept.
+        """
+        with self._lock:
+            profiles = list(self._profiles)
+            self._profiles.clear()
+        for profile in profiles:
+            shutil.rmtree(profile, ignore_errors=True)
@@ -0,0 +1,209 @@
+"""
+Reference cache file, keeps the reference data scraped from the site (credentials,
+catalog, prices) on disk so it is scraped once per session and not once per test
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from test_utils.logger_manager import LoggerManager
+from utils.tools import FileLock, FileLockError
+
+
+class ReferenceCacheException(Exception):
+    """ReferenceCache Exception class"""
+
+
+class ReferenceCache:
+    """
+    Disk cache of scraped reference data with a time to live.
+
+    Every entry is stored as a json file with the digest of its data, an entry whose
+    data doesn't match its digest is treated as missing. Entries are written while
+    holding a file lock, so when several workers start at once only one of them
+    scrapes and the rest read its result.
+
+    In strict mode an entry is only used if the fingerprint of the live page is the
+    one the entry was scraped from, so a change in the page invalidates it right away
+    instead of when the time to live expires.
+
+    Attributes:
+        log (logger): Logger instance.
+        cache_dir(str): Folder where the entries are stored.
+        ttl(int/float): Seconds an entry is valid after being scraped.
+        strict(bool): Flag to validate the entries against the live page.
+        hits(int): lookups answered from the cache.
+        scrapes(int): lookups which had to scrape the page.
+    """
+    DEFAULT_CACHE_DIR = os.path.join(
+        os.path.expanduser("~"), ".cache", "ecommerce_reference_data")
+    DEFAULT_TTL = 24 * 60 * 60
+    _memo = {}
+    _memo_lock = threading.Lock()
+
+    def __init__(self,
+                 cache_dir=None,
+                 ttl: float=DEFAULT_TTL,
+                 strict: bool=False):
+        if ttl <= 0:
+            raise ReferenceCacheException(f"The time to live must be positive, got {ttl}")
+        self.log = LoggerManager.get_logger(self.__class__.__name__)
+        self.cache_dir = cache_dir or os.getenv("REFERENCE_CACHE_DIR", self.DEFAULT_CACHE_DIR)
+        self.ttl = ttl
+        self.strict = strict
+        self.hits = 0
+        self.scrapes = 0
+
+    @staticmethod
+    def _digest(data) -> str:
+        """Returns the content hash of the data"""
+        return hashlib.sha256(
+            json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, name: str) -> str:
+        """Returns the file of the given entry"""
+        return os.path.join(
+            self.cache_dir, f"{hashlib.sha256(name.encode('utf-8')).hexdigest()}.json")
+
+    def _read(self, name: str):
+        """Returns the stored entry, None if it is missing or broken"""
+        try:
+            with open(self._entry_path(name), "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.log.info(f"Ignoring the broken reference entry '{name}': {e}")
+            return None
+        if not isinstance(entry, dict) or entry.get("name") != name or \
+                entry.get("digest") != self._digest(entry.get("data")):
+            self.log.info(f"Ignoring the reference entry '{name}', its content hash mismatches")
+            return None
+        return entry
+
+    def _write(self, entry: dict) -> None:
+        """Writes the entry atomically, a failure only means it is scraped again next time"""
+        path = self._entry_path(entry["name"])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(entry, file)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.log.info(f"Unable to store the reference entry '{entry['name']}': {e}")
+
+    def _is_valid(self, entry, fingerprint) -> bool:
+        """Returns True if the entry is alive and, in strict mode, scraped from the live page"""
+        if entry is None or time.time() - entry["created"] > self.ttl:
+            return False
+        return not self.strict or fingerprint is None or entry["fingerprint"] == fingerprint
+
+    def _scrape(self, name: str, scrape, fingerprint, live_fingerprint) -> dict:
+        """Scrapes the page and returns the new entry"""
+        self.scrapes += 1
+        self.log.info(f"Scraping the reference data '{name}'")
+        data = scrape()
+        if live_fingerprint is None and fingerprint is not None:
+            # stored even out of strict mode, so a strict run can reuse the entry
+            live_fingerprint = fingerprint()
+        return {
+            "name": name,
+            "created": time.time(),
+            "fingerprint": live_fingerprint,
+            "digest": self._digest(data),
+            "data": data,
+        }
+
+    def get(self,
+            name: str,
+            scrape,
+            fingerprint=None):
+        """
+        Returns the reference data 'name', scraping it only if there is no valid entry.
+
+        Args:
+            name(str): entry name, unique per page and data, e.g. 'credentials@<url>'.
+            scrape(callable): function without arguments which scrapes the data, the
+                              result must be json serializable.
+            fingerprint(callable:optional): function without arguments which returns the
+                                            fingerprint of the live page, used in strict
+                                            mode.
+
+        Returns:
+            any: a copy of the reference data, so callers can't alter the cached one.
+        """
+        live_fingerprint = fingerprint() if self.strict and fingerprint else None
+        memo_key = (self.cache_dir, name)
+        with self._memo_lock:
+            entry = self._memo.get(memo_key)
+        if self._is_valid(entry, live_fingerprint):
+            self.hits += 1
+            return copy.deepcopy(entry["data"])
+        entry = self._read(name)
+        if self._is_valid(entry, live_fingerprint):
+            self.hits += 1
+        else:
+            entry = self._get_locked(name, scrape, fingerprint, live_fingerprint)
+        with self._memo_lock:
+            self._memo[memo_key] = entry
+        return copy.deepcopy(entry["data"])
+
+    def _get_locked(self, name, scrape, fingerprint, live_fingerprint) -> dict:
+        """Scrapes the missing entry while holding its lock"""
+        lock_path = f"{self._entry_path(name)[:-len('.json')]}.lock"
+        try:
+            with FileLock(lock_path):
+                # another worker could have scraped it while we were waiting
+                entry = self._read(name)
+                if self._is_valid(entry, live_fingerprint):
+                    self.hits += 1
+                    return entry
+                entry = self._scrape(name, scrape, fingerprint, live_fingerprint)
+                self._write(entry)
+                return entry
+        except FileLockError as e:
+            self.log.info(f"Unable to lock the reference entry '{name}', not storing it: {e}")
+            return self._scrape(name, scrape, fingerprint, live_fingerprint)
+
+    def invalidate(self,
+                   name: str) -> None:
+        """
+        Drops the entry 'name' from memory and disk.
+
+        Args:
+            name(str): entry name.
+        """
+        with self._memo_lock:
+            self._memo.pop((self.cache_dir, name), None)
+        try:
+            os.remove(self._entry_path(name))
+        except OSError:
+            pass
+
+
+_reference_cache = None  # pylint: disable=invalid-name
+
+
+def configure_reference_cache(**kwargs) -> ReferenceCache:
+    """
+    Sets the reference cache used by the page objects.
+
+    Args:
+        kwargs: ReferenceCache arguments, cache_dir, ttl and strict.
+
+    Returns:
+        ReferenceCache: the new reference cache.
+    """
+    global _reference_cache  # pylint: disable=global-statement
+    _reference_cache = ReferenceCache(**kwargs)
+    return _reference_cache
+
+
+def get_reference_cache() -> ReferenceCache:
+    """
+    Returns the reference cache used by the page objects, with the default settings if
+    it has not been configured.
+    """
+    return _reference_cache or configure_reference_cache()
@@ -0,0 +1,347 @@
+"""
+Shard runner file, spreads the collected tests across several pytest worker processes
+"""
+import heapq
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from utils.tools import FileLock
+
+WORKER_ENV = "SHARD_WORKER_ID"
+NODEIDS_ENV = "SHARD_NODEIDS_FILE"
+DEFAULT_DURATION = 1.0
+
+
+class DurationStore:
+    """
+    Keeps the per-test durations recorded from previous runs.
+
+    Attributes:
+        path(str): json file with the durations.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self) -> dict:
+        """Returns {nodeid: seconds}, empty if there is no history yet"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def update(self, durations: dict) -> None:
+        """
+        Merges the given durations into the file, safe with several writers.
+
+        Args:
+            durations(dict): {nodeid: seconds} measured in this run.
+        """
+        if not durations:
+            return
+        with FileLock(f"{self.path}.lock"):
+            stored = self.load()
+            stored.update(durations)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(stored, file, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+def group_key(item, class_params=()) -> str:
+    """
+    Returns the scheduling unit of a test item. Tests of the same class share the
+    class-scoped fixtures ('browser', 'run_users_api' setup), so they never get split.
+
+    Args:
+        item(pytest.Item): collected test.
+        class_params(tuple): class-scoped parameters which split a class in several
+                             units, e.g. the browser of the matrix.
+
+    Returns:
+        str: class node id, or the test node id for module level tests.
+    """
+    if getattr(item, "cls", None) is None:
+        return item.nodeid
+    key = "::".join(item.nodeid.split("::")[:2])
+    callspec = getattr(item, "callspec", None)
+    if callspec is not None:
+        key += "".join(f"[{callspec.params[param]}]"
+                       for param in class_params if param in callspec.params)
+    return key
+
+
+def default_duration(durations: dict) -> float:
+    """Returns the duration assumed for tests never measured, the median of the known ones"""
+    known = sorted(durations.values())
+    return known[len(known) // 2] if known else DEFAULT_DURATION
+
+
+def schedule_lpt(groups: dict, durations: dict, workers: int) -> list:
+    """
+    Distributes the groups across workers using longest-processing-time-first.
+
+    Args:
+        groups(dict): {group key: [node ids]}.
+        durations(dict): {nodeid: seconds} from previous runs.
+        workers(int): number of workers.
+
+    Returns:
+        list: one (estimated load, [node ids]) tuple per worker.
+    """
+    default = default_duration(durations)
+    weighted = sorted(
+        ((sum(durations.get(nodeid, default) for nodeid in nodeids), key)
+         for key, nodeids in groups.items()),
+        reverse=True
+    )
+    heap = [(0.0, idx) for idx in range(workers)]
+    shards = [[0.0, []] for _ in range(workers)]
+    for weight, key in weighted:
+        load, idx = heapq.heappop(heap)
+        shards[idx][0] = load + weight
+        shards[idx][1].extend(groups[key])
+        heapq.heappush(heap, (load + weight, idx))
+    return [(load, nodeids) for load, nodeids in shards if nodeids]
+
+
+def schedule_partitioned(partitions: dict, durations: dict, workers: int) -> list:
+    """
+    Distributes the groups so every partition, e.g. every browser of the matrix, runs in
+    workers of its own. Each partition gets one worker, the remaining ones go to the
+    partitions with the highest load per worker, and its groups are balanced across its
+    workers with 'schedule_lpt'.
+
+    Args:
+        partitions(dict): {partition: {group key: [node ids]}}.
+        durations(dict): {nodeid: seconds} from previous runs.
+        workers(int): number of workers, raised to the number of partitions if lower.
+
+    Returns:
+        list: one (estimated load, [node ids]) tuple per worker.
+    """
+    default = default_duration(durations)
+    loads = {
+        partition: sum(durations.get(nodeid, default)
+                       for nodeids in groups.values() for nodeid in nodeids)
+        for partition, groups in partitions.items()
+    }
+    counts = dict.fromkeys(partitions, 1)
+    for _ in range(workers - len(partitions)):
+        busiest = max(counts, key=lambda partition: loads[partition] / counts[partition])
+        counts[busiest] += 1
+    shards = []
+    for partition, groups in partitions.items():
+        shards.extend(schedule_lpt(groups, durations, counts[partition]))
+    return shards
+
+
+def merge_junit_xml(sources: list, target: str) -> dict:
+    """
+    Merges the JUnit XML files of every worker in a single test suite.
+
+    Args:
+        sources(list): worker xml files, missing files are ignored.
+        target(str): merged xml file.
+
+    Returns:
+        dict: totals of tests, failures, errors and skipped.
+    """
+    totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+    total_time = 0.0
+    merged = ET.Element("testsuite", name="pytest")
+    for source in sources:
+        if not os.path.isfile(source):
+            continue
+        root = ET.parse(source).getroot()
+        suites = [root] if root.tag == "testsuite" else root.findall("testsuite")
+        for suite in suites:
+            for key in totals:
+                totals[key] += int(suite.get(key, 0))
+            total_time += float(suite.get("time", 0))
+            for child in suite:
+                merged.append(child)
+    for key, value in totals.items():
+        merged.set(key, str(value))
+    merged.set("time", f"{total_time:.3f}")
+    testsuites = ET.Element("testsuites")
+    testsuites.append(merged)
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    ET.ElementTree(testsuites).write(target, encoding="utf-8", xml_declaration=True)
+    return totals
+
+
+class DurationRecorder:
+    """
+    Pytest plugin which records how long each test takes (setup + call + teardown).
+
+    Attributes:
+        store(DurationStore): where durations are persisted.
+    """
+
+    def __init__(self, store: DurationStore):
+        self.store = store
+        self.durations = {}
+
+    def pytest_runtest_logreport(self, report):
+        """Accumulates the duration of every phase of a test"""
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration
+
+    def pytest_sessionfinish(self):
+        """Persists the durations measured in this process"""
+        self.store.update(self.durations)
+
+
+class ShardController:
+    """
+    Pytest plugin which, instead of running the collected tests, spreads them across
+    worker processes and merges their results.
+
+    Every worker runs the same command line, restricted to its own node ids. With a
+    partition parameter, e.g. the browser of the matrix, the tests of every value run in
+    workers of their own, so they run at the same time.
+
+    Attributes:
+        config(pytest.Config): pytest configuration.
+        workers(int): number of worker processes.
+        xmlpath(str): JUnit XML file requested by the user, if any.
+        xml_files(list): JUnit XML files written by the workers.
+        partition_param(str): parameter whose values never share a worker, if any.
+        work_dir(str): temporary folder with the node ids, logs and XML of the workers,
+                       removed when pytest exits.
+    """
+
+    def __init__(self,
+                 config,
+                 workers: int,
+                 store: DurationStore,
+                 xmlpath=None,
+                 class_params=(),
+                 partition_param=None):
+        self.config = config
+        self.workers = workers
+        self.store = store
+        self.xmlpath = xmlpath
+        self.class_params = class_params
+        self.partition_param = partition_param
+        self.xml_files = []
+        self.work_dir = None
+        self.shards = []
+        self.outputs = []
+        self.totals = None
+
+    def _worker_command(self, xml_file: str) -> list:
+        """Returns the pytest command line for a worker"""
+        return [
+            sys.executable, "-m", "pytest",
+            *self.config.invocation_params.args,
+            "--workers=0",
+            f"--junitxml={xml_file}",
+        ]
+
+    def pytest_runtestloop(self, session):
+        """Runs the collected items in the worker processes"""
+        if session.config.option.collectonly or not session.items:
+            return None
+        partitions = {}
+        for item in session.items:
+            params = getattr(getattr(item, "callspec", None), "params", {})
+            partitions.setdefault(params.get(self.partition_param), {}).setdefault(
+                group_key(item, self.class_params), []).append(item.nodeid)
+        self.shards = schedule_partitioned(partitions, self.store.load(), self.workers)
+
+        self.work_dir = work_dir = tempfile.mkdtemp(prefix="shards_")
+        processes = []
+        for idx, (_, nodeids) in enumerate(self.shards):
+            nodeids_file = os.path.join(work_dir, f"worker_{idx}.txt")
+            with open(nodeids_file, "w", encoding="utf-8") as file:
+                file.write("\n".join(nodeids))
+            xml_file = os.path.join(work_dir, f"worker_{idx}.xml")
+            log_file = open(  # pylint: disable=consider-using-with
+                os.path.join(work_dir, f"worker_{idx}.log"), "w+", encoding="utf-8")
+            env = dict(os.environ, **{WORKER_ENV: str(idx), NODEIDS_ENV: nodeids_file})
+            process = subprocess.Popen(  # pylint: disable=consider-using-with
+                self._worker_command(xml_file),
+                cwd=str(self.config.invocation_params.dir),
+                env=env,
+                stdout=log_file,
+                stderr=subprocess.STDOUT
+            )
+            processes.append((idx, process, xml_file, log_file, time.perf_counter()))
+
+        self.xml_files = [xml_file for _, _, xml_file, _, _ in processes]
+        try:
+            while processes:
+                for running in list(processes):
+                    idx, process, _, log_file, start_time = running
+                    return_code = process.poll()
+                    if return_code is None:
+                        continue
+                    log_file.seek(0)
+                    self.outputs.append(
+                        (idx, return_code, time.perf_counter() - start_time, log_file.read()))
+                    log_file.close()
+                    processes.remove(running)
+                time.sleep(0.1)
+        finally:
+            # interrupted, the workers left would go on writing to the work dir
+            for _, process, _, log_file, _ in processes:
+                process.kill()
+                process.wait()
+                log_file.close()
+        self.outputs.sort()
+
+        self.totals = merge_junit_xml(
+            self.xml_files, self.xmlpath or os.path.join(work_dir, "merged.xml"))
+        session.testsfailed = self.totals["failures"] + self.totals["errors"]
+        if any(code not in (0, 1, 5) for _, code, _, _ in self.outputs):
+            session.testsfailed = max(session.testsfailed, 1)
+        return True
+
+    def pytest_unconfigure(self):
+        """Removes the work dir, once the summary read the worker files"""
+        if self.work_dir is not None:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            self.work_dir = None
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Shows the output of every worker and the balance of the scheduling"""
+        for idx, return_code, elapsed, output in self.outputs:
+            terminalreporter.section(f"worker {idx} (exit code {return_code})")
+            terminalreporter.write(output)
+        if not self.shards:
+            return
+        terminalreporter.section("shards")
+        for idx, (load, nodeids) in enumerate(self.shards):
+            elapsed = next((out[2] for out in self.outputs if out[0] == idx), 0.0)
+            terminalreporter.write_line(
+                f"worker {idx}: {len(nodeids)} tests, "
+                f"estimated {load:.1f}s, took {elapsed:.1f}s")
+        if self.totals:
+            terminalreporter.write_line(
+                ", ".join(f"{key}: {value}" for key, value in self.totals.items()))
+
+
+def deselect_not_in_shard(config, items) -> None:
+    """
+    Keeps only the items assigned to this worker, when running as a worker.
+
+    Args:
+        config(pytest.Config): pytest configuration.
+        items(list): collected items, modified in place.
+    """
+    nodeids_file = os.getenv(NODEIDS_ENV)
+    if not nodeids_file or not os.getenv(WORKER_ENV):
+        return
+    with open(nodeids_file, "r", encoding="utf-8") as file:
+        selected = set(file.read().splitlines())
+    deselected = [item for item in items if item.nodeid not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item.nodeid in selected]
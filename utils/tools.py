@@ -2,10 +2,18 @@
 Contains common functions, constants, classes that can be util but not
 necessary is part of a feature.
 """
+import json
 import random
 import os
+import time
 import yaml
 import requests
+from utils.circuit_breaker import CircuitBreakerException, CircuitName, get_circuit_breaker
+
+if os.name == "nt":
+    import msvcrt  # pylint: disable=import-error
+else:
+    import fcntl
 
 
 class YamlManager:
@@ -24,6 +32,71 @@ class YamlManager:
         return content
 
 
+class FileLockError(Exception):
+    """FileLock Error"""
+
+
+class FileLock:
+    """
+    Inter-process exclusive lock based on a lock file, so parallel workers can
+    safely share files on disk.
+
+    Attributes:
+        lock_path(str): path of the lock file.
+        timeout(int/float): Timeout in seconds to wait for the lock.
+    """
+
+    def __init__(self, lock_path, timeout=60):
+        self.lock_path = lock_path
+        self.timeout = timeout
+        self._file = None
+
+    def acquire(self):
+        """
+        Blocks until the lock is taken or the timeout is reached.
+
+        Raises:
+            FileLockError: If the lock couldn't be taken within timeout.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        # pylint: disable=consider-using-with
+        self._file = open(self.lock_path, "a+", encoding="utf-8")
+        end_time = time.monotonic() + self.timeout
+        while True:
+            try:
+                if os.name == "nt":
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except OSError as e:
+                if time.monotonic() > end_time:
+                    self._file.close()
+                    self._file = None
+                    raise FileLockError(f"Unable to lock {self.lock_path}") from e
+                time.sleep(0.05)
+
+    def release(self):
+        """Releases the lock if it is held"""
+        if self._file is None:
+            return
+        if os.name == "nt":
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
 class ApiManagerError(Exception):
     """ApiManager Error"""
 
@@ -38,6 +111,9 @@ class ApiManager:
         """
         Methods to manage get api response
 
+        The API is guarded by a circuit breaker, once it has been unreachable several
+        times in a row it is not even requested until the next probe.
+
         Args:
             timeout(int/float): time out in seconds
             is_random(bool:optional): Flag to determinate to give a random user
@@ -45,13 +121,126 @@ class ApiManager:
         
         Returns:
             dict: Response from api
+
+        Raises:
+            ApiManagerError: If the request fails or the API is known to be unreachable.
         """
-        try:
-            res = requests.get(url, timeout=timeout)
-        except Exception as e:
-            raise ApiManagerError("Unable to perform get request") from e
+        res = ApiManager._request(url, timeout)
         if res.status_code == 200:
             if is_random:
                 return random.choices(res.json(), k=num)
             return res.json()
         raise ApiManagerError("Error request")
+
+    @staticmethod
+    def get_api_sample(url, n=1, seed=None, timeout=5):
+        """
+        Returns random items picked by the API itself, so it costs the same however many
+        items there are.
+
+        Args:
+            url(str): sampling endpoint, e.g. '<api>/users/sample'.
+            n(int:optional): number of items.
+            seed(int:optional): seed giving the same items again.
+            timeout(int/float): time out in seconds
+
+        Returns:
+            list: the sampled items.
+
+        Raises:
+            ApiManagerError: If the request fails or the API is known to be unreachable.
+        """
+        params = {"n": n} if seed is None else {"n": n, "seed": seed}
+        res = ApiManager._request(url, timeout, params)
+        if res.status_code == 200:
+            return res.json()
+        raise ApiManagerError(f"Error request, status {res.status_code}")
+
+    @staticmethod
+    def iter_api_pages(url, limit=100, timeout=5, key="users", **params):
+        """
+        Yields the pages of a paginated API, each one requested once the previous one
+        has been consumed, so only one page is held at a time.
+
+        Args:
+            url(str): paginated endpoint, answering {key: [...], "next": cursor}.
+            limit(int:optional): items per page.
+            timeout(int/float): time out in seconds of every request
+            key(str:optional): field of the response with the items.
+            params: other query arguments, e.g. fields="first_name,last_name".
+
+        Yields:
+            list: items of every page.
+
+        Raises:
+            ApiManagerError: If a request fails or the API is known to be unreachable.
+        """
+        after = None
+        while True:
+            query = dict(params, limit=limit)
+            if after is not None:
+                query["after"] = after
+            res = ApiManager._request(url, timeout, query)
+            if res.status_code != 200:
+                raise ApiManagerError(f"Error request, status {res.status_code}")
+            page = res.json()
+            yield page[key]
+            after = page["next"]
+            if after is None:
+                return
+
+    @staticmethod
+    def upload_api_items(url, items, timeout=30, **params):
+        """
+        Uploads items to a bulk endpoint as a stream of json lines, so they don't need to
+        be in memory at once.
+
+        Args:
+            url(str): bulk endpoint, e.g. '<api>/users/bulk'.
+            items(iterable): json serializable items, e.g. a generator.
+            timeout(int/float): time out in seconds
+            params: query arguments, e.g. chunk_size=500.
+
+        Returns:
+            dict: report of the upload, with the items inserted and failed.
+
+        Raises:
+            ApiManagerError: If the request fails or the API is known to be unreachable.
+        """
+        res = ApiManager._request(
+            url, timeout, params, method="post",
+            data=(f"{json.dumps(item)}\n".encode("utf-8") for item in items),
+            headers={"Content-Type": "application/x-ndjson"})
+        if res.status_code in (201, 207):
+            return res.json()
+        raise ApiManagerError(f"Error request, status {res.status_code}")
+
+    @staticmethod
+    def _request(url, timeout, params=None, method="get", **kwargs):
+        """
+        Performs a request guarded by the API circuit breaker.
+
+        Args:
+            url(str): requested url.
+            timeout(int/float): time out in seconds
+            params(dict:optional): query arguments.
+            method(str:optional): http method.
+            **kwargs(dict): other arguments of the request, e.g. data.
+
+        Returns:
+            Response: the response, with a status lower than 500.
+
+        Raises:
+            ApiManagerError: If the request fails or the API is known to be unreachable.
+        """
+        try:
+            with get_circuit_breaker(CircuitName.API).guard(requests.RequestException):
+                res = requests.request(method, url, params=params, timeout=timeout, **kwargs)
+                if res.status_code >= 500:
+                    # a failing server is as unusable as an unreachable one
+                    raise requests.HTTPError(f"Server error {res.status_code}", response=res)
+        except CircuitBreakerException as e:
+            raise ApiManagerError(f"API unreachable, not requesting {url}") from e
+        except Exception as e:
+            raise ApiManagerError("Unable to perform get request") from e
+        return res
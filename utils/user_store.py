@@ -0,0 +1,534 @@
+"""
+User store file, storage backends of the users API: Mongo, in memory and SQLite
+"""
+import json
+import random
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from enum import Enum
+from bson import ObjectId
+from bson.errors import BSONError, InvalidId
+from faker import Faker
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError, PyMongoError
+from test_utils.logger_manager import LoggerManager
+
+# user fields which can be filtered on, indexed by the memory and SQLite stores
+USER_FIELDS = ("first_name", "last_name", "zip_code")
+
+
+class UserStoreException(Exception):
+    """UserStore Exception class"""
+
+
+def project(user: dict,
+            fields=None) -> dict:
+    """
+    Returns a copy of the user with only the given fields.
+
+    Args:
+        user(dict): user fields.
+        fields(list:optional): fields to keep, all of them when not given.
+
+    Returns:
+        dict: the projected user.
+    """
+    if not fields:
+        return dict(user)
+    return {field: user[field] for field in fields if field in user}
+
+
+def validate_user(user) -> None:
+    """
+    Checks a user can be stored and indexed: a dict whose USER_FIELDS are scalars.
+
+    Args:
+        user(any): user to check.
+
+    Raises:
+        UserStoreException: If the user is not valid.
+    """
+    if not isinstance(user, dict):
+        raise UserStoreException(f"A user must be a json object, not {type(user).__name__}")
+    for field in USER_FIELDS:
+        if not isinstance(user.get(field), (str, int, float, bool, type(None))):
+            raise UserStoreException(f"The user field '{field}' must be a scalar value")
+
+
+def parse_cursor(after):
+    """
+    Returns the position of a numeric cursor, as given by the memory and SQLite scans.
+
+    Args:
+        after(str): cursor, None to scan from the beginning.
+
+    Returns:
+        int: the position, None when no cursor is given.
+
+    Raises:
+        UserStoreException: If the cursor is not a canonical non negative integer.
+    """
+    if after is None:
+        return None
+    if not isinstance(after, str) or not after.isdigit() or str(int(after)) != after:
+        raise UserStoreException(f"Invalid cursor {after!r}")
+    return int(after)
+
+
+def check_filters(filters) -> None:
+    """
+    Checks the users are only filtered by indexed fields.
+
+    Args:
+        filters(dict): {field: value}.
+
+    Raises:
+        UserStoreException: If a field is not in USER_FIELDS.
+    """
+    unknown = set(filters) - set(USER_FIELDS)
+    if unknown:
+        raise UserStoreException(f"Users can not be filtered by {sorted(unknown)}")
+
+
+class StoreBackend(str, Enum):
+    """
+    Enum class with the available user store backends
+    """
+    MONGO = "mongo"
+    MEMORY = "memory"
+    SQLITE = "sqlite"
+
+
+class UserStore(ABC):
+    """
+    Interface of the storage behind the users API.
+
+    Attributes:
+        log (logger): Logger instance.
+    """
+
+    def __init__(self):
+        self.log = LoggerManager.get_logger(self.__class__.__name__)
+
+    def ping(self) -> None:
+        """
+        Checks the store is reachable.
+
+        Raises:
+            UserStoreException: If the store doesn't answer.
+        """
+
+    @abstractmethod
+    def scan(self,
+             filters=None,
+             fields=None,
+             after=None,
+             batch_size: int=100):
+        """
+        Yields the users matching all the given fields, in insertion order, reading them
+        from the storage a batch at a time as they are consumed.
+
+        Args:
+            filters(dict:optional): {field: value}, fields from USER_FIELDS.
+            fields(list:optional): fields returned of every user, all of them when not given.
+            after(str:optional): cursor of the user the scan resumes after.
+            batch_size(int:optional): users read from the storage at once.
+
+        Yields:
+            tuple: (cursor, user), the cursor resumes a later scan right after that user.
+
+        Raises:
+            UserStoreException: If the cursor is not valid, once the scan is started.
+        """
+
+    def find(self,
+             filters=None,
+             fields=None) -> list:
+        """
+        Returns the users matching all the given fields.
+
+        Args:
+            filters(dict:optional): {field: value}, fields from USER_FIELDS.
+            fields(list:optional): fields returned of every user, all of them when not given.
+
+        Returns:
+            list: users, in insertion order.
+        """
+        return [user for _, user in self.scan(filters, fields)]
+
+    @abstractmethod
+    def insert(self,
+               user: dict) -> None:
+        """
+        Stores a user.
+
+        Args:
+            user(dict): user fields.
+
+        Raises:
+            UserStoreException: If the user is not valid or can not be stored.
+        """
+
+    @abstractmethod
+    def sample(self,
+               n: int=1,
+               seed=None) -> list:
+        """
+        Returns random users, without reading the rest of them.
+
+        Args:
+            n(int:optional): number of users, all of them when there are fewer (Mongo can
+                             return fewer when most of the collection is requested).
+            seed(int:optional): seed giving the same users again for the same store.
+
+        Returns:
+            list: the sampled users, without repetitions.
+        """
+
+    def insert_many(self,
+                    users: list) -> tuple:
+        """
+        Stores several users at once, the failure of one doesn't stop the others.
+
+        Args:
+            users(list): user dicts.
+
+        Returns:
+            tuple: (number of users stored, list of error messages).
+        """
+        errors = []
+        for user in users:
+            try:
+                self.insert(user)
+            except UserStoreException as e:
+                errors.append(str(e))
+        return len(users) - len(errors), errors
+
+    def count(self) -> int:
+        """Returns the number of stored users"""
+        return len(self.find())
+
+    def close(self) -> None:
+        """Releases the resources of the store"""
+
+
+class MongoUserStore(UserStore):
+    """
+    Users stored in a Mongo collection.
+
+    Attributes:
+        client(MongoClient): Mongo client.
+        collection(Collection): collection with the users.
+    """
+    # $sample and the seeded picks can repeat users, the repeated ones are picked again
+    SAMPLE_ATTEMPTS = 3
+
+    def __init__(self,
+                 mongo_uri,
+                 db_name,
+                 collection_name,
+                 timeout_ms=30000):
+        super().__init__()
+        try:
+            self.client = MongoClient(mongo_uri, serverSelectionTimeoutMS=timeout_ms)
+        except PyMongoError as e:
+            raise UserStoreException(f"Invalid Mongo settings: {e}") from e
+        self.collection = self.client[db_name][collection_name]
+
+    def ping(self) -> None:
+        try:
+            self.client.admin.command("ping")
+        except PyMongoError as e:
+            raise UserStoreException(f"Mongo didn't answer the ping: {e}") from e
+
+    def scan(self, filters=None, fields=None, after=None, batch_size=100):
+        query = dict(filters or {})
+        if after is not None:
+            try:
+                query["_id"] = {"$gt": ObjectId(after)}
+            except (InvalidId, TypeError) as e:
+                raise UserStoreException(f"Invalid cursor {after!r}") from e
+        projection = {field: 1 for field in fields} if fields else None
+        # the cursor fetches 'batch_size' documents per round trip to the server
+        cursor = self.collection.find(query, projection).sort("_id", 1).batch_size(batch_size)
+        for user in cursor:
+            user_id = user.pop("_id")
+            yield str(user_id), user
+
+    def insert(self, user: dict) -> None:
+        _, errors = self.insert_many([user])
+        if errors:
+            raise UserStoreException(errors[0])
+
+    def insert_many(self, users):
+        valid, errors = [], []
+        # same users as the other backends, insert_many adds the '_id' to copies of them
+        for user in users:
+            try:
+                validate_user(user)
+            except UserStoreException as e:
+                errors.append(str(e))
+            else:
+                valid.append(dict(user))
+        if not valid:
+            return 0, errors
+        try:
+            # unordered, the server goes on with the rest of the users after a failure
+            result = self.collection.insert_many(valid, ordered=False)
+        except BulkWriteError as e:
+            return e.details["nInserted"], \
+                errors + [error["errmsg"] for error in e.details["writeErrors"]]
+        except (PyMongoError, BSONError) as e:
+            return 0, errors + [f"Unable to store the users: {e}"]
+        return len(result.inserted_ids), errors
+
+    def sample(self, n=1, seed=None):
+        rng = random.Random(seed)
+        picked = {}
+        for _ in range(self.SAMPLE_ATTEMPTS):
+            missing = n - len(picked)
+            if missing <= 0:
+                break
+            users = self._sample_by_id(missing, rng) if seed is not None else \
+                self.collection.aggregate([{"$sample": {"size": missing}}])
+            for user in users:
+                picked.setdefault(user.pop("_id"), user)
+        return list(picked.values())[:n]
+
+    def _sample_by_id(self, n, rng) -> list:
+        """
+        Returns the first user at or after 'n' random points between the lowest and the
+        highest _id, every one an index seek, as $sample can not be seeded.
+        """
+        first = self.collection.find_one({}, {"_id": 1}, sort=[("_id", 1)])
+        last = self.collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        if first is None or last is None:
+            return []
+        low, high = int(str(first["_id"]), 16), int(str(last["_id"]), 16)
+        users = []
+        for _ in range(n):
+            point = ObjectId(f"{rng.randint(low, high):024x}")
+            user = self.collection.find_one({"_id": {"$gte": point}}, sort=[("_id", 1)])
+            if user is not None:
+                users.append(user)
+        return users
+
+    def count(self) -> int:
+        return self.collection.count_documents({})
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class MemoryUserStore(UserStore):
+    """
+    Users kept in the process memory, with an index per user field so the filtered
+    lookups don't scan every user.
+
+    Attributes:
+        users(list): stored users.
+        indexes(dict): {field: {value: [user positions]}}.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.users = []
+        self.indexes = {field: {} for field in USER_FIELDS}
+        self._lock = threading.Lock()
+
+    def scan(self, filters=None, fields=None, after=None, batch_size=100):
+        position = parse_cursor(after)
+        start = 0 if position is None else position + 1
+        check_filters(filters or {})
+        with self._lock:
+            if not filters:
+                positions = range(start, len(self.users))
+            else:
+                matches = None
+                for field, value in filters.items():
+                    found = set(self.indexes[field].get(value, ()))
+                    matches = found if matches is None else matches & found
+                positions = sorted(position for position in matches if position >= start)
+        # the users are only appended, so the positions stay valid between batches
+        for begin in range(0, len(positions), batch_size):
+            with self._lock:
+                batch = [(str(position), project(self.users[position], fields))
+                         for position in positions[begin:begin + batch_size]]
+            yield from batch
+
+    def insert(self, user: dict) -> None:
+        _, errors = self.insert_many([user])
+        if errors:
+            raise UserStoreException(errors[0])
+
+    def insert_many(self, users):
+        valid, errors = [], []
+        # validated before changing the store, so a rejected user leaves nothing behind
+        for user in users:
+            try:
+                validate_user(user)
+            except UserStoreException as e:
+                errors.append(str(e))
+            else:
+                valid.append(dict(user))
+        with self._lock:
+            for user in valid:
+                self.users.append(user)
+                for field, index in self.indexes.items():
+                    if field in user:
+                        index.setdefault(user[field], []).append(len(self.users) - 1)
+        return len(valid), errors
+
+    def sample(self, n=1, seed=None):
+        with self._lock:
+            positions = random.Random(seed).sample(range(len(self.users)), min(n, len(self.users)))
+            return [dict(self.users[position]) for position in positions]
+
+    def count(self) -> int:
+        return len(self.users)
+
+
+class SQLiteUserStore(UserStore):
+    """
+    Users stored in a SQLite database, as json documents with the user fields in indexed
+    columns.
+
+    Attributes:
+        path(str): database file, ':memory:' for a database in memory.
+        connection(Connection): SQLite connection, shared by the server threads.
+    """
+
+    def __init__(self,
+                 path=":memory:"):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        columns = ", ".join(f"{field} TEXT" for field in USER_FIELDS)
+        try:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            with self.connection:
+                self.connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, {columns}, "
+                    "doc TEXT)")
+                for field in USER_FIELDS:
+                    self.connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS users_{field} ON users ({field})")
+        except sqlite3.Error as e:
+            raise UserStoreException(f"Unable to open the SQLite database {path}: {e}") from e
+
+    def ping(self) -> None:
+        try:
+            with self._lock:
+                self.connection.execute("SELECT 1")
+        except sqlite3.Error as e:
+            raise UserStoreException(f"SQLite database {self.path} not usable: {e}") from e
+
+    def scan(self, filters=None, fields=None, after=None, batch_size=100):
+        filters = filters or {}
+        check_filters(filters)
+        last_id = parse_cursor(after) or 0
+        where = " AND ".join([f"{field} = ?" for field in filters] + ["id > ?"])
+        query = f"SELECT id, doc FROM users WHERE {where} ORDER BY id LIMIT ?"
+        while True:
+            # keyset pagination, every batch is an index range read
+            with self._lock:
+                rows = self.connection.execute(
+                    query, (*filters.values(), last_id, batch_size)).fetchall()
+            for row_id, doc in rows:
+                yield str(row_id), project(json.loads(doc), fields)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def insert(self, user: dict) -> None:
+        _, errors = self.insert_many([user])
+        if errors:
+            raise UserStoreException(errors[0])
+
+    def insert_many(self, users):
+        placeholders = ", ".join("?" for _ in USER_FIELDS)
+        rows, errors = [], []
+        for user in users:
+            try:
+                validate_user(user)
+                rows.append((*(user.get(field) for field in USER_FIELDS), json.dumps(user)))
+            except (UserStoreException, TypeError, ValueError) as e:
+                errors.append(str(e))
+        try:
+            # a single transaction for all the valid users
+            with self._lock, self.connection:
+                self.connection.executemany(
+                    f"INSERT INTO users ({', '.join(USER_FIELDS)}, doc) "
+                    f"VALUES ({placeholders}, ?)", rows)
+        except sqlite3.Error as e:
+            return 0, errors + [f"Unable to store the users: {e}"]
+        return len(rows), errors
+
+    def sample(self, n=1, seed=None):
+        with self._lock:
+            last_id = self.connection.execute("SELECT MAX(id) FROM users").fetchone()[0] or 0
+            # users are never deleted, so the ids go from 1 to the last one without gaps
+            ids = random.Random(seed).sample(range(1, last_id + 1), min(n, last_id))
+            rows = dict(self.connection.execute(
+                f"SELECT id, doc FROM users WHERE id IN ({', '.join('?' for _ in ids)})",
+                ids).fetchall())
+        return [json.loads(rows[user_id]) for user_id in ids]
+
+    def count(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def seed_users(store: UserStore,
+               count: int=100,
+               seed: int=0) -> None:
+    """
+    Fills an empty store with fake users, always the same ones for the same seed.
+
+    Args:
+        store(UserStore): store to fill.
+        count(int): number of users.
+        seed(int): faker seed.
+    """
+    if store.count():
+        return
+    fake = Faker()
+    fake.seed_instance(seed)
+    store.insert_many([{
+        "first_name": fake.first_name(),
+        "last_name": fake.last_name(),
+        "zip_code": fake.postcode(),
+    } for _ in range(count)])
+
+
+def create_user_store(backend: StoreBackend,
+                      mongo_settings=None,
+                      sqlite_path=":memory:") -> UserStore:
+    """
+    Returns the user store of the given backend, the memory and SQLite ones seeded with
+    fake users.
+
+    Args:
+        backend(StoreBackend): storage backend.
+        mongo_settings(dict:optional): mongo_uri, db_name and collection_name of the Mongo
+                                       backend.
+        sqlite_path(str:optional): database file of the SQLite backend.
+
+    Returns:
+        UserStore: the new store.
+
+    Raises:
+        UserStoreException: If the Mongo backend is requested without its settings.
+    """
+    backend = StoreBackend(backend)
+    if backend is StoreBackend.MONGO:
+        if not mongo_settings:
+            raise UserStoreException("The Mongo backend needs its settings")
+        return MongoUserStore(**mongo_settings)
+    store = MemoryUserStore() if backend is StoreBackend.MEMORY else SQLiteUserStore(sqlite_path)
+    seed_users(store)
+    return store
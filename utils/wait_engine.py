@@ -0,0 +1,408 @@
+"""
+Wait engine file, waits for elements with an in-page MutationObserver or by polling
+"""
+import threading
+import time
+from enum import Enum
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    TimeoutException
+)
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from test_utils.logger_manager import LoggerManager
+from utils.dom_scripts import WAIT_FOR_ELEMENT_JS, is_js_locator
+from utils.page_schema import resolve_locator
+
+
+class WaitStrategy(str, Enum):
+    """
+    Enum class with the available wait strategies
+    """
+    MUTATION = "mutation"
+    POLLING = "polling"
+
+
+class WaitCondition(str, Enum):
+    """
+    Enum class with the conditions an element can be waited for
+    """
+    PRESENT = "present"
+    VISIBLE = "visible"
+    CLICKABLE = "clickable"
+    STATE = "state"
+
+
+def element_present(element):
+    """Expected condition which returns the given element, it is already present"""
+    return lambda _: element
+
+
+def element_visible(element):
+    """Expected condition which returns the given element once it is visible"""
+    return lambda _: element if element.is_displayed() else False
+
+
+def element_clickable(element):
+    """Expected condition which returns the given element once it is visible and enabled"""
+    return lambda _: element if element.is_displayed() and element.is_enabled() else False
+
+
+def driver_backend(driver) -> str:
+    """
+    Returns the name of the browser behind a webdriver, e.g. 'chrome', or 'fake' for the
+    FakeWebDriver.
+
+    Args:
+        driver(Webdriver): webdriver instance.
+
+    Returns:
+        str: lowercase browser name, 'unknown' when the driver doesn't tell it.
+    """
+    try:
+        return str(driver.name).lower()
+    except (AttributeError, KeyError):
+        return "unknown"
+
+
+LOCATOR_CONDITIONS = {
+    WaitCondition.PRESENT: EC.presence_of_element_located,
+    WaitCondition.VISIBLE: EC.visibility_of_element_located,
+    WaitCondition.CLICKABLE: EC.element_to_be_clickable,
+}
+ELEMENT_CONDITIONS = {
+    WaitCondition.PRESENT: element_present,
+    WaitCondition.VISIBLE: element_visible,
+    WaitCondition.CLICKABLE: element_clickable,
+}
+
+
+class WaitEngine:
+    """
+    Waits until an element meets a condition.
+
+    With the mutation strategy a single async script blocks in the page until the
+    condition holds, so the wait returns as soon as the DOM changes instead of on the
+    next 'poll_frequency' tick. Locators which can not be evaluated by a script, and
+    pages where the script is not supported, fall back to polling with WebDriverWait.
+
+    The latency of every wait is recorded per backend, page, locator and strategy, shared
+    by every engine of the process. Once calibrated from the latency history of previous
+    runs, the waits use the timeout derived for their locator and backend when it is
+    shorter than the given one, so the latencies of a fake or a faster browser never set
+    the timeouts of another one.
+
+    Attributes:
+        log (logger): Logger instance.
+        strategy(WaitStrategy): preferred wait strategy.
+        poll_frequency(float): seconds between checks when polling.
+        backend(str): browser the engine waits in, as given by 'driver_backend'.
+    """
+    latencies = {}
+    # {'<backend>/<strategy>': {qualified locator name: seconds}} derived from the history
+    timeouts = {}
+    _latencies_lock = threading.Lock()
+
+    def __init__(self,
+                 strategy=WaitStrategy.MUTATION,
+                 poll_frequency: float=0.5,
+                 backend: str="unknown"):
+        self.log = LoggerManager.get_logger(self.__class__.__name__)
+        self.strategy = WaitStrategy(strategy)
+        self.poll_frequency = poll_frequency
+        self.backend = backend
+        self._script_timeout = None
+        self._script_supported = True
+
+    @classmethod
+    def record(cls,
+               name: str,
+               condition: WaitCondition,
+               strategy: WaitStrategy,
+               seconds: float,
+               timed_out: bool,
+               page: str=None,
+               backend: str="unknown") -> None:
+        """
+        Records the latency of a wait.
+
+        Args:
+            name(str): locator name.
+            condition(WaitCondition): waited condition.
+            strategy(WaitStrategy): strategy used for the wait.
+            seconds(float): time spent waiting.
+            timed_out(bool): Flag to indicate the condition never held.
+            page(str:optional): page of the locator.
+            backend(str:optional): browser the wait ran in.
+        """
+        with cls._latencies_lock:
+            samples = cls.latencies.setdefault(
+                (backend, page, name, condition.value, strategy.value),
+                {"seconds": [], "reached": [], "timeouts": 0})
+            samples["seconds"].append(seconds)
+            if not timed_out:
+                samples["reached"].append(seconds)
+            samples["timeouts"] += int(timed_out)
+
+    @classmethod
+    def get_latency_summary(cls) -> list:
+        """
+        Returns the recorded latencies, slowest locators first.
+
+        Returns:
+            list: one dict per (backend, page, locator, condition, strategy) with count,
+                  timeouts, mean, p50 and max seconds.
+        """
+        summary = []
+        with cls._latencies_lock:
+            for (backend, page, name, condition, strategy), samples in cls.latencies.items():
+                seconds = sorted(samples["seconds"])
+                summary.append({
+                    "backend": backend,
+                    "page": page,
+                    "locator": name,
+                    "condition": condition,
+                    "strategy": strategy,
+                    "count": len(seconds),
+                    "timeouts": samples["timeouts"],
+                    "mean": sum(seconds) / len(seconds),
+                    "p50": seconds[len(seconds) // 2],
+                    "max": seconds[-1],
+                })
+        return sorted(summary, key=lambda row: row["mean"] * row["count"], reverse=True)
+
+    @classmethod
+    def get_reached_samples(cls) -> dict:
+        """
+        Returns the latency of the waits which reached their condition, the timed out ones
+        only tell the timeout and not how long the locator takes.
+
+        Returns:
+            dict: {'<backend>/<strategy>': {qualified locator name: [seconds]}}, e.g.
+                  {'chrome/mutation': {'inventory_page.cart_icon': [0.01, 0.02]}}.
+        """
+        reached = {}
+        with cls._latencies_lock:
+            for (backend, page, name, _, strategy), samples in cls.latencies.items():
+                if samples["reached"]:
+                    reached.setdefault(f"{backend}/{strategy}", {}).setdefault(
+                        f"{page}.{name}" if page else name, []).extend(samples["reached"])
+        return reached
+
+    @classmethod
+    def calibrate(cls,
+                  timeouts: dict) -> None:
+        """
+        Sets the timeouts derived from the latency history.
+
+        Args:
+            timeouts(dict): {'<backend>/<strategy>': {qualified locator name: seconds}}.
+        """
+        with cls._latencies_lock:
+            cls.timeouts = timeouts
+
+    def _strategy_for(self, resolved: tuple) -> WaitStrategy:
+        """Returns the strategy a wait for the resolved locator is done with"""
+        if self.strategy is WaitStrategy.MUTATION and \
+                (not self._script_supported or not is_js_locator(resolved)):
+            return WaitStrategy.POLLING
+        return self.strategy
+
+    def calibrated_timeout(self,
+                           locator,
+                           timeout: float) -> float:
+        """
+        Returns the timeout derived for the locator in this backend from the latency history,
+        never longer than the given timeout.
+
+        Args:
+            locator(Locator/tuple/str): element locator, or name of a page state.
+            timeout(int/float): Timeout in seconds given by the caller, used as it is when
+                                there is no history.
+
+        Returns:
+            float: timeout in seconds.
+        """
+        if isinstance(locator, str):
+            name, strategy = locator, WaitStrategy.POLLING
+        else:
+            name = getattr(locator, "name", None)
+            strategy = self._strategy_for(resolve_locator(locator))
+        derived = self.timeouts.get(f"{self.backend}/{strategy.value}", {}).get(name, timeout)
+        return min(derived, timeout)
+
+    def wait(self,
+             driver,
+             context,
+             locator: tuple,
+             condition: WaitCondition,
+             timeout: float):
+        """
+        Waits until the first element of 'locator' meets the condition.
+
+        Args:
+            driver(Webdriver): webdriver instance.
+            context(Element): element to search in, None for the whole page.
+            locator(tuple): element locator.
+            condition(WaitCondition): condition to wait for.
+            timeout(int/float): Timeout in seconds to wait.
+
+        Returns:
+            Element: element which meets the condition.
+
+        Raises:
+            TimeoutException: In case the timeout has been reached.
+        """
+        resolved = resolve_locator(locator)
+        name = self._locator_name(locator, resolved)
+        strategy = self._strategy_for(resolved)
+        start_time = time.perf_counter()
+        timed_out = False
+        try:
+            if strategy is WaitStrategy.MUTATION:
+                try:
+                    return self._wait_in_page(driver, context, resolved, condition, timeout)
+                except JavascriptException as e:
+                    self.log.info(f"Waiting in page is not supported, polling instead: {e}")
+                    self._script_supported = False
+                    strategy = WaitStrategy.POLLING
+            return WebDriverWait(
+                context or driver, timeout, poll_frequency=self.poll_frequency
+            ).until(LOCATOR_CONDITIONS[condition](resolved))
+        except TimeoutException:
+            timed_out = True
+            raise
+        finally:
+            self.record(name, condition, strategy, time.perf_counter() - start_time, timed_out,
+                        getattr(locator, "page", None), self.backend)
+
+    def find_now(self,
+                 driver,
+                 context,
+                 locator: tuple,
+                 condition: WaitCondition):
+        """
+        Looks for the element of 'locator' once, without waiting, for pages already known
+        to be ready. The lookup is not recorded, the latencies calibrate the timeouts of
+        the waits and an instant lookup would make them shorter than the waits need.
+
+        Args:
+            driver(Webdriver): webdriver instance.
+            context(Element): element to search in, None for the whole page.
+            locator(tuple): element locator.
+            condition(WaitCondition): PRESENT or VISIBLE.
+
+        Returns:
+            Element: the element, None if it is not there or not visible yet.
+        """
+        try:
+            element = (context or driver).find_element(*resolve_locator(locator))
+        except NoSuchElementException:
+            return None
+        if condition is WaitCondition.VISIBLE and not element.is_displayed():
+            return None
+        return element
+
+    def wait_element(self,
+                     driver,
+                     element,
+                     condition: WaitCondition,
+                     timeout: float):
+        """
+        Waits until an already found element meets the condition.
+
+        Args:
+            driver(Webdriver/Element): webdriver or element the wait runs on.
+            element(Element): element to check.
+            condition(WaitCondition): condition to wait for.
+            timeout(int/float): Timeout in seconds to wait.
+
+        Returns:
+            Element: the given element.
+
+        Raises:
+            TimeoutException: In case the timeout has been reached.
+            StaleElementReferenceException: If the element is no longer in the page.
+        """
+        return WebDriverWait(driver, timeout, poll_frequency=self.poll_frequency).until(
+            ELEMENT_CONDITIONS[condition](element))
+
+    def wait_until(self,
+                   driver,
+                   name: str,
+                   predicate,
+                   timeout: float,
+                   poll_frequency: float=0.1):
+        """
+        Polls 'predicate' until it returns a truthy value, for page states which are not
+        about a single element condition.
+
+        Args:
+            driver(Webdriver): webdriver instance.
+            name(str): name of the state, used to record the latency.
+            predicate(callable): function without arguments which checks the state.
+            timeout(int/float): Timeout in seconds to wait.
+            poll_frequency(float): seconds between checks.
+
+        Returns:
+            any: first truthy value returned by 'predicate'.
+
+        Raises:
+            TimeoutException: In case the timeout has been reached.
+        """
+        start_time = time.perf_counter()
+        timed_out = False
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
+                lambda _: predicate())
+        except TimeoutException:
+            timed_out = True
+            raise
+        finally:
+            self.record(name, WaitCondition.STATE, WaitStrategy.POLLING,
+                        time.perf_counter() - start_time, timed_out, backend=self.backend)
+
+    @staticmethod
+    def _locator_name(locator, resolved: tuple) -> str:
+        """Returns the name the latency of a locator is recorded with"""
+        return getattr(locator, "key", None) or f"{resolved[0]}={resolved[1]}"
+
+    def _wait_in_page(self, driver, context, resolved: tuple, condition, timeout):
+        """Blocks in a single async script until the element meets the condition"""
+        if self._script_timeout is None or self._script_timeout < timeout + 1:
+            # the page gives up first, so a timeout is a null result and not a driver error
+            self._script_timeout = timeout + 1
+            driver.set_script_timeout(self._script_timeout)
+        element = driver.execute_async_script(
+            WAIT_FOR_ELEMENT_JS, context, resolved[0], resolved[1], condition.value,
+            int(timeout * 1000))
+        if element is None:
+            raise TimeoutException(f"Element {resolved} not {condition.value} within {timeout}s")
+        return element
+
+
+class WaitLatencyReport:
+    """
+    Pytest plugin which shows the recorded wait latencies at the end of the session.
+
+    Attributes:
+        limit(int): number of locators shown.
+    """
+
+    def __init__(self, limit=20):
+        self.limit = limit
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Shows the wait latency per locator, condition and strategy"""
+        summary = WaitEngine.get_latency_summary()
+        if not summary:
+            return
+        terminalreporter.section("wait latency")
+        for row in summary[:self.limit]:
+            locator = f"{row['page']}.{row['locator']}" if row["page"] else row["locator"]
+            terminalreporter.write_line(
+                f"{locator} ({row['condition']}, {row['backend']}/{row['strategy']}): "
+                f"{row['count']} waits, {row['timeouts']} timeouts, "
+                f"mean {row['mean'] * 1000:.0f}ms, p50 {row['p50'] * 1000:.0f}ms, "
+                f"max {row['max'] * 1000:.0f}ms")